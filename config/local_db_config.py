@@ -20,7 +20,8 @@ LOCAL_DB_CONFIG = {
 # 数据库表配置
 TABLE_CONFIG = {
     'task_mapping': 'task_mapping',
-    'file_details': 'task_file_details'
+    'file_details': 'task_file_details',
+    'task_executions': 'task_executions'
 }
 
 # 应用配置
@@ -51,6 +51,17 @@ TENANT_CONFIG = [
     }
 ]
 
+# 分表索引提示配置
+# 格式: {表名: {查询名: 'FORCE INDEX (索引名)'}}，未配置的查询不加提示。
+# 查询名: SQL_TEMPLATES 中的模板名，以及 statistics_cube、details_list、details_count。
+# 可先运行 scripts/statistics_index_advisor.py 检查各分表的执行计划，再按建议填写。
+INDEX_HINTS = {
+    'job_a': {},
+    'job_b': {},
+    'job_c': {},
+    'job_d': {}
+}
+
 # 统计查询SQL模板
 SQL_TEMPLATES = {
     # 失败/超时总数
@@ -59,7 +70,7 @@ SQL_TEMPLATES = {
             COUNT(*) as count,
             DATE(created_at) AS date,
             type as task_type
-        FROM {table} 
+        FROM {table} {index_hint}
         WHERE created_at >= %s 
             AND created_at <= %s
             AND tenant_id IN ({tenant_ids})
@@ -80,7 +91,7 @@ SQL_TEMPLATES = {
             COUNT(*) as count,
             DATE(created_at) AS date,
             type as task_type
-        FROM {table} 
+        FROM {table} {index_hint}
         WHERE created_at >= %s 
             AND created_at <= %s
             AND tenant_id IN ({tenant_ids})
@@ -96,7 +107,7 @@ SQL_TEMPLATES = {
             COUNT(*) as count,
             DATE(created_at) AS date,
             type as task_type
-        FROM {table} 
+        FROM {table} {index_hint}
         WHERE created_at >= %s 
             AND created_at <= %s
             AND tenant_id IN ({tenant_ids})
@@ -114,7 +125,7 @@ SQL_TEMPLATES = {
             COUNT(*) as count,
             DATE(created_at) AS date,
             type as task_type
-        FROM {table} 
+        FROM {table} {index_hint}
         WHERE created_at >= %s 
             AND created_at <= %s
             AND tenant_id IN ({tenant_ids})
@@ -132,7 +143,7 @@ SQL_TEMPLATES = {
             COUNT(*) as count,
             DATE(created_at) AS date,
             type as task_type
-        FROM {table} 
+        FROM {table} {index_hint}
         WHERE created_at >= %s 
             AND created_at <= %s
             AND tenant_id IN ({tenant_ids})
@@ -162,7 +173,7 @@ SQL_TEMPLATES = {
             SUM(CASE WHEN a.break_at < %s 
                      AND a.deliver_at IS NULL
                      AND a.status != 'FAILED' THEN 1 ELSE 0 END) as timeout_not_succeed
-        FROM {table} a
+        FROM {table} a {index_hint}
         WHERE a.created_at >= %s 
             AND a.created_at <= %s
             AND a.tenant_id IN ({tenant_ids})
@@ -199,6 +210,20 @@ def get_all_tenant_ids() -> list:
     return [tenant['id'] for tenant in TENANT_CONFIG]
 
 
+def get_index_hint(table: str, query_name: str) -> str:
+    """
+    获取指定分表、指定查询的索引提示
+    
+    Args:
+        table: 表名
+        query_name: 查询名
+        
+    Returns:
+        str: 索引提示（如 FORCE INDEX (idx_created_at)），未配置返回空字符串
+    """
+    return INDEX_HINTS.get(table, {}).get(query_name, '')
+
+
 def format_sql_placeholders(items: list) -> str:
     """
     格式化SQL占位符
@@ -236,6 +261,7 @@ def get_sql_template(template_name: str, table: str, tenant_ids: list, task_type
     
     return template.format(
         table=table,
+        index_hint=get_index_hint(table, template_name),
         tenant_ids=tenant_placeholders,
         task_types=task_type_placeholders
     )
@@ -246,5 +272,6 @@ TASK_STATISTICS_CONFIG = {
     'tables': DATABASE_TABLES,
     'task_types': TASK_TYPES,
     'tenants': TENANT_CONFIG,
-    'sql_templates': SQL_TEMPLATES
+    'sql_templates': SQL_TEMPLATES,
+    'index_hints': INDEX_HINTS
 } 
\ No newline at end of file
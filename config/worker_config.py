@@ -0,0 +1,58 @@
+"""
+Web任务执行配置模块
+"""
+import os
+
+# Web任务队列和读取器工作线程配置
+WORKER_CONFIG = {
+    # 同时执行的任务数（/submit 读取任务和重爬任务共用）
+    'max_workers': int(os.getenv('READER_WORKERS', '4')),
+    # 最多排队的任务数，超出时提交返回429
+    'max_pending': int(os.getenv('TASK_QUEUE_MAX_PENDING', '200')),
+    # 启动时预热读取器（导入Azure SDK、创建客户端并获取访问令牌）
+    'warm_up': os.getenv('READER_WARM_UP', 'True').lower() in ('true', '1', 't'),
+    # 相同请求（任务ID、输出类型、是否解析）在该时间（秒）内成功执行过时直接复用结果，0表示不复用
+    'reuse_window': int(os.getenv('TASK_REUSE_WINDOW', '300')),
+    # 原始文件保持下载时的gzip压缩保存（page_1.html.gz），看板以 Content-Encoding: gzip 直接发送
+    'keep_compressed': os.getenv('READER_KEEP_COMPRESSED', 'False').lower() in ('true', '1', 't'),
+    # 批量重爬时同时提交的请求数（共用一个HTTP连接池）
+    'recrawl_concurrency': int(os.getenv('RECRAWL_CONCURRENCY', '8')),
+    # 单个重爬批次最多提交的任务数
+    'recrawl_max_batch': int(os.getenv('RECRAWL_MAX_BATCH', '5000'))
+}
+
+# Web任务执行记录配置（记录保存在本地数据库 task_executions 表，输出写入压缩文件）
+TASK_HISTORY_CONFIG = {
+    # 任务输出压缩文件目录
+    'log_dir': os.getenv('TASK_LOG_DIR', 'logs/tasks'),
+    # 保留天数，更早的记录和输出文件会被清理
+    'retention_days': int(os.getenv('TASK_RETENTION_DAYS', '30')),
+    # 最多保留的记录数
+    'max_records': int(os.getenv('TASK_MAX_RECORDS', '10000')),
+    # 内存中保留的最近结束任务数（本地数据库不可用时即为全部历史）
+    'recent_cache_size': int(os.getenv('TASK_RECENT_CACHE_SIZE', '200')),
+    # 两次清理之间的最短间隔（秒）
+    'prune_interval': int(os.getenv('TASK_PRUNE_INTERVAL', '3600'))
+}
+
+# HTTP响应缓存和压缩配置
+HTTP_CACHE_CONFIG = {
+    # 小于该字节数的响应不压缩
+    'min_size': int(os.getenv('HTTP_COMPRESS_MIN_SIZE', '1024')),
+    # 压缩级别（gzip 1-9，brotli 取相同的 quality）
+    'level': int(os.getenv('HTTP_COMPRESS_LEVEL', '6')),
+    # 压缩后的结果文件内容缓存上限（字节）
+    'variant_cache_bytes': int(os.getenv('HTTP_COMPRESS_CACHE_MB', '64')) * 1024 * 1024
+}
+
+# 对比查看使用的HTML精简快照
+LITE_HTML_CONFIG = {
+    # 精简快照的保存目录（按原始文件的修改时间和大小命名，文件修改后重新生成）
+    'cache_dir': os.getenv('LITE_HTML_CACHE_DIR', 'data/cache/lite_html')
+}
+
+# Web进程内的热点文件内容缓存
+FILE_CACHE_CONFIG = {
+    # 缓存的解码文本和解析后JSON的估算内存上限（字节）
+    'max_bytes': int(os.getenv('FILE_CACHE_MB', '128')) * 1024 * 1024
+}
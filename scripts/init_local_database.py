@@ -12,6 +12,8 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from src.db.local_connector import LocalDatabaseConnector
+from src.dir_index import directory_index
+from src.file_preview import build_file_metadata
 from config.local_db_config import LOCAL_DB_CONFIG
 
 
@@ -95,13 +97,10 @@ def migrate_from_json(json_file_path: str = 'data/output/task_mapping.json'):
                 else:
                     full_path = f"data/output/{relative_path}"
                 
-                # 检查目录是否存在并统计文件
-                file_count = 0
-                has_parse_file = False
-                if os.path.exists(full_path):
-                    files = [f for f in os.listdir(full_path) if os.path.isfile(os.path.join(full_path, f))]
-                    file_count = len(files)
-                    has_parse_file = any(f.name == 'parse_result.json' for f in Path(full_path).iterdir() if f.is_file())
+                # 检查目录是否存在并统计文件（目录只扫描一次）
+                files = directory_index.try_list_files(full_path)
+                file_count = len(files) if files else 0
+                has_parse_file = any(f.name == 'parse_result.json' for f in files or [])
                 
                 # 插入数据库记录
                 mapping_id = db.insert_task_mapping(
@@ -118,18 +117,20 @@ def migrate_from_json(json_file_path: str = 'data/output/task_mapping.json'):
                 
                 if mapping_id:
                     # 如果目录存在，插入文件详情
-                    if os.path.exists(full_path):
+                    if files:
                         files_info = []
-                        for file_path in Path(full_path).iterdir():
-                            if file_path.is_file():
-                                file_type = 'parse' if file_path.name == 'parse_result.json' else 'original'
-                                files_info.append({
-                                    'file_name': file_path.name,
-                                    'file_type': file_type,
-                                    'file_size': file_path.stat().st_size,
-                                    'file_path': str(file_path),
-                                    'download_success': True
-                                })
+                        for entry in files:
+                            file_path = Path(full_path) / entry.name
+                            file_type = 'parse' if entry.name == 'parse_result.json' else 'original'
+                            files_info.append({
+                                'file_name': entry.name,
+                                'file_type': file_type,
+                                'file_size': entry.size,
+                                'file_path': str(file_path),
+                                'download_success': True,
+                                # 下载时计算预览和JSON结构，任务详情直接读取
+                                **build_file_metadata(str(file_path))
+                            })
                         
                         if files_info:
                             db.insert_file_details(mapping_id, files_info)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+统计SQL索引检查工具
+用真实参数渲染 config/task_statistics_config.py 的 SQL_TEMPLATES 以及Web统计接口使用的查询，
+在每个分表上执行 EXPLAIN FORMAT=JSON，标记全表扫描和文件排序，并给出覆盖索引或 FORCE INDEX 建议。
+
+使用示例:
+  python3 scripts/statistics_index_advisor.py
+  python3 scripts/statistics_index_advisor.py --tables job_a job_b --days 3
+  python3 scripts/statistics_index_advisor.py --json > index_report.json
+"""
+import sys
+import json
+import argparse
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.db.connector import DatabaseConnector
+from config.db_config import DB_CONFIG
+from config.task_statistics_config import DATABASE_TABLES, TASK_TYPES, get_all_tenant_ids
+from src.task_stats.index_advisor import (
+    ISSUE_DESCRIPTIONS, analyze_plan, explain_query, get_table_indexes,
+    render_statistics_queries, suggest_for_query
+)
+
+
+def check_table(db, table, tenant_ids, task_types, reference_time, start_time, end_time):
+    """检查一个分表上的所有统计查询"""
+    log_table = table.replace('job_', 'log_')
+    indexes = {
+        table: get_table_indexes(db, table),
+        log_table: get_table_indexes(db, log_table)
+    }
+    
+    reports = []
+    for query_name, sql, params in render_statistics_queries(
+            table, tenant_ids, task_types, reference_time, start_time, end_time):
+        try:
+            analysis = analyze_plan(explain_query(db, sql, params))
+        except Exception as e:
+            reports.append({'table': table, 'query': query_name, 'error': str(e)})
+            continue
+        
+        reports.append({
+            'table': table,
+            'query': query_name,
+            'plan_tables': analysis['tables'],
+            'issues': analysis['issues'],
+            'suggestions': suggest_for_query(query_name, table, analysis, indexes)
+        })
+    
+    return reports
+
+
+def print_report(reports):
+    """打印检查结果"""
+    current_table = None
+    for report in reports:
+        if report['table'] != current_table:
+            current_table = report['table']
+            print("\n" + "=" * 80)
+            print(f"📊 分表: {current_table}")
+            print("=" * 80)
+        
+        if 'error' in report:
+            print(f"❌ {report['query']}: EXPLAIN 失败 - {report['error']}")
+            continue
+        
+        status = '⚠️ ' if report['issues'] else '✅'
+        issues = '、'.join(ISSUE_DESCRIPTIONS[i] for i in report['issues']) or '无问题'
+        print(f"{status} {report['query']}: {issues}")
+        for plan_table in report['plan_tables']:
+            print(f"     - {plan_table['table']}: access_type={plan_table['access_type']}, "
+                  f"key={plan_table['key']}, rows={plan_table['rows']}")
+        for suggestion in report['suggestions']:
+            print(f"     💡 {suggestion}")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='统计SQL索引检查工具')
+    parser.add_argument('--tables', nargs='+', default=DATABASE_TABLES, choices=DATABASE_TABLES,
+                        help='要检查的分表，默认全部')
+    parser.add_argument('--days', type=int, default=7, help='查询的日期范围（天），默认7天')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出结果')
+    args = parser.parse_args()
+    
+    now = datetime.now(timezone.utc)
+    reference_time = now.strftime('%Y-%m-%d %H:%M:%S')
+    start_time = (now - timedelta(days=args.days)).strftime('%Y-%m-%d 00:00:00')
+    end_time = now.strftime('%Y-%m-%d 23:59:59')
+    
+    db_config = DB_CONFIG.copy()
+    db_config['database'] = 'shulex_collector_prod'
+    db = DatabaseConnector(db_config)
+    if not db.connect():
+        print("❌ 数据库连接失败")
+        return False
+    
+    try:
+        reports = []
+        for table in args.tables:
+            reports.extend(check_table(db, table, get_all_tenant_ids(), list(TASK_TYPES),
+                                       reference_time, start_time, end_time))
+    finally:
+        db.disconnect()
+    
+    if args.json:
+        print(json.dumps(reports, indent=2, ensure_ascii=False))
+    else:
+        print_report(reports)
+        problem_count = sum(1 for r in reports if r.get('issues') or 'error' in r)
+        print(f"\n📋 共检查 {len(reports)} 个查询，{problem_count} 个存在问题")
+        print("💡 FORCE INDEX 建议可写入 config/task_statistics_config.py 的 INDEX_HINTS")
+    
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -9,9 +9,28 @@ const request = axios.create({
   }
 })
 
+// POST 查询接口（统计数据等）的 ETag 和响应：再次发送相同请求时带 If-None-Match，
+// 服务器返回304时使用上次的响应（GET 请求由浏览器缓存处理）
+const ETAG_CACHE_SIZE = 50
+const etagCache = new Map()
+
+const etagCacheKey = (config) => {
+  if (config.method !== 'post' || !config.data || config.data instanceof FormData) return null
+  return `${config.url}|${JSON.stringify(config.params || {})}|${JSON.stringify(config.data)}`
+}
+
 // 请求拦截器
 request.interceptors.request.use(
   config => {
+    const key = etagCacheKey(config)
+    if (key) {
+      config.etagKey = key
+      const cached = etagCache.get(key)
+      if (cached) {
+        config.headers['If-None-Match'] = cached.etag
+        config.validateStatus = status => (status >= 200 && status < 300) || status === 304
+      }
+    }
     return config
   },
   error => {
@@ -23,6 +42,20 @@ request.interceptors.request.use(
 // 响应拦截器
 request.interceptors.response.use(
   response => {
+    const key = response.config.etagKey
+    if (key) {
+      if (response.status === 304 && etagCache.has(key)) {
+        return etagCache.get(key).data
+      }
+      const etag = response.headers.etag
+      if (etag) {
+        etagCache.delete(key)
+        etagCache.set(key, { etag, data: response.data })
+        if (etagCache.size > ETAG_CACHE_SIZE) {
+          etagCache.delete(etagCache.keys().next().value)
+        }
+      }
+    }
     return response.data
   },
   error => {
@@ -8,7 +8,7 @@ export const getStatisticsConfig = () => {
   })
 }
 
-// 获取统计数据
+// 获取统计数据（task_type 为单个类型；也可传 task_types 数组或 'all'，按类型拆分的结果在 by_type 中）
 export const getStatisticsData = (params) => {
   return request({
     url: '/api/statistics/data',
@@ -18,7 +18,7 @@ export const getStatisticsData = (params) => {
   })
 }
 
-// 获取统计汇总数据
+// 获取统计汇总数据（同样支持 task_types 数组或 'all'）
 export const getStatisticsSummary = (params) => {
   return request({
     url: '/api/statistics/summary',
@@ -36,4 +36,56 @@ export const getStatisticsDetails = (params) => {
     data: params,
     timeout: 360000 // 6分钟超时
   })
-} 
\ No newline at end of file
+} 
+
+// 获取单条统计详情记录的完整数据（展开行时调用）
+export const getStatisticsDetailRow = (table, reqSsn) => {
+  return request({
+    url: `/api/statistics/details/${table}/${encodeURIComponent(reqSsn)}`,
+    method: 'get'
+  })
+}
+
+// 生成统计详情导出地址（服务端流式返回全部匹配记录，format 为 csv 或 ndjson）
+export const getStatisticsDetailsExportUrl = (params, format = 'csv') => {
+  const query = new URLSearchParams({
+    start_date: params.start_date,
+    end_date: params.end_date,
+    tenant_ids: (params.tenant_ids || []).join(','),
+    task_type: params.task_type,
+    detail_type: params.detail_type,
+    format: format
+  })
+  if (params.date) query.append('date', params.date)
+  if (params.table) query.append('table', params.table)
+  return `${request.defaults.baseURL}/api/statistics/details/export?${query.toString()}`
+}
+
+// 批量重新提交爬虫任务（data 为 { req_ssns: [...] } 或 { filter: {...} }），返回 batch_id
+export const resubmitCrawlerBatch = (data) => {
+  return request({
+    url: '/api/resubmit_crawler/batch',
+    method: 'post',
+    data
+  })
+}
+
+// 查询批量重爬进度
+export const getResubmitCrawlerBatch = (batchId, withResults = false) => {
+  return request({
+    url: `/api/resubmit_crawler/batch/${batchId}`,
+    method: 'get',
+    params: withResults ? { results: 1 } : {}
+  })
+}
+
+// 生成实时统计推送（SSE）地址，订阅当前筛选条件的统计数据
+export const getStatisticsStreamUrl = (params) => {
+  const query = new URLSearchParams({
+    start_date: params.start_date,
+    end_date: params.end_date,
+    tenant_ids: (params.tenant_ids || []).join(','),
+    task_type: params.task_type
+  })
+  return `${request.defaults.baseURL}/api/statistics/stream?${query.toString()}`
+}
@@ -36,14 +36,20 @@ export const submitTask = (data) => {
   })
 }
 
-// 获取任务状态
-export const getTaskStatus = (taskId) => {
+// 获取任务状态（传入 since 时只返回该序号之后的新输出行）
+export const getTaskStatus = (taskId, since = null) => {
   return request({
     url: `/status/${taskId}`,
-    method: 'get'
+    method: 'get',
+    params: since === null ? {} : { since }
   })
 }
 
+// 任务输出和状态推送地址（Server-Sent Events，断线重连时浏览器自动从上次的序号继续）
+export const getTaskStreamUrl = (taskId) => {
+  return `${request.defaults.baseURL}/status/${taskId}/stream`
+}
+
 // 检查任务是否存在
 export const checkTaskExists = (taskId) => {
   return request({
@@ -71,6 +77,32 @@ export const getFileContent = (path) => {
   })
 }
 
+// 获取文件原始内容（不经过JSON包装，按文件编码解码为文本）
+export const getRawFileContent = (path) => {
+  return request({
+    url: '/api/file_content',
+    method: 'get',
+    params: { path, raw: 1 },
+    responseType: 'text',
+    transformResponse: [data => data]
+  })
+}
+
+// 按路径查询JSON文件的子树（对象和数组分页返回，大文件不整个下载）
+export const queryJsonFile = (path, q = '$', offset = 0, limit = 100) => {
+  return request({
+    url: '/api/json_query',
+    method: 'get',
+    params: { path, q, offset, limit }
+  })
+}
+
+// 文件原始内容地址（供 iframe 直接加载）；lite 为 true 时使用HTML页面的精简快照
+export const getRawFileUrl = (path, lite = false) => {
+  const url = `${request.defaults.baseURL}/api/file_content?path=${encodeURIComponent(path)}&raw=1`
+  return lite ? `${url}&lite=1` : url
+}
+
 // 下载文件
 export const downloadFile = (path) => {
   return request({
@@ -14,11 +14,11 @@ from pathlib import Path
 from typing import Dict, List, Optional, Union, BinaryIO
 from datetime import datetime
 import io
+import threading
+import zlib
 
-# Azure Storage SDK imports
-from azure.identity import ClientSecretCredential, DefaultAzureCredential
-from azure.storage.blob import BlobServiceClient, BlobClient, ContainerClient
-from azure.core.exceptions import AzureError, ResourceNotFoundError
+# Azure Storage SDK 和数据库驱动导入较慢，在创建读取器或查询数据库时才导入
+# （--help、--show-mapping 等不需要它们的命令启动更快）
 
 # 导入项目配置
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -30,10 +30,15 @@ from config.azure_storage_config import (
     get_storage_account_url
 )
 
-# 导入数据库连接器
-from src.db.connector import DatabaseConnector
+# 导入数据库配置
 from config.db_config import DB_CONFIG
 
+# 目录索引（看板列出任务目录时使用，写入文件后清除所在目录的缓存）
+from src.dir_index import directory_index
+
+# gzip 文件头
+GZIP_MAGIC = b'\x1f\x8b'
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -88,6 +93,9 @@ class AzureResourceReader:
         else:
             raise ValueError(f"不支持的存储账户: {account_name}。支持的账户: 'yiya0110', 'collector0109'")
         
+        from azure.identity import ClientSecretCredential, DefaultAzureCredential
+        from azure.storage.blob import BlobServiceClient
+        
         # 设置环境变量
         set_azure_environment_variables()
         
@@ -180,6 +188,8 @@ class AzureResourceReader:
         Returns:
             Union[str, bytes, None]: 文件内容
         """
+        from azure.core.exceptions import ResourceNotFoundError
+        
         try:
             blob_client = self.blob_service_client.get_blob_client(
                 container=container_name,
@@ -485,7 +495,7 @@ class AzureResourceReader:
         prefix = f"{self.storage_config['blob_base_path']}/{task_type}/{task_id}/"
         
         return self.list_blobs_with_prefix(container_name, prefix, limit=100)
-
+    
     def read_task_file_with_parse(self, task_type: str, task_id: str, filename: str, 
                                  decompress: bool = True) -> Dict[str, Union[str, bytes, None]]:
         """
@@ -508,7 +518,7 @@ class AzureResourceReader:
             result['original'] = self.read_task_file(task_type, task_id, filename, decompress)
             
             # 创建collector0109读取器来读取解析文件
-            parse_reader = AzureResourceReader('collector0109')
+            parse_reader = get_reader('collector0109')
             logger.info(f"正在读取解析文件...")
             result['parse'] = parse_reader.read_parse_file(task_type, task_id, None, decompress)
             
@@ -518,7 +528,7 @@ class AzureResourceReader:
             result['parse'] = None
             
         return result
-
+    
     def fetch_and_save_parse_files(self, task_type: str, task_id: str, 
                                   save_dir: str = 'data/output', 
                                   decompress: bool = True) -> Dict[str, any]:
@@ -700,6 +710,8 @@ class AzureResourceReader:
                 with open(file_path, 'wb') as f:
                     f.write(content)
             
+            # 原地改写已有文件不会改变目录的修改时间
+            directory_index.invalidate(local_path.parent)
             return True
             
         except Exception as e:
@@ -707,8 +719,78 @@ class AzureResourceReader:
             return False
 
 
-def main():
-    """主函数：处理命令行参数并执行相应操作"""
+# 已创建的读取器（按存储账户缓存），复用认证凭据的令牌缓存和HTTP连接池
+_reader_cache: Dict[str, AzureResourceReader] = {}
+_reader_cache_lock = threading.Lock()
+
+
+def get_reader(account_name: str = 'yiya0110') -> AzureResourceReader:
+    """
+    获取指定存储账户的读取器（进程内复用）
+    
+    命令行每次运行只创建一次，Web进程内的常驻工作线程则避免了每个任务重新获取AAD令牌。
+    BlobServiceClient 是线程安全的，可以在多个工作线程间共享。
+    
+    Args:
+        account_name: Azure存储账户名
+        
+    Returns:
+        AzureResourceReader: 读取器
+    """
+    with _reader_cache_lock:
+        reader = _reader_cache.get(account_name)
+        if reader is None:
+            reader = AzureResourceReader(account_name)
+            _reader_cache[account_name] = reader
+        return reader
+
+
+def warm_up_readers(accounts: Optional[List[str]] = None) -> None:
+    """
+    预先创建读取器并获取访问令牌（供常驻进程启动时调用）
+    
+    Args:
+        accounts: 存储账户列表，默认为原始数据和解析数据两个账户
+    """
+    for account_name in accounts or ['yiya0110', 'collector0109']:
+        try:
+            reader = get_reader(account_name)
+            reader.credential.get_token('https://storage.azure.com/.default')
+            logger.info(f"读取器预热完成: {account_name}")
+        except Exception as e:
+            logger.warning(f"读取器预热失败: {account_name} - {str(e)}")
+
+
+def run_reader(argv: List[str]) -> int:
+    """
+    以库函数方式执行读取器（参数与命令行一致），供Web进程内的工作线程调用
+    
+    Args:
+        argv: 命令行参数（不包含脚本名），如 ['2841227686', 'html', '--with-parse']
+        
+    Returns:
+        int: 与命令行一致的退出码（0表示正常结束）
+    """
+    try:
+        main(argv)
+        return 0
+    except SystemExit as e:
+        # argparse 参数错误等
+        if e.code is None:
+            return 0
+        return e.code if isinstance(e.code, int) else 1
+    except Exception as e:
+        logger.exception(f"读取器执行失败: {str(e)}")
+        return 1
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    主函数：处理命令行参数并执行相应操作
+    
+    Args:
+        argv: 命令行参数，默认为 sys.argv[1:]
+    """
     parser = argparse.ArgumentParser(
         description='Azure Storage 资源读取器',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -739,6 +821,9 @@ def main():
   # 启用详细日志输出（包括HTTP请求详情）
   python3 src/azure_resource_reader.py AmazonListingJob 2834468425 html --with-parse --verbose
   
+  # 原始文件保持gzip压缩保存（page_1.html.gz，看板直接以 Content-Encoding: gzip 发送）
+  python3 src/azure_resource_reader.py AmazonReviewStarJob 2796867471 html --keep-compressed
+  
 映射功能说明:
   - 每次成功下载文件后，会在 data/output/task_mapping.json 中记录映射关系
   - 映射格式: 输入参数 -> 实际下载路径
@@ -795,8 +880,11 @@ def main():
     parser.add_argument('--verbose', '-v',
                        action='store_true',
                        help='启用详细日志输出（包括HTTP请求详情）')
+    parser.add_argument('--keep-compressed',
+                       action='store_true',
+                       help='html/txt/json 原始文件按下载时的gzip原样保存为 *.html.gz 等（不解压，节省磁盘和CPU）')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # 根据verbose参数设置日志级别
     setup_logging(verbose=args.verbose)
@@ -854,7 +942,7 @@ def main():
         # 传统模式：python3 script.py AmazonListingJob 1234567890123456 html --with-parse
         args.task_id_or_task_id = args.task_id_or_output_type
         args.output_type = args.output_type_or_extra
-
+    
     # 🆕 处理 --fetch-parse 模式
     if args.fetch_parse:
         if not args.task_type_or_job_id or not args.task_id_or_task_id:
@@ -870,7 +958,7 @@ def main():
         print("=" * 80)
         
         # 创建collector0109读取器
-        reader = AzureResourceReader('collector0109')
+        reader = get_reader('collector0109')
         
         # 使用优化的方法获取解析文件
         result = reader.fetch_and_save_parse_files(
@@ -945,7 +1033,7 @@ def main():
         print("=" * 80)
         
         # 创建资源读取器
-        reader = AzureResourceReader(args.account)
+        reader = get_reader(args.account)
         
         # 处理解析文件
         handle_parse_mode(reader, job_id, task_id, args, original_input)
@@ -998,7 +1086,7 @@ def main():
         print(f"📄 用户指定文件: {', '.join(files_to_process)}")
     
     # 创建资源读取器
-    reader = AzureResourceReader(args.account)
+    reader = get_reader(args.account)
     
     # 如果只是列出任务
     if args.list_jobs:
@@ -1018,8 +1106,9 @@ def main():
             print("❌ 未找到任务")
         return
     
-    # 确定是否需要解压缩
+    # 确定是否需要解压缩（保持压缩保存时下载后不解压）
     decompress = args.output_type in ['html', 'txt', 'json']
+    keep_compressed = decompress and args.keep_compressed
     
     # 用于记录是否有文件成功下载
     successfully_downloaded_files = []
@@ -1042,7 +1131,8 @@ def main():
         if not args.info_only:
             # 读取单一压缩文件
             print(f"📥 正在下载单一压缩文件...")
-            content = reader.read_blob_content(container_name, single_file_path, decompress=decompress)
+            content = reader.read_blob_content(container_name, single_file_path,
+                                               decompress=decompress and not keep_compressed)
             
             if content is not None:
                 print("✅ 单一压缩文件读取成功!")
@@ -1081,13 +1171,17 @@ def main():
                         print("🔍 检测到JSON内容，将保存为.json文件")
                     except json.JSONDecodeError:
                         pass  # 不是有效JSON，保持原输出类型
+                elif keep_compressed and _looks_like_json(_gzip_head(content)):
+                    output_type_to_use = "json"
+                    print("🔍 检测到JSON内容，将保存为.json.gz文件")
                 
                 save_filename = _generate_save_filename(f"{task_id}", task_id, output_type_to_use)
                 local_path = f"{args.save_dir}/{args.task_type_or_job_id}/{task_id}/{save_filename}"
                 
-                success = _save_content_to_file(content, local_path)
+                saved_path = _save_output_file(content, local_path, keep_compressed)
+                success = saved_path is not None
                 if success:
-                    print(f"💾 单一压缩文件已保存到: {local_path}")
+                    print(f"💾 单一压缩文件已保存到: {saved_path}")
                     successfully_downloaded_files.append(f"{task_id}.gz")
                     
                     # 如果成功下载了单一压缩文件，跳过后续的多文件处理
@@ -1123,7 +1217,8 @@ def main():
                 continue
             
             # 读取原始文件
-            content = reader.read_task_file(args.task_type_or_job_id, task_id, filename, decompress)
+            content = reader.read_task_file(args.task_type_or_job_id, task_id, filename,
+                                            decompress and not keep_compressed)
             
             if content is not None:
                 print("✅ 原始文件读取成功!")
@@ -1136,9 +1231,10 @@ def main():
                 save_filename = _generate_save_filename(filename, task_id, args.output_type)
                 local_path = f"{args.save_dir}/{args.task_type_or_job_id}/{task_id}/{save_filename}"
                 
-                success = _save_content_to_file(content, local_path)
+                saved_path = _save_output_file(content, local_path, keep_compressed)
+                success = saved_path is not None
                 if success:
-                    print(f"💾 原始文件已保存到: {local_path}")
+                    print(f"💾 原始文件已保存到: {saved_path}")
                     successfully_downloaded_files.append(filename)
             else:
                 print("❌ 原始文件读取失败或文件不存在")
@@ -1214,6 +1310,8 @@ def _save_content_to_file(content: Union[str, bytes], file_path: str) -> bool:
             with open(file_path, 'wb') as f:
                 f.write(content)
         
+        # 原地改写已有文件不会改变目录的修改时间
+        directory_index.invalidate(local_path.parent)
         return True
         
     except Exception as e:
@@ -1221,6 +1319,51 @@ def _save_content_to_file(content: Union[str, bytes], file_path: str) -> bool:
         return False
 
 
+def _gzip_head(data: bytes, size: int = 4096) -> Optional[str]:
+    """
+    解压gzip数据的开头部分（用于判断内容类型，不解压整个文件）
+    
+    Returns:
+        Optional[str]: 开头的文本，不是gzip数据时返回None
+    """
+    if not isinstance(data, bytes) or not data.startswith(GZIP_MAGIC):
+        return None
+    try:
+        head = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(data, size)
+    except zlib.error:
+        return None
+    return head.decode('utf-8', errors='ignore')
+
+
+def _looks_like_json(head: Optional[str]) -> bool:
+    return head is not None and head.lstrip()[:1] in ('{', '[')
+
+
+def _save_output_file(content: Union[str, bytes], file_path: str, keep_compressed: bool = False) -> Optional[str]:
+    """
+    保存下载的文件
+    
+    保持压缩时gzip数据按原样保存为 file_path + '.gz'（不是gzip数据时按原样保存为 file_path），
+    并删除另一种方式保存的旧文件，避免看板读到过期内容
+    
+    Args:
+        content: 文件内容（保持压缩时为下载的原始字节）
+        file_path: 文件路径（解压后的文件名，如 page_1.html）
+        keep_compressed: 是否保持压缩保存
+        
+    Returns:
+        Optional[str]: 实际保存的路径，失败返回None
+    """
+    compressed = keep_compressed and isinstance(content, bytes) and content.startswith(GZIP_MAGIC)
+    target, stale = (f"{file_path}.gz", file_path) if compressed else (file_path, f"{file_path}.gz")
+    if not _save_content_to_file(content, target):
+        return None
+    if os.path.exists(stale):
+        os.remove(stale)
+        directory_index.invalidate(os.path.dirname(stale))
+    return target
+
+
 def demo_read_amazon_listing_job():
     """演示读取Amazon Listing Job文件（保留用于测试）"""
     # 创建资源读取器
@@ -1365,6 +1508,8 @@ def get_task_type_by_job_id(job_id: str) -> Optional[str]:
     if job_id.isdigit():
         job_id = f"SL{job_id}"
     
+    from src.db.connector import DatabaseConnector
+    
     # 创建数据库连接
     db_config = DB_CONFIG.copy()
     db_config['database'] = 'shulex_collector_prod'
@@ -1436,8 +1581,8 @@ def convert_task_id_to_job_id(task_id: str) -> Optional[str]:
         Optional[str]: 对应的job_id，如果找不到则返回None
     """
     try:
-        # 导入数据库配置并指定数据库
-        from config.db_config import DB_CONFIG
+        # 导入数据库连接器并指定数据库
+        from src.db.connector import DatabaseConnector
         config_with_db = DB_CONFIG.copy()
         config_with_db['database'] = 'shulex_collector_prod'
         
@@ -1496,6 +1641,8 @@ def convert_job_id_to_task_id(job_id: str) -> Optional[str]:
     Returns:
         Optional[str]: 找到的 task_id (ext_ssn)，未找到返回None
     """
+    from src.db.connector import DatabaseConnector
+    
     # 创建数据库连接
     db_config = DB_CONFIG.copy()
     db_config['database'] = 'shulex_collector_prod'
@@ -1597,6 +1744,7 @@ def update_task_mapping(input_param: str, task_type: str, actual_task_id: str,
     """
     try:
         from src.db.local_connector import LocalDatabaseConnector
+        from src.file_preview import build_file_metadata
         
         # 生成相对路径和完整路径
         relative_path = f"./{task_type}/{actual_task_id}/"
@@ -1607,21 +1755,24 @@ def update_task_mapping(input_param: str, task_type: str, actual_task_id: str,
         has_parse_file = False
         files_info = []
         
-        if os.path.exists(full_path):
-            for file_path in Path(full_path).iterdir():
-                if file_path.is_file():
-                    file_count += 1
-                    file_type = 'parse' if file_path.name == 'parse_result.json' else 'original'
-                    if file_type == 'parse':
-                        has_parse_file = True
-                    
-                    files_info.append({
-                        'file_name': file_path.name,
-                        'file_type': file_type,
-                        'file_size': file_path.stat().st_size,
-                        'file_path': str(file_path),
-                        'download_success': True
-                    })
+        # 刚下载完成，重新扫描目录（同时更新看板使用的目录缓存）
+        entries = directory_index.list_files(full_path, refresh=True) if os.path.isdir(full_path) else []
+        for entry in entries:
+            file_path = Path(full_path) / entry.name
+            file_count += 1
+            file_type = 'parse' if entry.name == 'parse_result.json' else 'original'
+            if file_type == 'parse':
+                has_parse_file = True
+            
+            files_info.append({
+                'file_name': entry.name,
+                'file_type': file_type,
+                'file_size': entry.size,
+                'file_path': str(file_path),
+                'download_success': True,
+                # 下载时计算预览和JSON结构，任务详情直接读取
+                **build_file_metadata(str(file_path))
+            })
         
         # 获取下载方式
         download_method = kwargs.get('download_method', 'azure_storage')
@@ -1741,9 +1892,9 @@ def show_task_mapping(save_dir: str = 'data/output') -> None:
                 clean_path = relative_path.lstrip('./')
                 full_path = os.path.join(save_dir, clean_path)
                 
-                if os.path.exists(full_path):
-                    file_count = len([f for f in os.listdir(full_path) if os.path.isfile(os.path.join(full_path, f))])
-                    print(f"  📄 文件数量: {file_count}")
+                files = directory_index.try_list_files(full_path)
+                if files is not None:
+                    print(f"  📄 文件数量: {len(files)}")
                 else:
                     print(f"  ⚠️  目录不存在")
             else:
@@ -1860,10 +2011,11 @@ def handle_with_parse_mode(args) -> None:
         print(f"📄 用户指定原始文件: {', '.join(files_to_process)}")
     
     # 创建主读取器（yiya0110）
-    reader = AzureResourceReader('yiya0110')
+    reader = get_reader('yiya0110')
     
-    # 确定是否需要解压缩
+    # 确定是否需要解压缩（保持压缩保存时下载后不解压）
     decompress = args.output_type in ['html', 'txt', 'json']
+    keep_compressed = decompress and args.keep_compressed
     
     # 用于记录是否有文件成功下载
     successfully_downloaded_files = []
@@ -1879,7 +2031,7 @@ def handle_with_parse_mode(args) -> None:
             from src.azure_resource_reader_optimizer import fetch_and_save_parse_files_optimized
             
             # 创建collector0109读取器用于解析文件
-            parse_reader = AzureResourceReader('collector0109')
+            parse_reader = get_reader('collector0109')
             
             # 使用优化方法获取解析文件
             parse_result = fetch_and_save_parse_files_optimized(
@@ -1935,7 +2087,8 @@ def handle_with_parse_mode(args) -> None:
         if not args.info_only:
             # 读取单一压缩文件
             print(f"📥 正在下载单一压缩文件...")
-            content = reader.read_blob_content(container_name, single_file_path, decompress=decompress)
+            content = reader.read_blob_content(container_name, single_file_path,
+                                               decompress=decompress and not keep_compressed)
             
             if content is not None:
                 print("✅ 单一压缩文件读取成功!")
@@ -1974,13 +2127,17 @@ def handle_with_parse_mode(args) -> None:
                         print("🔍 检测到JSON内容，将保存为.json文件")
                     except json.JSONDecodeError:
                         pass  # 不是有效JSON，保持原输出类型
+                elif keep_compressed and _looks_like_json(_gzip_head(content)):
+                    output_type_to_use = "json"
+                    print("🔍 检测到JSON内容，将保存为.json.gz文件")
                 
                 save_filename = _generate_save_filename(f"{task_id}", task_id, output_type_to_use)
                 local_path = f"{args.save_dir}/{task_type}/{task_id}/{save_filename}"
                 
-                success = _save_content_to_file(content, local_path)
+                saved_path = _save_output_file(content, local_path, keep_compressed)
+                success = saved_path is not None
                 if success:
-                    print(f"💾 单一压缩文件已保存到: {local_path}")
+                    print(f"💾 单一压缩文件已保存到: {saved_path}")
                     successfully_downloaded_files.append(f"{task_id}.gz")
                     
                     # 如果成功下载了单一压缩文件，跳过后续的多文件处理
@@ -2016,7 +2173,7 @@ def handle_with_parse_mode(args) -> None:
                 continue
             
             # 读取原始文件
-            content = reader.read_task_file(task_type, task_id, filename, decompress)
+            content = reader.read_task_file(task_type, task_id, filename, decompress and not keep_compressed)
             
             if content is not None:
                 print("✅ 原始文件读取成功!")
@@ -2029,9 +2186,10 @@ def handle_with_parse_mode(args) -> None:
                 save_filename = _generate_save_filename(filename, task_id, args.output_type)
                 local_path = f"{args.save_dir}/{task_type}/{task_id}/{save_filename}"
                 
-                success = _save_content_to_file(content, local_path)
+                saved_path = _save_output_file(content, local_path, keep_compressed)
+                success = saved_path is not None
                 if success:
-                    print(f"💾 原始文件已保存到: {local_path}")
+                    print(f"💾 原始文件已保存到: {saved_path}")
                     successfully_downloaded_files.append(filename)
             else:
                 print("❌ 原始文件读取失败或文件不存在")
@@ -2112,7 +2270,7 @@ def handle_with_parse_mode(args) -> None:
         print(f"\n📋 信息查看模式，未下载文件")
         # 显示解析文件信息（如果未在优化步骤中获取）
         if not parse_file_downloaded:
-            parse_reader = AzureResourceReader('collector0109')
+            parse_reader = get_reader('collector0109')
             parse_files = parse_reader.list_parse_files(task_type, task_id)
             if parse_files:
                 print(f"\n✅ 解析文件信息 (共{len(parse_files)}个):")
@@ -3,7 +3,7 @@
 """
 import logging
 import time
-from typing import Dict, List, Optional, Any, Union, Tuple
+from typing import Dict, Iterator, List, Optional, Any, Union, Tuple
 
 import mysql.connector
 from mysql.connector import Error as MySQLError
@@ -81,22 +81,29 @@ class DatabaseConnector:
             self.connection.close()
             logger.info("数据库连接已关闭")
     
-    def execute_query(self, query: str, params: Optional[Union[Dict, Tuple, List]] = None) -> List[Dict]:
+    def execute_query(self, query: str, params: Optional[Union[Dict, Tuple, List]] = None,
+                      raise_errors: bool = False) -> List[Dict]:
         """
         执行查询并返回结果
         
         Args:
             query: SQL查询语句
             params: 查询参数
+            raise_errors: 失败时抛出异常而不是返回空列表（结果会被缓存时使用，避免把不完整的结果当作完整结果）
             
         Returns:
             List[Dict]: 查询结果列表
+            
+        Raises:
+            MySQLError: raise_errors 为True且无法连接或查询失败
         """
         result = []
         
         if not self.connection or not self.connection.is_connected():
             if not self.connect():
                 logger.error("无法执行查询，数据库未连接")
+                if raise_errors:
+                    raise MySQLError(msg="无法执行查询，数据库未连接")
                 return result
         
         try:
@@ -113,8 +120,63 @@ class DatabaseConnector:
             
         except MySQLError as err:
             logger.error(f"查询执行失败: {err}")
+            if raise_errors:
+                raise
             return result
     
+    def iter_query(self, query: str, params: Optional[Union[Dict, Tuple, List]] = None,
+                   batch_size: int = 1000) -> Iterator[Dict]:
+        """
+        使用服务端游标（非缓冲游标）流式执行查询，逐条返回结果
+        
+        结果按 batch_size 分批从服务器读取，内存占用与结果总数无关。
+        迭代期间该连接不能执行其他查询，需要并行读取多个查询时请使用多个连接器。
+        迭代提前终止时会直接关闭连接（未读取的结果无法丢弃）。
+        
+        Args:
+            query: SQL查询语句
+            params: 查询参数
+            batch_size: 每次从服务器读取的记录数
+        
+        Yields:
+            Dict: 查询结果记录
+        
+        Raises:
+            MySQLError: 无法连接或查询中途失败（调用方据此区分结果不完整和正常结束）
+        """
+        if not self.connection or not self.connection.is_connected():
+            if not self.connect():
+                logger.error("无法执行查询，数据库未连接")
+                raise MySQLError(msg="无法执行流式查询，数据库未连接")
+        
+        cursor = self.connection.cursor(dictionary=True, buffered=False)
+        row_count = 0
+        finished = False
+        start_time = time.time()
+        
+        try:
+            cursor.execute(query, params or ())
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                row_count += len(rows)
+                yield from rows
+            finished = True
+            logger.info(f"流式查询执行成功，获取 {row_count} 条记录，耗时 {time.time() - start_time:.2f} 秒")
+        except MySQLError as err:
+            logger.error(f"流式查询执行失败，已读取 {row_count} 条记录: {err}")
+            raise
+        finally:
+            if finished:
+                cursor.close()
+            else:
+                # 未读完的结果集会阻塞连接，直接断开
+                logger.info(f"流式查询提前终止，已读取 {row_count} 条记录，关闭连接")
+                self.connection.shutdown()
+                self.connection = None
+                self.cursor = None
+    
     def execute_many(self, query: str, params_list: List[Union[Dict, Tuple, List]]) -> bool:
         """
         执行批量操作（插入或更新）
@@ -2,10 +2,13 @@
 本地数据库连接器模块，负责管理本地MySQL连接和任务映射数据操作
 """
 import logging
+import re
+import threading
 import time
 import json
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any, Union, Tuple
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import mysql.connector
 from mysql.connector import Error as MySQLError
@@ -20,10 +23,92 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 文件详情表中下载时预计算的文件信息列（旧表缺少时自动添加）
+FILE_DETAILS_METADATA_COLUMNS = {
+    'preview': "TEXT DEFAULT NULL COMMENT '内容预览'",
+    'preview_type': "VARCHAR(20) DEFAULT NULL COMMENT '预览类型：json, html, text, error'",
+    'line_count': "INT DEFAULT NULL COMMENT '行数'",
+    'json_type': "VARCHAR(20) DEFAULT NULL COMMENT 'JSON顶层类型：object, array, string, number, boolean, null'",
+    'json_length': "INT DEFAULT NULL COMMENT 'JSON顶层键数或元素数'",
+    'is_empty_json': "BOOLEAN DEFAULT NULL COMMENT '是否为空JSON'",
+    'empty_json_type': "VARCHAR(20) DEFAULT NULL COMMENT '空JSON类型：empty_string, empty_object, empty_array, null'"
+}
+
+# 任务列表返回的文件详情列（不含预计算的预览等信息，完整信息通过任务详情接口获取）
+FILE_DETAILS_LIST_COLUMNS = (
+    'id', 'mapping_id', 'file_name', 'file_type', 'file_size', 'file_path', 'download_success', 'created_at'
+)
+
+# 任务映射表的检索索引（旧表缺少时自动添加；ngram 全文索引不可用时搜索退回 LIKE 扫描）
+TASK_MAPPING_SEARCH_INDEXES = {
+    'idx_actual_task_id': "INDEX idx_actual_task_id (actual_task_id)",
+    'idx_updated_at': "INDEX idx_updated_at (updated_at)",
+    'ft_task_search': "FULLTEXT INDEX ft_task_search (job_id, actual_task_id, task_type) WITH PARSER ngram"
+}
+
+# 任务映射总数缓存的有效期（秒），其他进程写入的记录最多延迟这么久计入总数
+TASK_MAPPING_COUNT_TTL = 30
+
+# 任务映射总数缓存最多保存的搜索词数量
+TASK_MAPPING_COUNT_CACHE_SIZE = 256
+
+# 可以交给 ngram 全文索引预筛选的搜索词（只含字母和数字）
+_FULLTEXT_TERM_RE = re.compile(r'^[^\W_]+$')
+
+
+def escape_like(term: str) -> str:
+    """转义 LIKE 模式中的通配符"""
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def build_task_mapping_search(search: Optional[str], fulltext: bool = False,
+                              ngram_token_size: int = 2) -> Tuple[str, List[Any], str, List[Any]]:
+    """
+    生成任务映射搜索的 WHERE 和 ORDER BY 子句
+    
+    在 job_id、actual_task_id、task_type 中做子串匹配，前缀匹配的记录排在前面。
+    有 ngram 全文索引时先用 MATCH 缩小候选范围，再用 LIKE 确认（去掉跨列拼接造成的误匹配）。
+    
+    Args:
+        search: 搜索词，为空时不过滤
+        fulltext: 是否可以使用 ngram 全文索引
+        ngram_token_size: 服务器的 ngram_token_size，更短的搜索词无法走全文索引
+        
+    Returns:
+        Tuple[str, List, str, List]: (WHERE 子句, 参数, ORDER BY 子句, 参数)
+    """
+    order = "ORDER BY tm.updated_at DESC"
+    if not search:
+        return "", [], order, []
+    
+    escaped = escape_like(search)
+    columns = ('tm.job_id', 'tm.actual_task_id', 'tm.task_type')
+    conditions = '(' + ' OR '.join(f"{column} LIKE %s" for column in columns) + ')'
+    where = f"WHERE {conditions}"
+    params: List[Any] = [f'%{escaped}%'] * len(columns)
+    if fulltext and len(search) >= ngram_token_size and _FULLTEXT_TERM_RE.match(search):
+        where = f"WHERE MATCH({', '.join(columns)}) AGAINST (%s IN BOOLEAN MODE) AND {conditions}"
+        params = [f'"{search}"'] + params
+    
+    order = f"ORDER BY {conditions} DESC, tm.updated_at DESC"
+    return where, params, order, [f'{escaped}%'] * len(columns)
+
 
 class LocalDatabaseConnector:
     """本地数据库连接器类，专门用于任务映射数据的本地存储"""
-
+    
+    # 文件详情表的预计算信息列是否已检查（进程内共享）
+    _file_details_columns_checked = False
+    
+    # 任务映射表的检索索引是否已检查、ngram 全文索引是否可用（进程内共享）
+    _task_mapping_indexes_checked = False
+    _task_search_fulltext = False
+    _ngram_token_size = 2
+    
+    # 任务映射总数缓存：搜索词 -> (过期时间, 总数)，按写入顺序（即过期时间顺序）排列
+    _count_cache: 'OrderedDict[str, Tuple[float, int]]' = OrderedDict()
+    _count_lock = threading.Lock()
+    
     def __init__(self, config: Optional[Dict] = None):
         """
         初始化本地数据库连接器
@@ -99,11 +184,16 @@ class LocalDatabaseConnector:
                 INDEX idx_job_id (job_id),
                 INDEX idx_task_type (task_type),
                 INDEX idx_status (status),
-                INDEX idx_created_at (created_at)
+                INDEX idx_created_at (created_at),
+                INDEX idx_actual_task_id (actual_task_id),
+                INDEX idx_updated_at (updated_at)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='任务映射表'
             """
             
             # 创建文件详情表
+            metadata_columns = ',\n                '.join(
+                f"{column} {definition}" for column, definition in FILE_DETAILS_METADATA_COLUMNS.items()
+            )
             create_file_details_table = f"""
             CREATE TABLE IF NOT EXISTS {self.table_config['file_details']} (
                 id INT AUTO_INCREMENT PRIMARY KEY,
@@ -113,6 +203,7 @@ class LocalDatabaseConnector:
                 file_size BIGINT DEFAULT 0 COMMENT '文件大小（字节）',
                 file_path VARCHAR(1000) NOT NULL COMMENT '文件完整路径',
                 download_success BOOLEAN DEFAULT TRUE COMMENT '下载是否成功',
+                {metadata_columns},
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
                 FOREIGN KEY (mapping_id) REFERENCES {self.table_config['task_mapping']}(id) ON DELETE CASCADE,
                 INDEX idx_mapping_id (mapping_id),
@@ -123,6 +214,9 @@ class LocalDatabaseConnector:
             # 执行建表语句
             self.cursor.execute(create_task_mapping_table)
             self.cursor.execute(create_file_details_table)
+            self.cursor.execute(self._task_executions_table_sql())
+            self.ensure_file_details_columns()
+            self.ensure_task_mapping_indexes()
             
             logger.info("数据表创建成功")
             return True
@@ -131,6 +225,261 @@ class LocalDatabaseConnector:
             logger.error(f"创建数据表失败: {err}")
             return False
     
+    def _task_executions_table_sql(self) -> str:
+        """Web任务执行记录表的建表语句"""
+        return f"""
+            CREATE TABLE IF NOT EXISTS {self.table_config['task_executions']} (
+                id VARCHAR(36) PRIMARY KEY COMMENT '执行ID',
+                task_id VARCHAR(50) DEFAULT NULL COMMENT '任务Job ID',
+                task_type VARCHAR(100) DEFAULT NULL COMMENT '任务类型',
+                command VARCHAR(1000) NOT NULL COMMENT '等价的命令行',
+                output_type VARCHAR(20) DEFAULT NULL COMMENT '输出类型',
+                use_parse BOOLEAN DEFAULT FALSE COMMENT '是否解析',
+                status VARCHAR(20) NOT NULL COMMENT '状态：pending, running, completed, failed, error',
+                return_code INT DEFAULT NULL COMMENT '返回码',
+                error TEXT DEFAULT NULL COMMENT '错误信息',
+                log_path VARCHAR(500) DEFAULT NULL COMMENT '压缩日志文件路径',
+                log_lines INT DEFAULT 0 COMMENT '输出行数',
+                created_at DATETIME(3) NOT NULL COMMENT '创建时间',
+                started_at DATETIME(3) DEFAULT NULL COMMENT '开始执行时间',
+                finished_at DATETIME(3) DEFAULT NULL COMMENT '结束时间',
+                INDEX idx_status_created_at (status, created_at),
+                INDEX idx_created_at (created_at)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Web任务执行记录表'
+            """
+    
+    def _ensure_connected(self) -> bool:
+        if not self.connection or not self.connection.is_connected():
+            return self.connect()
+        return True
+    
+    def create_task_executions_table(self) -> bool:
+        """
+        创建Web任务执行记录表（已存在时不做任何操作）
+        
+        Returns:
+            bool: 创建成功返回True，否则返回False
+        """
+        if not self._ensure_connected():
+            logger.error("无法创建任务执行记录表，数据库未连接")
+            return False
+        
+        try:
+            self.cursor.execute(self._task_executions_table_sql())
+            return True
+        except MySQLError as err:
+            logger.error(f"创建任务执行记录表失败: {err}")
+            return False
+    
+    def insert_task_execution(self, record: Dict[str, Any]) -> bool:
+        """
+        插入Web任务执行记录
+        
+        Args:
+            record: 列名到值的映射，必须包含 id, command, status, created_at
+            
+        Returns:
+            bool: 成功返回True，失败返回False
+        """
+        if not self._ensure_connected():
+            logger.error("无法插入任务执行记录，数据库未连接")
+            return False
+        
+        try:
+            columns = list(record)
+            query = f"""
+            INSERT INTO {self.table_config['task_executions']} ({', '.join(columns)})
+            VALUES ({', '.join(['%s'] * len(columns))})
+            """
+            self.cursor.execute(query, [record[c] for c in columns])
+            self.connection.commit()
+            return True
+        except MySQLError as err:
+            logger.error(f"插入任务执行记录失败: {err}")
+            self.connection.rollback()
+            return False
+    
+    def update_task_execution(self, execution_id: str, fields: Dict[str, Any]) -> bool:
+        """
+        更新Web任务执行记录
+        
+        Args:
+            execution_id: 执行ID
+            fields: 要更新的列名到值的映射
+            
+        Returns:
+            bool: 成功返回True，失败返回False
+        """
+        if not fields:
+            return True
+        if not self._ensure_connected():
+            logger.error("无法更新任务执行记录，数据库未连接")
+            return False
+        
+        try:
+            assignments = ', '.join(f"{column} = %s" for column in fields)
+            query = f"UPDATE {self.table_config['task_executions']} SET {assignments} WHERE id = %s"
+            self.cursor.execute(query, list(fields.values()) + [execution_id])
+            self.connection.commit()
+            return True
+        except MySQLError as err:
+            logger.error(f"更新任务执行记录失败: {err}")
+            self.connection.rollback()
+            return False
+    
+    def get_task_execution(self, execution_id: str) -> Optional[Dict]:
+        """
+        根据执行ID获取Web任务执行记录（时间列保持为datetime）
+        
+        Returns:
+            Optional[Dict]: 执行记录，未找到返回None
+        """
+        if not self._ensure_connected():
+            logger.error("无法查询任务执行记录，数据库未连接")
+            return None
+        
+        try:
+            query = f"SELECT * FROM {self.table_config['task_executions']} WHERE id = %s"
+            self.cursor.execute(query, (execution_id,))
+            return self.cursor.fetchone()
+        except MySQLError as err:
+            logger.error(f"查询任务执行记录失败: {err}")
+            return None
+    
+    def list_task_executions(self, limit: int = 50, offset: int = 0,
+                             status: Optional[str] = None) -> Tuple[List[Dict], int]:
+        """
+        按创建时间倒序分页获取Web任务执行记录（走 idx_created_at / idx_status_created_at 索引）
+        
+        Args:
+            limit: 每页数量
+            offset: 偏移量
+            status: 只返回该状态的记录，为空时返回全部
+            
+        Returns:
+            Tuple[List[Dict], int]: (当前页记录, 总数)，查询失败返回 ([], 0)
+        """
+        if not self._ensure_connected():
+            logger.error("无法查询任务执行记录，数据库未连接")
+            return [], 0
+        
+        try:
+            where = "WHERE status = %s" if status else ""
+            params = [status] if status else []
+            table = self.table_config['task_executions']
+            
+            self.cursor.execute(f"SELECT COUNT(*) AS total FROM {table} {where}", params)
+            total = self.cursor.fetchone()['total']
+            
+            query = f"""
+            SELECT id, task_id, task_type, command, output_type, use_parse, status,
+                   return_code, error, log_lines, created_at, started_at, finished_at
+            FROM {table} {where}
+            ORDER BY created_at DESC
+            LIMIT %s OFFSET %s
+            """
+            self.cursor.execute(query, params + [limit, offset])
+            return self.cursor.fetchall(), total
+        except MySQLError as err:
+            logger.error(f"查询任务执行记录失败: {err}")
+            return [], 0
+    
+    def mark_interrupted_task_executions(self, finished_at: datetime) -> int:
+        """
+        将未结束（pending/running）的任务执行记录标记为错误（服务重启后这些任务不会再继续执行）
+        
+        Returns:
+            int: 更新的记录数
+        """
+        if not self._ensure_connected():
+            logger.error("无法更新任务执行记录，数据库未连接")
+            return 0
+        
+        try:
+            query = f"""
+            UPDATE {self.table_config['task_executions']}
+            SET status = 'error', error = %s, finished_at = %s
+            WHERE status IN ('pending', 'running')
+            """
+            self.cursor.execute(query, ('服务重启，任务已中断', finished_at))
+            self.connection.commit()
+            return self.cursor.rowcount
+        except MySQLError as err:
+            logger.error(f"更新中断的任务执行记录失败: {err}")
+            self.connection.rollback()
+            return 0
+    
+    def delete_task_execution(self, execution_id: str) -> bool:
+        """
+        删除单条Web任务执行记录
+        
+        Returns:
+            bool: 成功返回True，失败返回False
+        """
+        if not self._ensure_connected():
+            logger.error("无法删除任务执行记录，数据库未连接")
+            return False
+        
+        try:
+            query = f"DELETE FROM {self.table_config['task_executions']} WHERE id = %s"
+            self.cursor.execute(query, (execution_id,))
+            self.connection.commit()
+            return True
+        except MySQLError as err:
+            logger.error(f"删除任务执行记录失败: {err}")
+            self.connection.rollback()
+            return False
+    
+    def delete_task_executions(self, before: Optional[datetime] = None, keep: Optional[int] = None) -> List[str]:
+        """
+        删除已结束的Web任务执行记录
+        
+        Args:
+            before: 删除创建时间早于该时间的记录
+            keep: 最多保留的最新记录数（超出部分按创建时间从旧到新删除）
+            两者都为空时删除全部已结束的记录
+            
+        Returns:
+            List[str]: 被删除记录的日志文件路径（由调用方删除文件）
+        """
+        if not self._ensure_connected():
+            logger.error("无法删除任务执行记录，数据库未连接")
+            return []
+        
+        table = self.table_config['task_executions']
+        try:
+            cutoff = before
+            if keep is not None:
+                # 第 keep+1 新的记录的创建时间，早于等于它的都超出保留数量
+                self.cursor.execute(
+                    f"SELECT created_at FROM {table} ORDER BY created_at DESC LIMIT 1 OFFSET %s", (keep,)
+                )
+                row = self.cursor.fetchone()
+                if row is not None:
+                    overflow = row['created_at']
+                    if cutoff is None or overflow >= cutoff:
+                        # 包含该记录本身
+                        cutoff = overflow + timedelta(microseconds=1)
+            if cutoff is None and (before is not None or keep is not None):
+                return []
+            
+            where = "status NOT IN ('pending', 'running')"
+            params = []
+            if cutoff is not None:
+                where += " AND created_at < %s"
+                params.append(cutoff)
+            
+            self.cursor.execute(f"SELECT log_path FROM {table} WHERE {where}", params)
+            log_paths = [row['log_path'] for row in self.cursor.fetchall() if row['log_path']]
+            self.cursor.execute(f"DELETE FROM {table} WHERE {where}", params)
+            self.connection.commit()
+            logger.info(f"删除任务执行记录 {self.cursor.rowcount} 条")
+            return log_paths
+        except MySQLError as err:
+            logger.error(f"删除任务执行记录失败: {err}")
+            self.connection.rollback()
+            return []
+    
     def insert_task_mapping(self, job_id: str, task_type: str, actual_task_id: str, 
                           relative_path: str, **kwargs) -> Optional[int]:
         """
@@ -182,6 +531,7 @@ class LocalDatabaseConnector:
             
             self.cursor.execute(insert_query, params)
             self.connection.commit()
+            self.invalidate_task_mapping_counts()
             
             # 获取插入或更新的记录ID
             mapping_id = self.cursor.lastrowid
@@ -218,16 +568,22 @@ class LocalDatabaseConnector:
         if not files_info:
             return True
         
+        if not self.ensure_file_details_columns():
+            logger.error("无法插入文件详情，文件详情表结构检查失败")
+            return False
+        
         try:
             # 先删除旧的文件详情记录
             delete_query = f"DELETE FROM {self.table_config['file_details']} WHERE mapping_id = %s"
             self.cursor.execute(delete_query, (mapping_id,))
             
             # 批量插入新的文件详情
+            # 下载时预计算的预览和结构信息一并写入（未提供的字段为NULL，首次查看时补充）
+            metadata_columns = list(FILE_DETAILS_METADATA_COLUMNS)
             insert_query = f"""
             INSERT INTO {self.table_config['file_details']} 
-            (mapping_id, file_name, file_type, file_size, file_path, download_success)
-            VALUES (%s, %s, %s, %s, %s, %s)
+            (mapping_id, file_name, file_type, file_size, file_path, download_success, {', '.join(metadata_columns)})
+            VALUES (%s, %s, %s, %s, %s, %s, {', '.join(['%s'] * len(metadata_columns))})
             """
             
             params_list = []
@@ -239,7 +595,7 @@ class LocalDatabaseConnector:
                     file_info.get('file_size', 0),
                     file_info.get('file_path', ''),
                     file_info.get('download_success', True)
-                )
+                ) + tuple(file_info.get(column) for column in metadata_columns)
                 params_list.append(params)
             
             self.cursor.executemany(insert_query, params_list)
@@ -253,6 +609,171 @@ class LocalDatabaseConnector:
             self.connection.rollback()
             return False
     
+    def ensure_file_details_columns(self) -> bool:
+        """
+        为旧的文件详情表添加预计算文件信息列（每个进程只检查一次）
+        
+        Returns:
+            bool: 列已存在或添加成功返回True
+        """
+        if LocalDatabaseConnector._file_details_columns_checked:
+            return True
+        if not self._ensure_connected():
+            return False
+        
+        try:
+            self.cursor.execute(
+                "SELECT COLUMN_NAME FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                (self.table_config['file_details'],)
+            )
+            existing = {row['COLUMN_NAME'] for row in self.cursor.fetchall()}
+            if not existing:
+                # 表还不存在，由 create_tables 创建
+                return False
+            
+            missing = [column for column in FILE_DETAILS_METADATA_COLUMNS if column not in existing]
+            if missing:
+                additions = ', '.join(f"ADD COLUMN {column} {FILE_DETAILS_METADATA_COLUMNS[column]}"
+                                      for column in missing)
+                self.cursor.execute(f"ALTER TABLE {self.table_config['file_details']} {additions}")
+                logger.info(f"文件详情表已添加列: {', '.join(missing)}")
+            
+            LocalDatabaseConnector._file_details_columns_checked = True
+            return True
+            
+        except MySQLError as err:
+            logger.error(f"检查文件详情表结构失败: {err}")
+            return False
+    
+    def ensure_task_mapping_indexes(self) -> bool:
+        """
+        为旧的任务映射表添加检索索引，并检查 ngram 全文索引是否可用（每个进程只检查一次）
+        
+        Returns:
+            bool: 检查完成返回True（全文索引创建失败时搜索退回 LIKE 扫描，仍返回True）
+        """
+        if LocalDatabaseConnector._task_mapping_indexes_checked:
+            return True
+        if not self._ensure_connected():
+            return False
+        
+        table = self.table_config['task_mapping']
+        try:
+            self.cursor.execute(
+                "SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                (table,)
+            )
+            existing = {row['INDEX_NAME'] for row in self.cursor.fetchall()}
+            if not existing:
+                # 表还不存在，由 create_tables 创建
+                return False
+            
+            for name, definition in TASK_MAPPING_SEARCH_INDEXES.items():
+                if name in existing:
+                    continue
+                try:
+                    if name == 'ft_task_search':
+                        # 不使用停用词表，否则包含 "on"、"is" 等停用词的 ngram 不会进入索引
+                        self.cursor.execute("SET SESSION innodb_ft_enable_stopword = OFF")
+                    self.cursor.execute(f"ALTER TABLE {table} ADD {definition}")
+                    existing.add(name)
+                    logger.info(f"任务映射表已添加索引: {name}")
+                except MySQLError as err:
+                    logger.warning(f"任务映射表添加索引 {name} 失败: {err}")
+            
+            LocalDatabaseConnector._task_search_fulltext = 'ft_task_search' in existing
+            if LocalDatabaseConnector._task_search_fulltext:
+                self.cursor.execute("SELECT @@ngram_token_size AS size")
+                LocalDatabaseConnector._ngram_token_size = int(self.cursor.fetchone()['size'])
+            LocalDatabaseConnector._task_mapping_indexes_checked = True
+            return True
+            
+        except MySQLError as err:
+            logger.error(f"检查任务映射表索引失败: {err}")
+            return False
+    
+    @classmethod
+    def invalidate_task_mapping_counts(cls) -> None:
+        """清空任务映射总数缓存（插入或删除任务映射后调用）"""
+        with cls._count_lock:
+            cls._count_cache.clear()
+    
+    def count_task_mappings(self, search: Optional[str] = None) -> int:
+        """
+        获取任务映射记录总数（结果缓存 TASK_MAPPING_COUNT_TTL 秒）
+        
+        Args:
+            search: 搜索词，与 get_all_task_mappings 的匹配规则相同
+            
+        Returns:
+            int: 记录总数，查询失败返回0
+        """
+        key = search or ''
+        now = time.monotonic()
+        with self._count_lock:
+            cached = self._count_cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+        
+        if not self._ensure_connected():
+            logger.error("无法统计任务映射记录，数据库未连接")
+            return 0
+        self.ensure_task_mapping_indexes()
+        
+        try:
+            where, params, _, _ = build_task_mapping_search(
+                search, self._task_search_fulltext, self._ngram_token_size
+            )
+            self.cursor.execute(
+                f"SELECT COUNT(*) AS total FROM {self.table_config['task_mapping']} tm {where}", params
+            )
+            total = self.cursor.fetchone()['total']
+        except MySQLError as err:
+            logger.error(f"统计任务映射记录失败: {err}")
+            return 0
+        
+        cache = self._count_cache
+        with self._count_lock:
+            cache.pop(key, None)
+            cache[key] = (now + TASK_MAPPING_COUNT_TTL, total)
+            # 写入时清理已过期的搜索词，并限制缓存的搜索词数量
+            while cache and (next(iter(cache.values()))[0] <= now or len(cache) > TASK_MAPPING_COUNT_CACHE_SIZE):
+                cache.popitem(last=False)
+        return total
+    
+    def update_file_metadata(self, file_id: int, metadata: Dict[str, Any]) -> bool:
+        """
+        更新文件的预计算信息（旧记录首次查看时补充）
+        
+        Args:
+            file_id: 文件详情记录ID
+            metadata: FILE_DETAILS_METADATA_COLUMNS 中的字段
+            
+        Returns:
+            bool: 成功返回True，失败返回False
+        """
+        if not self._ensure_connected() or not self.ensure_file_details_columns():
+            return False
+        
+        columns = [column for column in FILE_DETAILS_METADATA_COLUMNS if column in metadata]
+        if not columns:
+            return True
+        
+        try:
+            query = f"""
+            UPDATE {self.table_config['file_details']}
+            SET {', '.join(f'{column} = %s' for column in columns)}
+            WHERE id = %s
+            """
+            self.cursor.execute(query, [metadata[column] for column in columns] + [file_id])
+            self.connection.commit()
+            return True
+            
+        except MySQLError as err:
+            logger.error(f"更新文件预览信息失败: {err}")
+            self.connection.rollback()
+            return False
+    
     def get_task_mapping_by_job_id(self, job_id: str) -> Optional[Dict]:
         """
         根据job_id获取任务映射记录
@@ -290,13 +811,15 @@ class LocalDatabaseConnector:
             logger.error(f"查询任务映射记录失败: {err}")
             return None
     
-    def get_all_task_mappings(self, limit: int = 100, offset: int = 0) -> List[Dict]:
+    def get_all_task_mappings(self, limit: int = 100, offset: int = 0,
+                              search: Optional[str] = None) -> List[Dict]:
         """
-        获取所有任务映射记录
+        获取任务映射记录（按更新时间倒序；有搜索词时在 job_id、actual_task_id、task_type 中匹配，前缀匹配优先）
         
         Args:
             limit: 限制数量
             offset: 偏移量
+            search: 搜索词，为空时返回全部
             
         Returns:
             List[Dict]: 任务映射记录列表
@@ -305,19 +828,24 @@ class LocalDatabaseConnector:
             if not self.connect():
                 logger.error("无法查询记录，数据库未连接")
                 return []
+        self.ensure_task_mapping_indexes()
         
         try:
+            where, params, order, order_params = build_task_mapping_search(
+                search, self._task_search_fulltext, self._ngram_token_size
+            )
+            # 文件数用相关子查询只统计当前页，不再对整张表 JOIN + GROUP BY
             query = f"""
-            SELECT tm.*, 
-                   COUNT(fd.id) as file_details_count
+            SELECT tm.*,
+                   (SELECT COUNT(*) FROM {self.table_config['file_details']} fd
+                    WHERE fd.mapping_id = tm.id) as file_details_count
             FROM {self.table_config['task_mapping']} tm
-            LEFT JOIN {self.table_config['file_details']} fd ON tm.id = fd.mapping_id
-            GROUP BY tm.id
-            ORDER BY tm.updated_at DESC
+            {where}
+            {order}
             LIMIT %s OFFSET %s
             """
             
-            self.cursor.execute(query, (limit, offset))
+            self.cursor.execute(query, params + order_params + [limit, offset])
             results = self.cursor.fetchall()
             
             # 转换时间格式
@@ -333,6 +861,59 @@ class LocalDatabaseConnector:
             logger.error(f"查询所有任务映射记录失败: {err}")
             return []
     
+    def get_task_detail(self, job_id: str) -> Optional[Dict]:
+        """
+        一次查询获取任务映射记录及其文件详情（含预计算的文件预览）
+        
+        Args:
+            job_id: 任务Job ID
+            
+        Returns:
+            Optional[Dict]: 任务映射记录，files 为文件详情列表；未找到返回None
+        """
+        if not self._ensure_connected() or not self.ensure_file_details_columns():
+            logger.error("无法查询任务详情，数据库未连接")
+            return None
+        
+        try:
+            file_columns = ['id', 'mapping_id', 'file_name', 'file_type', 'file_size', 'file_path',
+                            'download_success', 'created_at'] + list(FILE_DETAILS_METADATA_COLUMNS)
+            query = f"""
+            SELECT tm.*, {', '.join(f'fd.{column} AS fd_{column}' for column in file_columns)}
+            FROM {self.table_config['task_mapping']} tm
+            LEFT JOIN {self.table_config['file_details']} fd ON fd.mapping_id = tm.id
+            WHERE tm.job_id = %s
+            ORDER BY fd.file_type, fd.file_name
+            """
+            
+            self.cursor.execute(query, (job_id,))
+            rows = self.cursor.fetchall()
+            if not rows:
+                return None
+            
+            mapping = {key: value for key, value in rows[0].items() if not key.startswith('fd_')}
+            for key in ('created_at', 'updated_at'):
+                if mapping.get(key):
+                    mapping[key] = mapping[key].isoformat()
+            
+            files = []
+            for row in rows:
+                if row['fd_id'] is None:
+                    continue
+                file_info = {column: row[f'fd_{column}'] for column in file_columns}
+                if file_info.get('created_at'):
+                    file_info['created_at'] = file_info['created_at'].isoformat()
+                # MySQL 的 BOOLEAN 读出为 0/1，与现场生成的预览信息统一为布尔值（NULL 保持为 None）
+                if file_info.get('is_empty_json') is not None:
+                    file_info['is_empty_json'] = bool(file_info['is_empty_json'])
+                files.append(file_info)
+            mapping['files'] = files
+            return mapping
+            
+        except MySQLError as err:
+            logger.error(f"查询任务详情失败: {err}")
+            return None
+    
     def get_file_details_by_mapping_id(self, mapping_id: int) -> List[Dict]:
         """
         根据映射ID获取文件详情
@@ -343,31 +924,69 @@ class LocalDatabaseConnector:
         Returns:
             List[Dict]: 文件详情列表
         """
+        return self.get_file_details_by_mapping_ids([mapping_id]).get(mapping_id, [])
+    
+    def get_file_details_by_mapping_ids(self, mapping_ids: List[int]) -> Dict[int, List[Dict]]:
+        """
+        一次查询获取多个任务映射的文件详情（mapping_id IN (...)，走 idx_mapping_id 索引）
+        
+        只返回 FILE_DETAILS_LIST_COLUMNS 中的列，文件预览等预计算信息由 get_task_detail 返回。
+        
+        Args:
+            mapping_ids: 任务映射ID列表
+            
+        Returns:
+            Dict[int, List[Dict]]: 映射ID -> 文件详情列表（没有文件的映射不在结果中）
+        """
+        mapping_ids = list(dict.fromkeys(mapping_id for mapping_id in mapping_ids if mapping_id))
+        if not mapping_ids:
+            return {}
         if not self.connection or not self.connection.is_connected():
             if not self.connect():
                 logger.error("无法查询文件详情，数据库未连接")
-                return []
+                return {}
         
         try:
+            placeholders = ', '.join(['%s'] * len(mapping_ids))
             query = f"""
-            SELECT * FROM {self.table_config['file_details']} 
-            WHERE mapping_id = %s
-            ORDER BY file_type, file_name
+            SELECT {', '.join(FILE_DETAILS_LIST_COLUMNS)} FROM {self.table_config['file_details']} 
+            WHERE mapping_id IN ({placeholders})
+            ORDER BY mapping_id, file_type, file_name
             """
             
-            self.cursor.execute(query, (mapping_id,))
-            results = self.cursor.fetchall()
+            self.cursor.execute(query, mapping_ids)
             
-            # 转换时间格式
-            for result in results:
+            files_by_mapping: Dict[int, List[Dict]] = {}
+            for result in self.cursor.fetchall():
+                # 转换时间格式
                 if result.get('created_at'):
                     result['created_at'] = result['created_at'].isoformat()
+                files_by_mapping.setdefault(result['mapping_id'], []).append(result)
             
-            return results
+            return files_by_mapping
             
         except MySQLError as err:
             logger.error(f"查询文件详情失败: {err}")
-            return []
+            return {}
+    
+    def get_task_mappings_with_files(self, limit: int = 100, offset: int = 0,
+                                     search: Optional[str] = None) -> List[Dict]:
+        """
+        获取一页任务映射记录及其文件详情（固定两次查询，与每页数量无关）
+        
+        Args:
+            limit: 限制数量
+            offset: 偏移量
+            search: 搜索词，与 get_all_task_mappings 相同
+            
+        Returns:
+            List[Dict]: 任务映射记录列表，files 为文件详情列表
+        """
+        mappings = self.get_all_task_mappings(limit=limit, offset=offset, search=search)
+        files_by_mapping = self.get_file_details_by_mapping_ids([mapping.get('id') for mapping in mappings])
+        for mapping in mappings:
+            mapping['files'] = files_by_mapping.get(mapping.get('id'), [])
+        return mappings
     
     def test_connection(self) -> bool:
         """
@@ -0,0 +1,125 @@
+"""
+目录索引模块
+用 os.scandir 列出任务目录下的文件（文件大小和修改时间随目录项一起获取，不再逐个 stat），
+列表按目录的修改时间缓存，目录未变化时只需 stat 一次目录本身
+"""
+import os
+import stat as stat_module
+import threading
+import time
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional
+
+# 缓存的目录数
+DEFAULT_CACHE_SIZE = 1024
+
+# 目录在最近几秒内修改过时不缓存列表：修改时间精度较低的文件系统（如网络挂载）上，
+# 同一时间单位内的后续修改不会改变目录的修改时间
+RACY_WINDOW = 2.0
+
+
+class FileEntry(NamedTuple):
+    """目录中的文件（路径由调用方按传入的目录拼接，缓存不依赖目录的写法）"""
+    name: str
+    size: int
+    mtime: float
+
+
+class DirectoryIndex:
+    """
+    目录文件列表缓存（线程安全，LRU淘汰）
+    
+    目录的修改时间只在增加、删除、重命名文件时变化，原地改写已有文件不会使缓存失效；
+    写入文件的代码在写入后调用 invalidate()
+    """
+    
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE, racy_window: float = RACY_WINDOW):
+        """
+        Args:
+            max_entries: 最多缓存的目录数
+            racy_window: 目录在该秒数内修改过时不缓存
+        """
+        self.max_entries = max_entries
+        self.racy_window = racy_window
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def list_files(self, path, refresh: bool = False) -> List[FileEntry]:
+        """
+        列出目录下的文件（不含子目录），按文件名排序
+        
+        Args:
+            path: 目录路径
+            refresh: 忽略缓存重新扫描
+        
+        Returns:
+            List[FileEntry]: 文件列表
+        
+        Raises:
+            FileNotFoundError: 目录不存在
+            NotADirectoryError: 路径不是目录
+        """
+        path = os.path.abspath(path)
+        dir_stat = os.stat(path)
+        if not stat_module.S_ISDIR(dir_stat.st_mode):
+            raise NotADirectoryError(path)
+        
+        version = (dir_stat.st_mtime_ns, dir_stat.st_ino)
+        if not refresh:
+            with self._lock:
+                cached = self._entries.get(path)
+                if cached is not None and cached[0] == version:
+                    self._entries.move_to_end(path)
+                    self.hits += 1
+                    return list(cached[1])
+        
+        with self._lock:
+            self.misses += 1
+        files = self._scan(path)
+        
+        with self._lock:
+            if time.time() - dir_stat.st_mtime >= self.racy_window:
+                self._entries[path] = (version, tuple(files))
+                self._entries.move_to_end(path)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.pop(path, None)
+        return files
+    
+    def try_list_files(self, path) -> Optional[List[FileEntry]]:
+        """列出目录下的文件，目录不存在或不是目录时返回None"""
+        try:
+            return self.list_files(path)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+    
+    def invalidate(self, path=None) -> None:
+        """清除目录的缓存（不传路径时清除全部）"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(path), None)
+    
+    @staticmethod
+    def _scan(path: str) -> List[FileEntry]:
+        files = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if not entry.is_file():
+                        continue
+                    entry_stat = entry.stat()
+                except FileNotFoundError:
+                    # 扫描过程中被删除
+                    continue
+                files.append(FileEntry(entry.name, entry_stat.st_size, entry_stat.st_mtime))
+        files.sort(key=lambda f: f.name)
+        return files
+
+
+# 进程内共享的目录索引（网页接口、读取器和脚本共用）
+directory_index = DirectoryIndex()
@@ -0,0 +1,300 @@
+"""
+文件内容读取模块
+按文件开头的样本检测编码，检测结果按 (路径, 修改时间, 大小) 缓存；
+读取时只顺序读取一次文件，样本之后出现无法解码的内容时才按完整内容重新检测。
+保持压缩保存的结果文件（如 page_1.html.gz）读取时透明解压
+"""
+import codecs
+import gzip
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import IO, Any, Dict, Optional, Tuple
+
+# 依次尝试的编码（iso-8859-1 能解码任意字节，排在它之后的编码实际上不会用到）
+ENCODINGS_TO_TRY = ['utf-8', 'shift_jis', 'gbk', 'big5', 'iso-8859-1', 'cp1252']
+
+# 检测编码时读取的文件开头字节数
+DEFAULT_SAMPLE_SIZE = 64 * 1024
+
+# 缓存的编码检测结果数
+DEFAULT_CACHE_SIZE = 2048
+
+# 热点文件内容缓存的默认内存上限（字节）
+DEFAULT_CONTENT_CACHE_BYTES = 128 * 1024 * 1024
+
+# 解析后的 JSON 对象占用内存按文本大小的倍数估算
+JSON_SIZE_FACTOR = 4
+
+# 所有编码都无法解码时的标记
+FALLBACK_ENCODING = 'utf-8 (with errors ignored)'
+
+# 保持压缩保存的文件后缀（解压后的文件名加上该后缀）
+COMPRESSED_SUFFIX = '.gz'
+
+# 可以保持压缩保存的文本文件类型
+TEXT_SUFFIXES = ('.html', '.htm', '.json', '.txt')
+
+# Python 编码名与 HTTP Content-Type charset 不一致的部分
+HTTP_CHARSETS = {
+    'utf-8-sig': 'utf-8',
+    'cp1252': 'windows-1252',
+}
+
+
+def is_compressed_text(path: str) -> bool:
+    """是否为保持压缩保存的文本文件（如 page_1.html.gz）"""
+    path = str(path).lower()
+    return path.endswith(COMPRESSED_SUFFIX) and path[:-len(COMPRESSED_SUFFIX)].endswith(TEXT_SUFFIXES)
+
+
+def logical_name(name: str) -> str:
+    """保持压缩保存的文件对外显示的文件名（去掉 .gz 后缀），其他文件不变"""
+    return name[:-len(COMPRESSED_SUFFIX)] if is_compressed_text(name) else name
+
+
+def resolve_stored_file(path: str) -> Tuple[str, bool]:
+    """
+    查找文件的实际保存位置
+    
+    文件不存在但有保持压缩保存的 path + '.gz' 时使用压缩文件
+    
+    Returns:
+        tuple: (实际路径, 是否为压缩保存)
+    """
+    path = str(path)
+    if not os.path.exists(path) and path.lower().endswith(TEXT_SUFFIXES):
+        compressed_path = path + COMPRESSED_SUFFIX
+        if os.path.isfile(compressed_path):
+            return compressed_path, True
+    return path, is_compressed_text(path)
+
+
+def open_stored(path: str) -> IO[bytes]:
+    """以二进制方式打开文件，保持压缩保存的文件透明解压"""
+    path = str(path)
+    return gzip.open(path, 'rb') if is_compressed_text(path) else open(path, 'rb')
+
+
+def sniff_encoding(sample: bytes, complete: bool = False) -> Optional[str]:
+    """
+    根据字节样本检测编码
+    
+    Args:
+        sample: 文件开头的字节
+        complete: 样本是否为完整文件（否则允许末尾有被截断的多字节字符）
+    
+    Returns:
+        Optional[str]: 编码名，都无法解码时为None
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    for encoding in ENCODINGS_TO_TRY:
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=complete)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+def http_charset(encoding: Optional[str]) -> Optional[str]:
+    """编码名转换为 Content-Type 的 charset（未检测出编码时为None）"""
+    if encoding is None or encoding == FALLBACK_ENCODING:
+        return None
+    return HTTP_CHARSETS.get(encoding, encoding)
+
+
+class EncodingCache:
+    """文件编码检测结果缓存（线程安全，LRU淘汰）"""
+    
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE, sample_size: int = DEFAULT_SAMPLE_SIZE):
+        """
+        Args:
+            max_entries: 最多缓存的文件数
+            sample_size: 检测编码时读取的字节数
+        """
+        self.max_entries = max_entries
+        self.sample_size = sample_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def _key(path: str, stat: os.stat_result) -> Tuple:
+        return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    
+    def get(self, path: str, stat: Optional[os.stat_result] = None) -> str:
+        """
+        获取文件编码（文件修改后重新检测）
+        
+        Returns:
+            str: 编码名，无法检测时为 FALLBACK_ENCODING
+        """
+        stat = stat or os.stat(path)
+        key = self._key(path, stat)
+        with self._lock:
+            encoding = self._entries.get(key)
+            if encoding is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return encoding
+            self.misses += 1
+        
+        with open_stored(path) as f:
+            sample = f.read(self.sample_size)
+        # 读到的内容少于样本大小说明已读完整个文件
+        encoding = sniff_encoding(sample, complete=len(sample) < self.sample_size) or FALLBACK_ENCODING
+        self.put(path, stat, encoding)
+        return encoding
+    
+    def put(self, path: str, stat: os.stat_result, encoding: str) -> None:
+        key = self._key(path, stat)
+        with self._lock:
+            self._entries[key] = encoding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def read_text(self, path: str) -> Tuple[str, str]:
+        """
+        读取文本文件（只读取一次文件，压缩保存的文件透明解压）
+        
+        Returns:
+            tuple: (文件内容, 使用的编码)
+        """
+        stat = os.stat(path)
+        encoding = self.get(path, stat)
+        with open_stored(path) as f:
+            data = f.read()
+        
+        if encoding != FALLBACK_ENCODING:
+            try:
+                return data.decode(encoding), encoding
+            except UnicodeDecodeError:
+                # 样本之后出现了该编码无法解码的内容，按完整内容重新检测
+                encoding = sniff_encoding(data, complete=True) or FALLBACK_ENCODING
+                self.put(path, stat, encoding)
+                if encoding != FALLBACK_ENCODING:
+                    return data.decode(encoding), encoding
+        
+        return data.decode('utf-8', errors='ignore'), encoding
+
+
+class _ContentEntry:
+    """缓存的文件内容：解码后的文本，需要时再解析 JSON"""
+    
+    __slots__ = ('key', 'text', 'encoding', 'parsed', 'error', 'size')
+    
+    def __init__(self, key: Tuple, text: str, encoding: str):
+        self.key = key
+        self.text = text
+        self.encoding = encoding
+        self.parsed = None
+        self.error = None
+        self.size = sys.getsizeof(text)
+
+
+class FileContentCache:
+    """
+    热点文件内容缓存（线程安全）
+    
+    按 (路径, 修改时间, 大小) 缓存解码后的文本和解析后的 JSON，按估算的内存占用LRU淘汰；
+    同一任务的文件在看板、对比查看中反复打开时不再读取磁盘和解码
+    """
+    
+    def __init__(self, max_bytes: int = DEFAULT_CONTENT_CACHE_BYTES,
+                 encoding_cache: Optional[EncodingCache] = None, max_entry_bytes: Optional[int] = None):
+        """
+        Args:
+            max_bytes: 缓存内容的估算内存上限（字节）
+            encoding_cache: 读取文件时使用的编码检测缓存
+            max_entry_bytes: 单个文件的上限，更大的文件不缓存（默认为总上限的1/8）
+        """
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 8
+        self.encoding_cache = encoding_cache or EncodingCache()
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def _entry(self, path: str) -> _ContentEntry:
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        
+        entry = _ContentEntry(key, *self.encoding_cache.read_text(path))
+        with self._lock:
+            if key not in self._entries and entry.size <= self.max_entry_bytes:
+                self._entries[key] = entry
+                self._size += entry.size
+                self._evict()
+        return entry
+    
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.size
+            self.evictions += 1
+    
+    def read_text(self, path: str) -> Tuple[str, str]:
+        """
+        读取文本文件（与 EncodingCache.read_text 相同）
+        
+        Returns:
+            tuple: (文件内容, 使用的编码)
+        """
+        entry = self._entry(path)
+        return entry.text, entry.encoding
+    
+    def read_json(self, path: str) -> Any:
+        """
+        读取并解析 JSON 文件（解析结果随文本一起缓存，调用方不应修改返回的对象）
+        
+        Raises:
+            ValueError: 内容不是有效的 JSON
+        """
+        entry = self._entry(path)
+        if entry.parsed is None and entry.error is None:
+            try:
+                parsed = json.loads(entry.text)
+            except ValueError as e:
+                entry.error = e
+            else:
+                entry.parsed = (parsed,)
+                with self._lock:
+                    # 未缓存或已被淘汰的条目不再计入
+                    if self._entries.get(entry.key) is entry:
+                        growth = len(entry.text) * JSON_SIZE_FACTOR
+                        entry.size += growth
+                        self._size += growth
+                        self._evict()
+        if entry.error is not None:
+            raise ValueError(str(entry.error))
+        return entry.parsed[0]
+    
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计（条目数、估算内存、命中率等）"""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / requests, 4) if requests else None
+            }
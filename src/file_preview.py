@@ -0,0 +1,113 @@
+"""
+文件预览模块
+下载完成登记任务映射时计算每个文件的内容预览、行数和JSON结构，保存到文件详情表，
+任务详情接口直接读取，不再打开文件
+"""
+import json
+import os
+from typing import Any, Dict, Optional
+
+from src.file_content import logical_name, open_stored, resolve_stored_file, sniff_encoding
+
+# 各类型文件的预览长度（字符）
+JSON_PREVIEW_LENGTH = 1000
+HTML_PREVIEW_LENGTH = 500
+TEXT_PREVIEW_LENGTH = 300
+
+# 预计算的文件信息字段（文件详情表中的列）
+METADATA_FIELDS = ('preview', 'preview_type', 'line_count', 'json_type', 'json_length',
+                   'is_empty_json', 'empty_json_type')
+
+
+def json_empty_type(parsed: Any) -> Optional[str]:
+    """
+    判断解析后的JSON内容是否为空
+    
+    Returns:
+        Optional[str]: empty_string、empty_object、empty_array、null，不为空时返回None
+    """
+    if parsed == "":
+        return "empty_string"
+    if parsed == {}:
+        return "empty_object"
+    if parsed == []:
+        return "empty_array"
+    if parsed is None:
+        return "null"
+    return None
+
+
+def json_type(parsed: Any) -> str:
+    """JSON顶层类型"""
+    if isinstance(parsed, dict):
+        return 'object'
+    if isinstance(parsed, list):
+        return 'array'
+    if isinstance(parsed, str):
+        return 'string'
+    if isinstance(parsed, bool):
+        return 'boolean'
+    if parsed is None:
+        return 'null'
+    return 'number'
+
+
+def _truncate(text: str, length: int, ellipsis: bool = True) -> str:
+    if len(text) <= length:
+        return text
+    return text[:length] + ('...' if ellipsis else '')
+
+
+def _is_binary(data: bytes) -> bool:
+    """是否为二进制内容（如 raw 输出类型保存的原始 .gz 文件）"""
+    return data.startswith(b'\x1f\x8b') or b'\x00' in data[:1024]
+
+
+def build_file_metadata(file_path: str, file_name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    计算文件的预览和结构信息（保持压缩保存的文件透明解压）
+    
+    Args:
+        file_path: 文件路径
+        file_name: 文件名，默认取路径中的文件名
+    
+    Returns:
+        dict: METADATA_FIELDS 中的字段；文件不存在或无法解析时 preview_type 为 'error'
+    """
+    metadata = dict.fromkeys(METADATA_FIELDS)
+    file_path, _ = resolve_stored_file(file_path)
+    if not os.path.exists(file_path):
+        metadata.update(preview='文件不存在', preview_type='error')
+        return metadata
+    
+    file_name = logical_name(file_name or os.path.basename(file_path))
+    try:
+        with open_stored(file_path) as f:
+            data = f.read()
+        metadata['line_count'] = data.count(b'\n') + (1 if data and not data.endswith(b'\n') else 0)
+        if _is_binary(data):
+            metadata.update(preview='二进制文件，无法预览', preview_type='error')
+            return metadata
+        
+        encoding = sniff_encoding(data, complete=True)
+        text = data.decode(encoding) if encoding else data.decode('utf-8', errors='ignore')
+        
+        if file_name.endswith('.json'):
+            parsed = json.loads(text)
+            empty_type = json_empty_type(parsed)
+            metadata.update(
+                preview=_truncate(json.dumps(parsed, indent=2, ensure_ascii=False), JSON_PREVIEW_LENGTH, False),
+                preview_type='json',
+                json_type=json_type(parsed),
+                json_length=len(parsed) if isinstance(parsed, (dict, list, str)) else None,
+                is_empty_json=empty_type is not None,
+                empty_json_type=empty_type
+            )
+        elif file_name.endswith('.html'):
+            metadata.update(preview=_truncate(text, HTML_PREVIEW_LENGTH), preview_type='html')
+        else:
+            metadata.update(preview=_truncate(text, TEXT_PREVIEW_LENGTH), preview_type='text')
+    except Exception as e:
+        metadata.update(preview=f'预览失败: {str(e)}', preview_type='error')
+    
+    return metadata
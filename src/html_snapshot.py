@@ -0,0 +1,203 @@
+"""
+HTML精简快照模块
+对比查看时不再加载完整的抓取页面（脚本、样式、跟踪代码），而是使用 lxml 生成的精简版本：
+去掉脚本、样式和隐藏节点，资源地址改为页面原站点的绝对地址，压缩空白。
+每个文件只生成一次，按 (路径, 修改时间, 大小) 保存在缓存目录
+"""
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from typing import Optional, Union
+from urllib.parse import urljoin, urlsplit
+
+from src.file_content import EncodingCache, FileContentCache
+
+# 精简快照的默认缓存目录
+DEFAULT_CACHE_DIR = 'data/cache/lite_html'
+
+# 整个删除的元素
+REMOVED_TAGS = (
+    'script', 'noscript', 'style', 'link', 'meta', 'base', 'template',
+    'iframe', 'frame', 'frameset', 'object', 'embed', 'applet',
+    'video', 'audio', 'source', 'track', 'canvas'
+)
+
+# 页面通过样式类隐藏的元素（如 Amazon 价格的屏幕阅读器文本）
+HIDDEN_CLASSES = {'a-offscreen', 'aok-hidden', 'a-hidden', 'hidden', 'sr-only'}
+
+# 保留的属性（其余如 class、style、data-*、on* 事件全部删除）
+KEPT_ATTRIBUTES = {
+    'href', 'src', 'alt', 'title', 'id', 'colspan', 'rowspan', 'width', 'height',
+    'lang', 'dir', 'type', 'value', 'checked', 'selected', 'disabled', 'start'
+}
+
+# 保留原样空白的元素
+PREFORMATTED_TAGS = {'pre', 'textarea', 'code'}
+
+# 精简页面使用的基本样式
+LITE_STYLE = (
+    'body{font-family:-apple-system,"Segoe UI",sans-serif;font-size:14px;line-height:1.5;margin:12px;color:#222}'
+    'img{max-width:100%;height:auto}table{border-collapse:collapse}td,th{padding:2px 4px;vertical-align:top}'
+)
+
+_HIDDEN_STYLE_RE = re.compile(r'display\s*:\s*none|visibility\s*:\s*hidden', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _is_hidden(element) -> bool:
+    if element.get('hidden') is not None:
+        return True
+    if element.tag == 'input' and (element.get('type') or '').lower() == 'hidden':
+        return True
+    if _HIDDEN_STYLE_RE.search(element.get('style') or ''):
+        return True
+    return bool(HIDDEN_CLASSES.intersection((element.get('class') or '').split()))
+
+
+def _is_tracking_pixel(element) -> bool:
+    return element.tag == 'img' and element.get('width') in ('0', '1') and element.get('height') in ('0', '1')
+
+
+def _page_url(document) -> Optional[str]:
+    """页面原地址（<base>、canonical 链接或 og:url），用于把相对的资源地址改为绝对地址"""
+    for xpath in ('//base/@href', '//link[@rel="canonical"]/@href', '//meta[@property="og:url"]/@content'):
+        values = document.xpath(xpath)
+        if values and urlsplit(values[0]).scheme in ('http', 'https'):
+            return values[0]
+    return None
+
+
+def _rewrite_url(url: str, base_url: Optional[str]) -> Optional[str]:
+    """资源地址改为绝对地址；无法确定原站点的相对地址和脚本地址返回None（删除）"""
+    url = url.strip()
+    if url.startswith('//'):
+        return 'https:' + url
+    scheme = urlsplit(url).scheme.lower()
+    if scheme in ('http', 'https', 'data') or url.startswith('#'):
+        return url
+    if scheme:
+        # javascript: 等
+        return None
+    return urljoin(base_url, url) if base_url else None
+
+
+def build_lite_html(text: str) -> bytes:
+    """
+    生成页面的精简版本
+    
+    Args:
+        text: 页面HTML（已解码）
+    
+    Returns:
+        bytes: UTF-8 编码的精简HTML
+    """
+    import lxml.html
+    from lxml import etree
+    
+    parser = lxml.html.HTMLParser(remove_comments=True, remove_pis=True)
+    document = lxml.html.document_fromstring(text, parser=parser)
+    base_url = _page_url(document)
+    title = document.findtext('.//title')
+    
+    etree.strip_elements(document, *REMOVED_TAGS, with_tail=False)
+    for element in list(document.iter()):
+        if not isinstance(element.tag, str):
+            continue
+        if element.getparent() is not None and (_is_hidden(element) or _is_tracking_pixel(element)):
+            element.drop_tree()
+            continue
+        
+        for name in list(element.attrib):
+            if name not in KEPT_ATTRIBUTES:
+                del element.attrib[name]
+        for name in ('href', 'src'):
+            if name in element.attrib:
+                url = _rewrite_url(element.get(name), base_url)
+                if url is None:
+                    del element.attrib[name]
+                else:
+                    element.set(name, url)
+        if element.tag == 'img':
+            element.set('loading', 'lazy')
+    
+    # 压缩空白（保留 pre 等元素中的原样空白）
+    for element in document.iter():
+        if not isinstance(element.tag, str):
+            continue
+        if any(ancestor.tag in PREFORMATTED_TAGS for ancestor in element.iterancestors()):
+            continue
+        if element.text and element.tag not in PREFORMATTED_TAGS:
+            element.text = _WHITESPACE_RE.sub(' ', element.text)
+        if element.tail:
+            element.tail = _WHITESPACE_RE.sub(' ', element.tail)
+    
+    head = document.find('head')
+    if head is None:
+        head = etree.Element('head')
+        document.insert(0, head)
+    head.clear()
+    etree.SubElement(head, 'meta', charset='utf-8')
+    if title:
+        etree.SubElement(head, 'title').text = _WHITESPACE_RE.sub(' ', title).strip()
+    etree.SubElement(head, 'style').text = LITE_STYLE
+    
+    return lxml.html.tostring(document, encoding='utf-8', method='html', doctype='<!DOCTYPE html>')
+
+
+class LiteHtmlCache:
+    """精简快照的磁盘缓存（文件修改后重新生成，旧的快照随之删除）"""
+    
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR,
+                 reader: Optional[Union[EncodingCache, FileContentCache]] = None):
+        """
+        Args:
+            cache_dir: 保存精简快照的目录
+            reader: 读取原始页面使用的缓存（提供 read_text）
+        """
+        self.cache_dir = cache_dir
+        self.reader = reader or EncodingCache()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, path: str) -> str:
+        """
+        获取页面的精简快照路径（不存在时生成）
+        
+        Args:
+            path: 原始页面路径（保持压缩保存的文件透明解压）
+        
+        Returns:
+            str: 精简快照的文件路径
+        """
+        stat = os.stat(path)
+        prefix = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()
+        snapshot = os.path.join(self.cache_dir, f'{prefix}-{stat.st_mtime_ns:x}-{stat.st_size:x}.html')
+        if os.path.exists(snapshot):
+            with self._lock:
+                self.hits += 1
+            return snapshot
+        
+        text, _ = self.reader.read_text(path)
+        data = build_lite_html(text)
+        
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # 先写入临时文件再重命名，并发请求不会读到写了一半的快照
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, snapshot)
+        
+        # 删除同一页面的旧版本快照
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(f'{prefix}-') and name != os.path.basename(snapshot):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    pass
+        
+        with self._lock:
+            self.misses += 1
+        return snapshot
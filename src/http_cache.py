@@ -0,0 +1,258 @@
+"""
+HTTP缓存和压缩模块
+文件响应的 ETag/Last-Modified 由修改时间和大小生成，压缩后的文件内容按文件缓存；
+接口响应按 Accept-Encoding 协商 br/gzip 压缩，GET 接口按响应内容生成 ETag 并处理 304
+"""
+import gzip
+import hashlib
+import io
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from flask import Response, request, send_file
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+# 小于该字节数的响应不压缩
+DEFAULT_MIN_SIZE = 1024
+
+# gzip 压缩级别（brotli 使用对应的 quality）
+DEFAULT_COMPRESS_LEVEL = 6
+
+# 压缩后的文件内容缓存上限（字节）
+DEFAULT_VARIANT_CACHE_BYTES = 64 * 1024 * 1024
+
+# 值得压缩的类型（text/* 之外）
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml'
+}
+
+
+def is_compressible(mimetype: Optional[str]) -> bool:
+    if not mimetype:
+        return False
+    # 推送流需要逐条发送，不能压缩缓冲
+    if mimetype == 'text/event-stream':
+        return False
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_MIMETYPES
+
+
+def negotiate_encoding(accept_encodings) -> Optional[str]:
+    """
+    按 Accept-Encoding 选择压缩方式
+    
+    Args:
+        accept_encodings: werkzeug 的 Accept 对象（request.accept_encodings）
+    
+    Returns:
+        Optional[str]: 'br'、'gzip'，客户端不接受压缩时为None
+    """
+    if BROTLI_AVAILABLE and accept_encodings.quality('br') > 0:
+        return 'br'
+    if accept_encodings.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+
+def compress_bytes(data: bytes, encoding: str, level: int = DEFAULT_COMPRESS_LEVEL) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(level, 11))
+    # mtime=0 使相同内容的压缩结果相同
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def file_etag(stat: os.stat_result, encoding: Optional[str] = None) -> str:
+    """由文件修改时间和大小生成 ETag（不含引号，压缩内容带压缩方式后缀）"""
+    etag = f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+    return f'{etag}-{encoding}' if encoding else etag
+
+
+def content_etag(*parts) -> str:
+    """由缓存版本、请求参数等生成 ETag"""
+    return hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+class CompressedFileCache:
+    """压缩后的文件内容缓存（按路径、修改时间、大小和压缩方式，按总字节数LRU淘汰）"""
+    
+    def __init__(self, max_bytes: int = DEFAULT_VARIANT_CACHE_BYTES, level: int = DEFAULT_COMPRESS_LEVEL):
+        """
+        Args:
+            max_bytes: 缓存的压缩内容总字节数上限
+            level: 压缩级别
+        """
+        self.max_bytes = max_bytes
+        self.level = level
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, path: str, stat: os.stat_result, encoding: str) -> bytes:
+        """获取文件的压缩内容（文件修改后重新压缩）"""
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, encoding)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+            self.misses += 1
+        
+        with open(path, 'rb') as f:
+            data = compress_bytes(f.read(), encoding, self.level)
+        
+        with self._lock:
+            if len(data) <= self.max_bytes and key not in self._entries:
+                self._entries[key] = data
+                self._size += len(data)
+                while self._size > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._size -= len(evicted)
+        return data
+
+
+class HTTPCache:
+    """Flask 应用的条件请求和压缩处理"""
+    
+    def __init__(self, app=None, min_size: int = DEFAULT_MIN_SIZE, level: int = DEFAULT_COMPRESS_LEVEL,
+                 variant_cache_bytes: int = DEFAULT_VARIANT_CACHE_BYTES):
+        """
+        Args:
+            app: Flask 应用（传入时立即注册）
+            min_size: 小于该字节数的响应不压缩
+            level: 压缩级别
+            variant_cache_bytes: 压缩后的文件内容缓存上限（字节）
+        """
+        self.min_size = min_size
+        self.level = level
+        self.files = CompressedFileCache(variant_cache_bytes, level)
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app) -> None:
+        app.after_request(self.process_response)
+    
+    def send_file(self, path, mimetype: Optional[str] = None, charset: Optional[str] = None,
+                  stored_gzip: bool = False, **kwargs) -> Response:
+        """
+        发送文件：ETag/Last-Modified 由修改时间和大小生成，客户端接受压缩时发送缓存的压缩内容
+        
+        Range 请求和不值得压缩的文件直接交给 send_file（支持分段读取）
+        
+        Args:
+            path: 文件路径
+            mimetype: 内容类型
+            charset: 文本文件的编码（写入 Content-Type）
+            stored_gzip: 文件是否为内容的gzip压缩（保持压缩保存的结果文件）
+            **kwargs: 传给 flask.send_file 的其他参数（as_attachment、download_name 等）
+        """
+        path = str(path)
+        stat = os.stat(path)
+        if stored_gzip:
+            if mimetype is None:
+                mimetype = mimetypes.guess_type(kwargs.get('download_name') or path[:-len('.gz')])[0]
+            response = self._send_stored_gzip(path, stat, mimetype, **kwargs)
+        else:
+            response = self._send_plain(path, stat, mimetype, **kwargs)
+            mimetype = response.mimetype
+        
+        if charset and mimetype:
+            # send_file 默认声明 utf-8
+            response.headers['Content-Type'] = f'{mimetype}; charset={charset}'
+        if is_compressible(mimetype):
+            response.vary.add('Accept-Encoding')
+        return response
+    
+    def _send_stored_gzip(self, path: str, stat: os.stat_result, mimetype: Optional[str], **kwargs) -> Response:
+        """客户端接受 gzip 时直接发送压缩文件，否则（或 Range 请求）解压后发送"""
+        if request.range is None and request.accept_encodings.quality('gzip') > 0:
+            response = send_file(path, mimetype=mimetype, conditional=True, etag=file_etag(stat, 'gzip'),
+                                 last_modified=stat.st_mtime, **kwargs)
+            response.headers['Content-Encoding'] = 'gzip'
+            return response
+        
+        with gzip.open(path, 'rb') as f:
+            data = f.read()
+        return send_file(io.BytesIO(data), mimetype=mimetype, conditional=True, etag=file_etag(stat),
+                         last_modified=stat.st_mtime, **kwargs)
+    
+    def _send_plain(self, path: str, stat: os.stat_result, mimetype: Optional[str], **kwargs) -> Response:
+        if mimetype is None:
+            guessed, compressed = mimetypes.guess_type(kwargs.get('download_name') or path)
+            # .gz 等已压缩文件不再压缩，类型交给 send_file 判断
+            mimetype = None if compressed else guessed
+        encoding = None
+        if request.range is None and stat.st_size >= self.min_size and is_compressible(mimetype):
+            encoding = negotiate_encoding(request.accept_encodings)
+        
+        if encoding is None:
+            response = send_file(path, mimetype=mimetype, conditional=True, etag=file_etag(stat),
+                                 last_modified=stat.st_mtime, **kwargs)
+        else:
+            response = send_file(path, mimetype=mimetype, conditional=False, etag=False,
+                                 last_modified=stat.st_mtime, **kwargs)
+            # 发送缓存的压缩内容，send_file 打开的文件不再需要
+            response.response.close()
+            response.direct_passthrough = False
+            response.set_etag(file_etag(stat, encoding))
+            response.make_conditional(request)
+            if response.status_code == 200:
+                response.set_data(self.files.get(path, stat, encoding))
+                response.headers['Content-Encoding'] = encoding
+        return response
+    
+    def process_response(self, response: Response) -> Response:
+        """GET 接口按响应内容生成 ETag 并处理 304；按 Accept-Encoding 压缩响应"""
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers or not is_compressible(response.mimetype)):
+            return response
+        
+        response.vary.add('Accept-Encoding')
+        encoding = None
+        if response.content_length is not None and response.content_length >= self.min_size:
+            encoding = negotiate_encoding(request.accept_encodings)
+        
+        # 接口已设置的 ETag（如由缓存版本生成）保留，GET 接口没有时按响应内容生成；压缩内容带压缩方式后缀
+        etag, weak = response.get_etag()
+        conditional = request.method in ('GET', 'HEAD')
+        if conditional and not etag:
+            etag, weak = hashlib.sha1(response.get_data()).hexdigest(), False
+        if etag:
+            response.set_etag(f'{etag}-{encoding}' if encoding else etag, weak)
+        if conditional:
+            response.make_conditional(request)
+            if response.status_code == 304:
+                return response
+        
+        if encoding is not None:
+            response.set_data(compress_bytes(response.get_data(), encoding, self.level))
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+
+def etag_matches(etag: str) -> bool:
+    """请求的 If-None-Match 是否包含该 ETag（压缩后的 ETag 带压缩方式后缀，也视为匹配）"""
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return False
+    return any(tag == etag or tag.startswith(f'{etag}-') for tag in if_none_match.as_set())
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    return response
@@ -0,0 +1,249 @@
+"""
+Web任务队列模块
+有界的任务队列：固定数量的工作线程、交互任务优先于批量任务、
+同一优先级内按公平键（租户/任务类型）轮转调度，并统计队列深度和等待时间
+"""
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 优先级（数值越小越先执行）
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: 'interactive',
+    PRIORITY_BULK: 'bulk'
+}
+
+# 等待时间统计保留的最近任务数
+METRICS_WINDOW = 500
+
+
+class QueueFullError(Exception):
+    """队列已满，拒绝新的任务"""
+    pass
+
+
+class Job:
+    """队列中的一个任务"""
+    
+    _ids = itertools.count(1)
+    
+    def __init__(self, fn: Callable, priority: int, fairness_key: str, name: str):
+        self.id = next(self._ids)
+        self.fn = fn
+        self.priority = priority
+        self.fairness_key = fairness_key
+        self.name = name
+        self.future = Future()
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+    
+    @property
+    def wait_time(self) -> Optional[float]:
+        """排队等待时间（秒），未开始执行时为已等待时间"""
+        return (self.started_at or time.time()) - self.submitted_at
+
+
+class _FairQueue:
+    """同一优先级内的公平队列：每个公平键一个子队列，按键轮转出队"""
+    
+    def __init__(self):
+        self._queues = OrderedDict()
+        self.size = 0
+    
+    def push(self, job: Job) -> None:
+        self._queues.setdefault(job.fairness_key, deque()).append(job)
+        self.size += 1
+    
+    def pop(self) -> Job:
+        key, jobs = next(iter(self._queues.items()))
+        job = jobs.popleft()
+        # 取出后将该键移到末尾，下一次轮到其他键
+        del self._queues[key]
+        if jobs:
+            self._queues[key] = jobs
+        self.size -= 1
+        return job
+    
+    def depth_by_key(self) -> Dict[str, int]:
+        return {key: len(jobs) for key, jobs in self._queues.items()}
+
+
+class JobQueue:
+    """有界优先级任务队列"""
+    
+    def __init__(self, max_workers: int = 4, max_pending: int = 200, name: str = 'job-queue'):
+        """
+        初始化任务队列并启动工作线程
+        
+        Args:
+            max_workers: 同时执行的任务数
+            max_pending: 最多排队的任务数，超出时提交会抛出 QueueFullError
+            name: 工作线程名前缀
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._queues = {priority: _FairQueue() for priority in PRIORITY_NAMES}
+        self._condition = threading.Condition()
+        self._running = 0
+        self._shutdown = False
+        
+        # 统计信息
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_times = {priority: deque(maxlen=METRICS_WINDOW) for priority in PRIORITY_NAMES}
+        self._run_times = deque(maxlen=METRICS_WINDOW)
+        
+        self._workers = []
+        for i in range(max_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f'{name}-{i + 1}', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+    
+    @property
+    def pending(self) -> int:
+        return sum(queue.size for queue in self._queues.values())
+    
+    def submit(self, fn: Callable, priority: int = PRIORITY_INTERACTIVE,
+               fairness_key: str = 'default', name: str = '') -> Job:
+        """
+        提交任务
+        
+        Args:
+            fn: 任务函数（无参数），返回值作为 job.future 的结果
+            priority: PRIORITY_INTERACTIVE 或 PRIORITY_BULK
+            fairness_key: 公平调度键（如租户或任务类型），同优先级内不同键轮转执行
+            name: 任务名（用于日志）
+        
+        Returns:
+            Job: 任务对象
+        
+        Raises:
+            QueueFullError: 排队任务数已达上限
+        """
+        if priority not in self._queues:
+            raise ValueError(f'无效的优先级: {priority}')
+        
+        job = Job(fn, priority, fairness_key, name)
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError('任务队列已关闭')
+            if self.pending >= self.max_pending:
+                self._rejected += 1
+                raise QueueFullError(f'任务队列已满（{self.max_pending} 个任务排队中），请稍后重试')
+            self._queues[priority].push(job)
+            self._submitted += 1
+            self._condition.notify()
+        
+        logger.info(f"任务入队: {name or job.id}（{PRIORITY_NAMES[priority]}/{fairness_key}），"
+                    f"排队 {self.pending}，执行中 {self._running}")
+        return job
+    
+    def position(self, job: Job) -> Optional[int]:
+        """任务在队列中的大致位置（从1开始，已开始执行返回None）"""
+        with self._condition:
+            if job.started_at is not None:
+                return None
+            ahead = sum(q.size for p, q in self._queues.items() if p < job.priority)
+            queue = self._queues[job.priority]
+            ahead += sum(1 for jobs in queue._queues.values() for queued in jobs if queued.id < job.id)
+            return ahead + 1
+    
+    def _next_job(self) -> Optional[Job]:
+        for priority in sorted(self._queues):
+            if self._queues[priority].size:
+                return self._queues[priority].pop()
+        return None
+    
+    def _worker_loop(self) -> None:
+        while True:
+            with self._condition:
+                job = self._next_job()
+                while job is None:
+                    if self._shutdown:
+                        return
+                    self._condition.wait()
+                    job = self._next_job()
+                self._running += 1
+                job.started_at = time.time()
+                self._wait_times[job.priority].append(job.started_at - job.submitted_at)
+            
+            if job.future.set_running_or_notify_cancel():
+                try:
+                    job.future.set_result(job.fn())
+                except Exception as e:
+                    logger.error(f"任务执行失败: {job.name or job.id} - {str(e)}")
+                    job.future.set_exception(e)
+            
+            with self._condition:
+                job.finished_at = time.time()
+                self._running -= 1
+                self._run_times.append(job.finished_at - job.started_at)
+                if not job.future.cancelled() and job.future.exception() is None:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+    
+    def metrics(self) -> Dict:
+        """
+        队列统计信息
+        
+        Returns:
+            dict: 队列深度（按优先级和公平键）、执行中任务数、累计数量、最近任务的等待/执行时间
+        """
+        with self._condition:
+            depth = {PRIORITY_NAMES[p]: q.size for p, q in self._queues.items()}
+            depth_by_key = {PRIORITY_NAMES[p]: q.depth_by_key() for p, q in self._queues.items()}
+            oldest_wait = max((time.time() - jobs[0].submitted_at
+                               for q in self._queues.values() for jobs in q._queues.values()), default=0.0)
+            wait_times = {PRIORITY_NAMES[p]: _summarize(times) for p, times in self._wait_times.items()}
+            run_times = _summarize(self._run_times)
+            return {
+                'max_workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'running': self._running,
+                'pending': sum(depth.values()),
+                'depth': depth,
+                'depth_by_key': depth_by_key,
+                'oldest_wait_seconds': round(oldest_wait, 3),
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+                'wait_seconds': wait_times,
+                'run_seconds': run_times
+            }
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """停止接收任务，排队中的任务执行完后工作线程退出"""
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+
+def _summarize(values) -> Dict[str, float]:
+    """计算平均值、P95和最大值"""
+    if not values:
+        return {'count': 0, 'avg': 0.0, 'p95': 0.0, 'max': 0.0}
+    ordered = sorted(values)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {
+        'count': len(ordered),
+        'avg': round(sum(ordered) / len(ordered), 3),
+        'p95': round(p95, 3),
+        'max': round(ordered[-1], 3)
+    }
@@ -0,0 +1,436 @@
+"""
+JSON查询模块
+大型 JSON 文件（如 parse_result.json）不再整个解析和发送：首次查询时顺序扫描一遍文件，
+记录各层容器中每个元素的字节位置（结构索引），之后按路径只解析请求的子树或数组/对象的一页。
+结构索引按 (路径, 修改时间, 大小) 缓存，后续浏览不再扫描文件
+"""
+import json
+import mmap
+import os
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from src.file_content import is_compressed_text, open_stored
+from src.file_preview import json_type
+
+# 每页的元素数
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# 建立结构索引的容器层数（更深的子树查询时从所在的元素解析），
+# 如 {"data": {"items": [...]}} 索引到 items 中每个元素的位置
+DEFAULT_INDEX_DEPTH = 3
+
+# 缓存的文件结构索引数
+DEFAULT_CACHE_SIZE = 16
+
+# 扫描用的词法单元：字符串（含转义）和结构字符；数字、true/false/null 位于分隔符之间，不需要单独识别
+_TOKEN_RE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]:,]', re.DOTALL)
+# 跳过未建立索引的子树：一次匹配到下一个括号（跳过其间的字符串）
+_SKIP_TO_BRACKET_RE = re.compile(rb'[^"{}\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}\[\]]*)*[{}\[\]]', re.DOTALL)
+
+# 路径的各部分：.key、[0]、["key"]、['key']、[start:end]
+_PATH_PART_RE = re.compile(
+    r'\.([^.\[\]]+)|\[(-?\d+)\]|\["((?:[^"\\]|\\.)*)"\]|\[\'([^\']*)\'\]|\[(\d*):(\d*)\]'
+)
+_PLAIN_KEY_RE = re.compile(r'^[^.\[\]"\']+$')
+
+_QUOTE, _COLON, _COMMA = ord('"'), ord(':'), ord(',')
+_OPEN = {ord('{'): 'object', ord('['): 'array'}
+_CLOSE = {ord('}'): 'object', ord(']'): 'array'}
+
+PathSegment = Union[str, int]
+
+
+def parse_json_path(expression: Optional[str]) -> Tuple[List[PathSegment], Optional[Tuple[int, Optional[int]]]]:
+    """
+    解析查询路径（JSONPath 的子集）
+    
+    支持 $、.key、["key"]、['key']、[0]、[-1]，以及末尾的数组切片 [start:end]；
+    开头的 $ 和第一个键前的点可以省略（如 data.items[0]）
+    
+    Returns:
+        tuple: (路径各部分, 切片 (start, end) 或None)
+    
+    Raises:
+        ValueError: 路径格式错误
+    """
+    expression = (expression or '').strip()
+    if expression.startswith('$'):
+        expression = expression[1:]
+    if expression and expression[0] not in '.[':
+        expression = '.' + expression
+    
+    segments: List[PathSegment] = []
+    page = None
+    pos = 0
+    while pos < len(expression):
+        match = _PATH_PART_RE.match(expression, pos)
+        if match is None or page is not None:
+            raise ValueError(f"路径格式错误: {expression[pos:] or expression}")
+        key, index, quoted, single_quoted, start, end = match.groups()
+        if key is not None:
+            segments.append(key)
+        elif index is not None:
+            segments.append(int(index))
+        elif quoted is not None:
+            segments.append(json.loads(f'"{quoted}"'))
+        elif single_quoted is not None:
+            segments.append(single_quoted)
+        else:
+            page = (int(start or 0), int(end) if end else None)
+        pos = match.end()
+    return segments, page
+
+
+def format_json_path(segments: List[PathSegment]) -> str:
+    """路径各部分格式化为 $.key[0]["key with ."] 形式"""
+    parts = ['$']
+    for segment in segments:
+        if isinstance(segment, int):
+            parts.append(f'[{segment}]')
+        elif _PLAIN_KEY_RE.match(segment):
+            parts.append(f'.{segment}')
+        else:
+            parts.append(f'[{json.dumps(segment, ensure_ascii=False)}]')
+    return ''.join(parts)
+
+
+class JsonNode:
+    """结构索引中的容器：每个元素的字节范围，对象还有键"""
+    
+    __slots__ = ('kind', 'start', 'end', 'starts', 'ends', 'raw_keys', '_keys', 'children')
+    
+    def __init__(self, kind: str, start: int):
+        self.kind = kind
+        self.start = start
+        self.end = None
+        self.starts = array('q')
+        self.ends = array('q')
+        # 对象的键先保存原始字节，第一次查找时才解码
+        self.raw_keys = [] if kind == 'object' else None
+        self._keys = None
+        # 已建立索引的子容器（元素序号 -> JsonNode）
+        self.children = {}
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    @property
+    def keys(self) -> List[str]:
+        if self._keys is None:
+            self._keys = [_decode_key(raw) for raw in self.raw_keys]
+            self.raw_keys = None
+        return self._keys
+    
+    def index_of(self, segment: PathSegment) -> int:
+        """
+        路径的一部分对应的元素序号
+        
+        Raises:
+            KeyError: 对象中没有该键，或数组下标无效
+        """
+        if self.kind == 'object':
+            if not isinstance(segment, str):
+                raise KeyError(segment)
+            # 重复的键以最后一个为准（与 json.loads 一致）
+            for index in range(len(self) - 1, -1, -1):
+                if self.keys[index] == segment:
+                    return index
+            raise KeyError(segment)
+        return _array_index(segment, len(self))
+
+
+def _decode_key(raw: bytes) -> str:
+    if b'\\' not in raw:
+        return raw[1:-1].decode('utf-8', errors='replace')
+    return json.loads(raw)
+
+
+def _array_index(segment: PathSegment, length: int) -> int:
+    if isinstance(segment, str):
+        if not segment.lstrip('-').isdigit():
+            raise KeyError(segment)
+        segment = int(segment)
+    index = segment + length if segment < 0 else segment
+    if not 0 <= index < length:
+        raise KeyError(segment)
+    return index
+
+
+def build_index(data, max_depth: int = DEFAULT_INDEX_DEPTH) -> Optional[JsonNode]:
+    """
+    顺序扫描一遍 JSON 内容，建立前 max_depth 层容器的结构索引（不解析值）
+    
+    Args:
+        data: JSON 字节（bytes 或 mmap）
+        max_depth: 建立索引的容器层数
+    
+    Returns:
+        Optional[JsonNode]: 顶层容器，顶层不是对象或数组时为None
+    
+    Raises:
+        ValueError: 括号不匹配
+    """
+    root = None
+    # 每层（只包括建立索引的容器）: [类型, 索引节点, 当前元素开始位置, 当前元素的键, 当前元素的子容器]
+    stack = []
+    search = _TOKEN_RE.search
+    match = search(data)
+    while match is not None:
+        pos = match.start()
+        char = data[pos]
+        frame = stack[-1] if stack else None
+        
+        if char == _QUOTE:
+            # 对象中位于冒号之前的字符串是键
+            if frame is not None and frame[0] == 'object' and frame[2] < 0:
+                frame[3] = match.group()
+        elif char == _COLON:
+            if frame is not None:
+                frame[2] = pos + 1
+        elif char == _COMMA:
+            if frame is not None:
+                _close_element(frame, pos)
+                frame[2] = pos + 1 if frame[0] == 'array' else -1
+        elif char in _OPEN:
+            kind = _OPEN[char]
+            if frame is None:
+                if root is not None:
+                    raise ValueError(f"JSON结构错误：位置 {pos} 有多余的内容")
+                node = root = JsonNode(kind, pos)
+            elif len(stack) < max_depth:
+                node = frame[4] = JsonNode(kind, pos)
+            else:
+                # 超过索引深度的子树整个跳过，作为所在元素的一部分
+                match = search(data, _skip_container(data, pos))
+                continue
+            stack.append([kind, node, pos + 1 if kind == 'array' else -1, None, None])
+        else:
+            if frame is None or frame[0] != _CLOSE[char]:
+                raise ValueError(f"JSON结构错误：位置 {pos} 的括号不匹配")
+            node = frame[1]
+            # 空数组的 [ 和 ] 之间只有空白
+            if frame[2] >= 0 and (len(node) or data[frame[2]:pos].strip()):
+                _close_element(frame, pos)
+            node.end = pos + 1
+            stack.pop()
+        match = search(data, match.end())
+    
+    if stack:
+        raise ValueError("JSON结构错误：文件不完整")
+    return root
+
+
+def _skip_container(data, pos: int) -> int:
+    """跳过从 pos 开始的对象或数组（只匹配括号，不检查其中的内容），返回结束位置"""
+    depth = 0
+    match = _SKIP_TO_BRACKET_RE.match
+    while True:
+        found = match(data, pos)
+        if found is None:
+            raise ValueError("JSON结构错误：文件不完整")
+        pos = found.end()
+        if data[pos - 1] in _OPEN:
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return pos
+
+
+def _close_element(frame: list, end: int) -> None:
+    node = frame[1]
+    if frame[4] is not None:
+        node.children[len(node)] = frame[4]
+        frame[4] = None
+    node.starts.append(frame[2])
+    node.ends.append(end)
+    if node.raw_keys is not None:
+        node.raw_keys.append(frame[3])
+        frame[3] = None
+
+
+class JsonDocument:
+    """已建立结构索引的 JSON 文件"""
+    
+    def __init__(self, path: str, size: int, root: Optional[JsonNode], data: Optional[bytes] = None):
+        """
+        Args:
+            path: 文件路径
+            size: 文件大小
+            root: 顶层容器的结构索引
+            data: 压缩保存的文件解压后的内容（未压缩的文件按字节范围读取，不保留内容）
+        """
+        self.path = path
+        self.size = size
+        self.root = root
+        self.data = data
+    
+    @classmethod
+    def load(cls, path: str, max_depth: int = DEFAULT_INDEX_DEPTH) -> 'JsonDocument':
+        """扫描文件建立结构索引（未压缩的文件通过 mmap 扫描，不读入内存）"""
+        size = os.path.getsize(path)
+        if is_compressed_text(path):
+            with open_stored(path) as f:
+                data = f.read()
+            return cls(path, size, build_index(data, max_depth), data)
+        
+        if size == 0:
+            raise ValueError("JSON解析失败：文件为空")
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return cls(path, size, build_index(mapped, max_depth))
+    
+    def _read_ranges(self, starts: List[int], ends: List[int]) -> List[bytes]:
+        """读取多个相邻元素的字节（一次读取覆盖它们的范围）"""
+        if not starts:
+            return []
+        first, last = starts[0], ends[-1]
+        if self.data is not None:
+            block = self.data[first:last]
+        else:
+            with open(self.path, 'rb') as f:
+                f.seek(first)
+                block = f.read(last - first)
+        return [block[start - first:end - first] for start, end in zip(starts, ends)]
+    
+    def _load_element(self, node: JsonNode, index: int) -> Any:
+        return json.loads(self._read_ranges([node.starts[index]], [node.ends[index]])[0])
+    
+    def _load_all(self) -> Any:
+        if self.data is not None:
+            return json.loads(self.data)
+        with open(self.path, 'rb') as f:
+            return json.load(f)
+    
+    def query(self, json_path: Optional[str] = '$', offset: int = 0,
+              limit: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        按路径查询子树，对象和数组只返回 [offset, offset + limit) 的一页
+        
+        Returns:
+            dict: path、type、length（对象的键数或数组长度）、offset、limit、value、has_more
+        
+        Raises:
+            ValueError: 路径格式错误或内容无法解析
+            KeyError: 路径不存在
+        """
+        segments, page = parse_json_path(json_path)
+        if page is not None:
+            offset = page[0]
+            if page[1] is not None:
+                limit = max(page[1] - offset, 0)
+        offset = max(offset, 0)
+        limit = min(max(limit, 0), MAX_PAGE_SIZE)
+        
+        # 沿结构索引查找，到达未建立索引的层时解析所在的元素，剩余部分在解析结果中查找
+        target: Union[JsonNode, Any] = self.root
+        resolved: List[PathSegment] = []
+        if target is None:
+            target = self._load_all()
+        for position, segment in enumerate(segments):
+            if not isinstance(target, JsonNode):
+                target = _lookup(target, segment, segments[:position + 1])
+                resolved.append(segment)
+                continue
+            try:
+                index = target.index_of(segment)
+            except KeyError:
+                raise KeyError(format_json_path(segments[:position + 1])) from None
+            resolved.append(target.keys[index] if target.kind == 'object' else index)
+            if index in target.children:
+                target = target.children[index]
+            else:
+                target = self._load_element(target, index)
+        
+        result = {'path': format_json_path(resolved), 'offset': offset, 'limit': limit}
+        if isinstance(target, JsonNode):
+            length = len(target)
+            indexes = range(offset, min(offset + limit, length))
+            values = [json.loads(raw) for raw in self._read_ranges(
+                [target.starts[i] for i in indexes], [target.ends[i] for i in indexes])]
+            if target.kind == 'object':
+                value = dict(zip((target.keys[i] for i in indexes), values))
+            else:
+                value = values
+            result.update(type=target.kind, length=length, value=value)
+        elif isinstance(target, (dict, list)):
+            length = len(target)
+            if isinstance(target, dict):
+                value = dict(islice(target.items(), offset, offset + limit))
+            else:
+                value = target[offset:offset + limit]
+            result.update(type=json_type(target), length=length, value=value)
+        else:
+            length = None
+            result.update(type=json_type(target), length=None, value=target)
+        
+        result['has_more'] = length is not None and offset + limit < length
+        return result
+
+
+def _lookup(value: Any, segment: PathSegment, segments: List[PathSegment]) -> Any:
+    """在已解析的值中查找路径的一部分"""
+    try:
+        if isinstance(value, dict) and isinstance(segment, str):
+            return value[segment]
+        if isinstance(value, list):
+            return value[_array_index(segment, len(value))]
+    except KeyError:
+        pass
+    raise KeyError(format_json_path(segments))
+
+
+class JsonIndexCache:
+    """JSON文件结构索引缓存（线程安全，LRU淘汰）"""
+    
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE, index_depth: int = DEFAULT_INDEX_DEPTH):
+        """
+        Args:
+            max_entries: 最多缓存的文件数
+            index_depth: 建立索引的容器层数
+        """
+        self.max_entries = max_entries
+        self.index_depth = index_depth
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # 同一时间只扫描一个文件，避免多个请求同时扫描同一个大文件
+        self._build_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def _cached(self, key: Tuple) -> Optional[JsonDocument]:
+        with self._lock:
+            document = self._entries.get(key)
+            if document is not None:
+                self._entries.move_to_end(key)
+        return document
+    
+    def get(self, path: str) -> JsonDocument:
+        """获取文件的结构索引（文件修改后重新扫描）"""
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        document = self._cached(key)
+        if document is None:
+            with self._build_lock:
+                document = self._cached(key)
+                if document is None:
+                    document = JsonDocument.load(path, self.index_depth)
+                    with self._lock:
+                        self.misses += 1
+                        self._entries[key] = document
+                        while len(self._entries) > self.max_entries:
+                            self._entries.popitem(last=False)
+                    return document
+        with self._lock:
+            self.hits += 1
+        return document
+    
+    def query(self, path: str, json_path: Optional[str] = '$', offset: int = 0,
+              limit: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """按路径查询文件中的子树或一页（见 JsonDocument.query）"""
+        return self.get(path).query(json_path, offset, limit)
@@ -1,28 +1,29 @@
 #!/usr/bin/env python3
 """
 Shulex-Anker数据验证工具主程序入口
+
+pandas、tabulate、requests 和数据库驱动在用到它们的子命令中才导入，
+--help 和不需要这些依赖的子命令启动时不会加载
 """
+from __future__ import annotations
+
 import os
 import sys
 import logging
 import argparse
 import json
-import requests
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-
-import pandas as pd
-from tabulate import tabulate
+from typing import TYPE_CHECKING, Dict, List, Optional, Any
 
 # 添加项目根目录到系统路径
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-# 导入项目模块
-from src.db.connector import DatabaseConnector
-from src.file_processors.csv_processor import CSVProcessor
-from src.file_processors.excel_processor import ExcelProcessor
+# 导入项目配置
 from config.db_config import REPARSER_API_CONFIG, CRAWLER_API_CONFIG
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -38,6 +39,8 @@ def test_db_connection() -> bool:
     Returns:
         bool: 连接成功返回True，否则返回False
     """
+    from src.db.connector import DatabaseConnector
+    
     logger.info("测试数据库连接...")
     db = DatabaseConnector()
     result = db.test_connection()
@@ -64,6 +67,10 @@ def read_excel_chunked(file_path: str, nrows: int = 10, skiprows: int = 0, sheet
     Returns:
         pd.DataFrame: 读取的数据，失败返回None
     """
+    import pandas as pd
+    from tabulate import tabulate
+    from src.file_processors.excel_processor import ExcelProcessor
+    
     if not os.path.exists(file_path):
         logger.error(f"文件不存在: {file_path}")
         return None
@@ -141,6 +148,9 @@ def process_file(file_path: str, file_type: str = None, output_path: Optional[st
     Returns:
         pd.DataFrame: 处理后的数据，如果失败则返回None
     """
+    from src.file_processors.csv_processor import CSVProcessor
+    from src.file_processors.excel_processor import ExcelProcessor
+    
     if not os.path.exists(file_path):
         logger.error(f"文件不存在: {file_path}")
         return None
@@ -207,6 +217,10 @@ def validate_data(file_path: str, output_path: Optional[str] = None) -> bool:
     Returns:
         bool: 验证成功返回True，否则返回False
     """
+    import pandas as pd
+    from tabulate import tabulate
+    from src.db.connector import DatabaseConnector
+    
     # 处理文件
     file_data = process_file(file_path)
     if file_data is None:
@@ -281,6 +295,9 @@ def filter_null_column(file_path: str, column_name: str, nrows: int = 10, sheet_
     Returns:
         pd.DataFrame: 筛选后的数据，失败返回None
     """
+    from tabulate import tabulate
+    from src.file_processors.excel_processor import ExcelProcessor
+    
     if not os.path.exists(file_path):
         logger.error(f"文件不存在: {file_path}")
         return None
@@ -396,6 +413,11 @@ def analyze_tasks_with_db(file_path: str, column_name: str, nrows: int = 10, she
     Returns:
         pd.DataFrame: 分析结果，失败返回None
     """
+    import pandas as pd
+    from tabulate import tabulate
+    from src.db.connector import DatabaseConnector
+    from src.file_processors.excel_processor import ExcelProcessor
+    
     import json
     
     if not os.path.exists(file_path):
@@ -709,6 +731,10 @@ def resubmit_parse_jobs(job_ids: List[str], output_path: Optional[str] = None) -
     Returns:
         bool: 提交成功返回True，否则返回False
     """
+    import pandas as pd
+    import requests
+    from src.file_processors.excel_processor import ExcelProcessor
+    
     if not job_ids:
         logger.error("任务ID列表不能为空")
         return False
@@ -779,7 +805,6 @@ def resubmit_parse_jobs(job_ids: List[str], output_path: Optional[str] = None) -
                         results_df.to_csv(output_path, index=False, encoding='utf-8')
                     else:
                         # 使用ExcelProcessor保存
-                        from src.file_processors.excel_processor import ExcelProcessor
                         processor = ExcelProcessor("")  # 创建一个临时处理器
                         processor.save_to_excel(output_path, data={"重新提交结果": results_df})
                     
@@ -819,6 +844,8 @@ def resubmit_from_analysis_results(file_path: str, column_name: str = 'shulex_ss
     Returns:
         bool: 提交成功返回True，否则返回False
     """
+    from src.file_processors.excel_processor import ExcelProcessor
+    
     if not os.path.exists(file_path):
         logger.error(f"文件不存在: {file_path}")
         return False
@@ -873,6 +900,10 @@ def resubmit_crawler_jobs(job_ids: List[str], output_path: Optional[str] = None)
     Returns:
         bool: 提交成功返回True，否则返回False
     """
+    import pandas as pd
+    import requests
+    from src.file_processors.excel_processor import ExcelProcessor
+    
     if not job_ids:
         logger.error("任务ID列表不能为空")
         return False
@@ -1015,7 +1046,6 @@ def resubmit_crawler_jobs(job_ids: List[str], output_path: Optional[str] = None)
             results_df.to_csv(output_path, index=False, encoding='utf-8')
         else:
             # 使用ExcelProcessor保存
-            from src.file_processors.excel_processor import ExcelProcessor
             processor = ExcelProcessor("")  # 创建一个临时处理器
             processor.save_to_excel(output_path, data={"重新提交爬虫结果": results_df})
         
@@ -0,0 +1,237 @@
+"""
+批量重爬模块
+待重爬的任务去重后，通过共享连接池的HTTP会话以有限并发提交到爬虫重新提交接口，并记录提交进度
+"""
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+from config.db_config import CRAWLER_API_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 同时提交的请求数
+DEFAULT_CONCURRENCY = 8
+
+# 保留的批次数（更早的批次进度不再可查询）
+DEFAULT_MAX_BATCHES = 50
+
+# 结果中保留的响应内容长度
+RESPONSE_PREVIEW_LENGTH = 500
+
+
+def to_job_id(req_ssn: str) -> str:
+    """req_ssn 转换为重新提交接口使用的任务ID（SL前缀）"""
+    req_ssn = str(req_ssn).strip()
+    return req_ssn if req_ssn.startswith('SL') else f"SL{req_ssn}"
+
+
+def dedupe_job_ids(req_ssns: Iterable[str]) -> List[str]:
+    """转换为任务ID并去重（保持原有顺序，忽略空值）"""
+    seen = OrderedDict()
+    for req_ssn in req_ssns:
+        if req_ssn is None or not str(req_ssn).strip():
+            continue
+        seen.setdefault(to_job_id(req_ssn), None)
+    return list(seen)
+
+
+class CrawlerClient:
+    """爬虫重新提交接口客户端（连接池复用，线程安全）"""
+    
+    def __init__(self, config: Optional[Dict] = None, pool_size: int = DEFAULT_CONCURRENCY):
+        """
+        初始化客户端
+        
+        Args:
+            config: 接口配置，默认使用 CRAWLER_API_CONFIG
+            pool_size: 连接池大小（不小于并发数）
+        """
+        # requests 在首次重爬时才导入，避免拖慢看板启动
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        self.config = config or CRAWLER_API_CONFIG
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        headers = self.config['headers'].copy()
+        headers['X-Token'] = self.config['x_token']
+        self.session.headers.update(headers)
+    
+    def resubmit(self, job_id: str) -> Dict:
+        """
+        重新提交单个任务（接口只接受单个 req_ssn）
+        
+        Returns:
+            dict: {'job_id', 'status': submitted/failed/network_error, 'http_status', 'message'}
+        """
+        import requests
+        
+        try:
+            response = self.session.post(
+                self.config['url'],
+                json={'req_ssn': job_id},
+                timeout=self.config['timeout']
+            )
+        except requests.exceptions.RequestException as e:
+            logger.error(f"重新提交爬虫任务失败: {job_id} - {str(e)}")
+            return {'job_id': job_id, 'status': 'network_error', 'http_status': -1, 'message': str(e)}
+        
+        status = 'submitted' if response.status_code == 200 else 'failed'
+        if status == 'failed':
+            logger.warning(f"重新提交爬虫任务失败: {job_id} - HTTP {response.status_code}")
+        return {
+            'job_id': job_id,
+            'status': status,
+            'http_status': response.status_code,
+            'message': response.text[:RESPONSE_PREVIEW_LENGTH]
+        }
+    
+    def close(self) -> None:
+        self.session.close()
+
+
+class RecrawlBatch:
+    """一次批量重爬的进度"""
+    
+    def __init__(self, source: str, job_ids: Optional[List[str]] = None):
+        """
+        Args:
+            source: 来源说明（如 'req_ssns' 或筛选条件描述）
+            job_ids: 已去重的任务ID列表，为空时由 collect 在执行时收集
+        """
+        self.id = uuid.uuid4().hex[:12]
+        self.source = source
+        self.job_ids = list(job_ids or [])
+        self.status = 'pending'
+        self.error = None
+        self.truncated = False
+        self.submitted = 0
+        self.failed = 0
+        self.results = []
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+    
+    def record(self, result: Dict) -> None:
+        with self._lock:
+            self.results.append(result)
+            if result['status'] == 'submitted':
+                self.submitted += 1
+            else:
+                self.failed += 1
+    
+    def progress(self, include_results: bool = False) -> Dict:
+        """
+        批次进度
+        
+        Args:
+            include_results: 是否包含每个任务的提交结果
+        """
+        with self._lock:
+            done = self.submitted + self.failed
+            progress = {
+                'batch_id': self.id,
+                'source': self.source,
+                'status': self.status,
+                'error': self.error,
+                'total': len(self.job_ids),
+                'done': done,
+                'submitted': self.submitted,
+                'failed': self.failed,
+                'truncated': self.truncated,
+                'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+                'elapsed_seconds': round(((self.finished_at or datetime.now()) -
+                                          (self.started_at or datetime.now())).total_seconds(), 3)
+            }
+            if include_results:
+                progress['results'] = list(self.results)
+            return progress
+
+
+class RecrawlManager:
+    """批量重爬管理：所有批次共用一个HTTP客户端，按批次记录进度"""
+    
+    def __init__(self, client_factory: Callable[..., CrawlerClient] = CrawlerClient,
+                 concurrency: int = DEFAULT_CONCURRENCY, max_batches: int = DEFAULT_MAX_BATCHES):
+        """
+        Args:
+            client_factory: 创建客户端的函数，参数为 pool_size
+            concurrency: 每个批次同时提交的请求数
+            max_batches: 保留进度的批次数
+        """
+        self.client_factory = client_factory
+        self.concurrency = concurrency
+        self.max_batches = max_batches
+        self._client = None
+        self._batches = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @property
+    def client(self) -> CrawlerClient:
+        with self._lock:
+            if self._client is None:
+                self._client = self.client_factory(pool_size=self.concurrency)
+            return self._client
+    
+    def create(self, source: str, job_ids: Optional[List[str]] = None) -> RecrawlBatch:
+        """登记新的批次（保留最近 max_batches 个批次的进度）"""
+        batch = RecrawlBatch(source, job_ids)
+        with self._lock:
+            self._batches[batch.id] = batch
+            while len(self._batches) > self.max_batches:
+                self._batches.popitem(last=False)
+        return batch
+    
+    def get(self, batch_id: str) -> Optional[RecrawlBatch]:
+        with self._lock:
+            return self._batches.get(batch_id)
+    
+    def run(self, batch: RecrawlBatch, collect: Optional[Callable[[], Iterable[str]]] = None,
+            max_jobs: Optional[int] = None) -> Dict:
+        """
+        执行批次：收集任务ID（可选）后以有限并发提交
+        
+        Args:
+            batch: 批次
+            collect: 返回待重爬 req_ssn 的函数（按筛选条件查询时使用）
+            max_jobs: 最多提交的任务数，超出的部分忽略并标记 truncated
+        
+        Returns:
+            dict: 批次进度
+        """
+        batch.started_at = datetime.now()
+        try:
+            if collect is not None:
+                batch.status = 'collecting'
+                batch.job_ids = dedupe_job_ids(collect())
+            if max_jobs is not None and len(batch.job_ids) > max_jobs:
+                batch.job_ids = batch.job_ids[:max_jobs]
+                batch.truncated = True
+            
+            batch.status = 'running'
+            logger.info(f"开始批量重爬 {batch.id}: {len(batch.job_ids)} 个任务，并发 {self.concurrency}")
+            client = self.client
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=f'recrawl-{batch.id}') as executor:
+                for result in executor.map(client.resubmit, batch.job_ids):
+                    batch.record(result)
+            batch.status = 'completed'
+        except Exception as e:
+            logger.error(f"批量重爬失败 {batch.id}: {str(e)}")
+            batch.status = 'error'
+            batch.error = str(e)
+        finally:
+            batch.finished_at = datetime.now()
+        
+        progress = batch.progress()
+        logger.info(f"批量重爬完成 {batch.id}: 成功 {progress['submitted']}，失败 {progress['failed']}，"
+                    f"耗时 {progress['elapsed_seconds']} 秒")
+        return progress
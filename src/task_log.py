@@ -0,0 +1,150 @@
+"""
+任务日志模块
+有界的任务输出环形缓冲：每行带递增序号，轮询时只返回指定序号之后的新行；
+推送（SSE）时可等待新输出或状态变化；完整输出可同时写入gzip压缩文件
+"""
+import gzip
+import itertools
+import os
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+# 每个任务最多保留的输出行数（更早的行会被丢弃）
+DEFAULT_MAX_LINES = 5000
+
+
+class TaskLog:
+    """单个任务的输出缓冲（线程安全，追加为O(1)）"""
+    
+    def __init__(self, max_lines: int = DEFAULT_MAX_LINES, spill_path: Optional[str] = None):
+        """
+        初始化任务日志
+        
+        Args:
+            max_lines: 内存中最多保留的行数
+            spill_path: 完整输出写入的gzip文件路径（首次追加时创建），为空时不写文件
+        """
+        self._lines = deque(maxlen=max_lines)
+        self._next_seq = 0
+        self.spill_path = spill_path
+        self._spill = None
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        # 每次追加输出或状态变化时递增，推送端据此判断是否有更新
+        self._version = 0
+        self._closed = False
+    
+    def append(self, line: str) -> int:
+        """
+        追加一行输出
+        
+        Returns:
+            int: 该行的序号（从0开始）
+        """
+        with self._lock:
+            seq = self._next_seq
+            self._lines.append(line)
+            self._next_seq += 1
+            if self.spill_path and not self._closed:
+                if self._spill is None:
+                    os.makedirs(os.path.dirname(self.spill_path) or '.', exist_ok=True)
+                    self._spill = gzip.open(self.spill_path, 'wt', encoding='utf-8')
+                self._spill.write(line + '\n')
+            self._version += 1
+            self._changed.notify_all()
+            return seq
+    
+    def mark_changed(self) -> None:
+        """通知等待者任务状态有变化"""
+        with self._lock:
+            self._version += 1
+            self._changed.notify_all()
+    
+    def close(self) -> None:
+        """任务结束，不会再有新的输出（同时关闭压缩文件）"""
+        with self._lock:
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+            self._closed = True
+            self._version += 1
+            self._changed.notify_all()
+    
+    @classmethod
+    def load(cls, spill_path: str, max_lines: int = DEFAULT_MAX_LINES) -> 'TaskLog':
+        """
+        从压缩文件加载已结束任务的输出（只保留最后 max_lines 行，序号与执行时一致）
+        
+        Returns:
+            TaskLog: 已关闭的任务日志，文件不存在时为空
+        """
+        log = cls(max_lines)
+        if spill_path and os.path.exists(spill_path):
+            with gzip.open(spill_path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    log._lines.append(line.rstrip('\n'))
+                    log._next_seq += 1
+        log.spill_path = spill_path
+        log._closed = True
+        return log
+    
+    @property
+    def closed(self) -> bool:
+        return self._closed
+    
+    @property
+    def version(self) -> int:
+        return self._version
+    
+    def wait_for_change(self, version: int, timeout: float) -> int:
+        """
+        等待新的输出或状态变化
+        
+        Args:
+            version: 调用方已处理的版本号
+            timeout: 最长等待时间（秒）
+            
+        Returns:
+            int: 当前版本号（与传入值相同表示超时）
+        """
+        with self._lock:
+            self._changed.wait_for(lambda: self._version != version, timeout=timeout)
+            return self._version
+    
+    @property
+    def next_seq(self) -> int:
+        """下一行的序号（即已输出的总行数）"""
+        return self._next_seq
+    
+    def _first_seq(self) -> int:
+        return self._next_seq - len(self._lines)
+    
+    def since(self, seq: int = 0) -> Dict:
+        """
+        获取指定序号及之后的输出行
+        
+        Args:
+            seq: 起始序号（上一次返回的 next_seq），小于缓冲中最早的序号时从最早的行开始
+        
+        Returns:
+            dict: {'lines': 新的输出行, 'first_seq': 第一行的序号, 'next_seq': 下次轮询的起始序号,
+                   'truncated': 是否有请求范围内的行已被丢弃}
+        """
+        with self._lock:
+            first_seq = self._first_seq()
+            start = min(max(seq, first_seq), self._next_seq)
+            # 从尾部取新行，耗时只与新行数有关
+            lines = list(itertools.islice(reversed(self._lines), self._next_seq - start))
+            lines.reverse()
+            return {
+                'lines': lines,
+                'first_seq': start,
+                'next_seq': self._next_seq,
+                'truncated': seq < first_seq
+            }
+    
+    def text(self) -> str:
+        """缓冲中的全部输出"""
+        with self._lock:
+            return '\n'.join(self._lines)
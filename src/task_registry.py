@@ -0,0 +1,387 @@
+"""
+Web任务执行记录模块
+未结束的任务（含输出缓冲）保存在内存中，执行记录同时写入本地数据库 task_executions 表；
+任务结束后输出只保存在gzip压缩文件中，内存只保留有限数量的最近任务，历史记录按天数和数量清理；
+相同请求（去重键相同）的重复提交会关联到执行中的任务，不会重复执行
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.task_log import TaskLog
+
+logger = logging.getLogger(__name__)
+
+# 任务字段与数据库列的对应关系：(任务字典键, 列名)
+_COLUMNS = [
+    ('task_id', 'task_id'),
+    ('task_type', 'task_type'),
+    ('command', 'command'),
+    ('output_type', 'output_type'),
+    ('use_parse', 'use_parse'),
+    ('status', 'status'),
+    ('return_code', 'return_code'),
+    ('error', 'error'),
+    ('created_time', 'created_at'),
+    ('start_time', 'started_at'),
+    ('end_time', 'finished_at')
+]
+
+
+class TaskRegistry:
+    """Web任务执行记录（线程安全）"""
+    
+    def __init__(self, connector_factory: Optional[Callable] = None, log_dir: str = 'logs/tasks',
+                 retention_days: int = 30, max_records: int = 10000, recent_cache_size: int = 200,
+                 prune_interval: int = 3600):
+        """
+        初始化任务执行记录
+        
+        Args:
+            connector_factory: 创建本地数据库连接器的函数（如 LocalDatabaseConnector），为空时只保存在内存中
+            log_dir: 任务输出压缩文件目录
+            retention_days: 记录保留天数
+            max_records: 最多保留的记录数
+            recent_cache_size: 内存中保留的最近结束任务数
+            prune_interval: 两次清理之间的最短间隔（秒）
+        """
+        self.connector_factory = connector_factory
+        self.log_dir = log_dir
+        self.retention_days = retention_days
+        self.max_records = max_records
+        self.recent_cache_size = recent_cache_size
+        self.prune_interval = prune_interval
+        # start() 成功建表后为True
+        self.persistent = False
+        
+        self._active = {}
+        self._recent = OrderedDict()
+        # 去重键 -> 执行中任务的执行ID
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+    
+    def _db_call(self, method: str, *args, default=None):
+        """在新的本地数据库连接上调用连接器方法，数据库不可用时返回 default"""
+        if self.connector_factory is None:
+            return default
+        
+        db = None
+        try:
+            db = self.connector_factory()
+            if not db.connect():
+                return default
+            return getattr(db, method)(*args)
+        except Exception as e:
+            logger.warning(f"任务执行记录数据库操作失败（{method}）: {str(e)}")
+            return default
+        finally:
+            if db is not None:
+                db.disconnect()
+    
+    def start(self) -> bool:
+        """
+        初始化持久化存储：创建数据表，并将上次运行时未结束的任务标记为中断
+        
+        Returns:
+            bool: 本地数据库是否可用（不可用时任务记录只保存在内存中）
+        """
+        self.persistent = bool(self._db_call('create_task_executions_table', default=False))
+        if self.persistent:
+            interrupted = self._db_call('mark_interrupted_task_executions', datetime.now(), default=0)
+            if interrupted:
+                logger.warning(f"上次运行时有 {interrupted} 个任务未结束，已标记为中断")
+            self.maybe_prune()
+        else:
+            logger.warning("本地数据库不可用，任务执行记录只保存在内存中（重启后丢失）")
+        return self.persistent
+    
+    def _log_path(self, execution_id: str) -> str:
+        return os.path.join(self.log_dir, f'{execution_id}.log.gz')
+    
+    @staticmethod
+    def _remove_log_file(path: Optional[str]) -> None:
+        if not path:
+            return
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"删除任务输出文件失败: {path} - {str(e)}")
+    
+    def _record(self, task: Dict) -> Dict:
+        """任务字典转换为数据库记录"""
+        record = {column: task.get(key) for key, column in _COLUMNS}
+        record['id'] = task['id']
+        return record
+    
+    @staticmethod
+    def _from_row(row: Dict) -> Dict:
+        """数据库记录转换为任务字典（不含输出）"""
+        entry = {key: row.get(column) for key, column in _COLUMNS}
+        entry['id'] = row['id']
+        entry['use_parse'] = bool(entry['use_parse'])
+        entry['log_path'] = row.get('log_path')
+        entry['log_lines'] = row.get('log_lines') or 0
+        return entry
+    
+    def create(self, execution_id: str, command: str, **fields) -> Dict:
+        """
+        登记新任务（状态为 pending）
+        
+        Args:
+            execution_id: 执行ID
+            command: 等价的命令行
+            **fields: task_id, task_type, output_type, use_parse 等
+        
+        Returns:
+            dict: 任务字典，'log' 为输出缓冲（完整输出同时写入压缩文件）
+        """
+        task = self._new_task(execution_id, command, **fields)
+        with self._lock:
+            self._active[execution_id] = task
+        if self.persistent:
+            self._db_call('insert_task_execution', self._record(task))
+        return task
+    
+    def _new_task(self, execution_id: str, command: str, **fields) -> Dict:
+        return {
+            'id': execution_id,
+            'command': command,
+            'status': 'pending',
+            'log': TaskLog(spill_path=self._log_path(execution_id)),
+            'created_time': datetime.now(),
+            **fields
+        }
+    
+    def create_or_attach(self, dedupe_key: tuple, execution_id: str, command: str, **fields) -> Tuple[Dict, bool]:
+        """
+        登记新任务；去重键相同的任务还未结束时不登记，直接返回该任务
+        
+        Args:
+            dedupe_key: 去重键（如 (job_id, output_type, with_parse)）
+            execution_id: 新任务的执行ID
+            command: 等价的命令行
+            **fields: 同 create
+        
+        Returns:
+            Tuple[dict, bool]: (任务字典, 是否新登记)，未新登记时调用方不应再执行任务
+        """
+        with self._lock:
+            existing = self._active.get(self._inflight.get(dedupe_key))
+            if existing is not None:
+                existing['attached'] = existing.get('attached', 0) + 1
+                return existing, False
+            # 检查和登记在同一把锁内完成，并发的相同提交只会登记一次
+            task = self._new_task(execution_id, command, dedupe_key=dedupe_key, **fields)
+            self._active[execution_id] = task
+            self._inflight[dedupe_key] = execution_id
+        
+        if self.persistent:
+            self._db_call('insert_task_execution', self._record(task))
+        return task, True
+    
+    def find_fresh(self, dedupe_key: tuple, max_age: float) -> Optional[Dict]:
+        """
+        查找去重键相同、在 max_age 秒内成功结束的最近任务（只查找内存中的最近任务）
+        
+        Returns:
+            Optional[dict]: 任务摘要（不含输出），没有时返回None
+        """
+        if max_age <= 0:
+            return None
+        cutoff = datetime.now() - timedelta(seconds=max_age)
+        with self._lock:
+            for entry in reversed(self._recent.values()):
+                if (entry.get('dedupe_key') == dedupe_key and entry['status'] == 'completed'
+                        and entry.get('end_time') and entry['end_time'] >= cutoff):
+                    return dict(entry)
+        return None
+    
+    def _release_key(self, task: Dict) -> None:
+        """释放去重键（调用方持有锁）"""
+        dedupe_key = task.get('dedupe_key')
+        if dedupe_key is not None and self._inflight.get(dedupe_key) == task['id']:
+            del self._inflight[dedupe_key]
+    
+    def discard(self, execution_id: str) -> None:
+        """删除未执行的任务（如提交到队列失败）"""
+        with self._lock:
+            task = self._active.pop(execution_id, None)
+            if task is not None:
+                self._release_key(task)
+        if task is None:
+            return
+        task['log'].close()
+        self._remove_log_file(task['log'].spill_path)
+        if self.persistent:
+            self._db_call('delete_task_execution', execution_id)
+    
+    def mark_running(self, execution_id: str) -> None:
+        """任务开始执行"""
+        task = self._active.get(execution_id)
+        if task is None:
+            return
+        task['status'] = 'running'
+        task['start_time'] = datetime.now()
+        task['log'].mark_changed()
+        if self.persistent:
+            self._db_call('update_task_execution', execution_id,
+                          {'status': 'running', 'started_at': task['start_time']})
+    
+    def finish(self, execution_id: str, status: str, return_code: Optional[int] = None,
+               error: Optional[str] = None) -> None:
+        """
+        任务结束：关闭输出文件，更新记录，并从内存中释放输出缓冲
+        
+        Args:
+            execution_id: 执行ID
+            status: completed, failed 或 error
+            return_code: 返回码
+            error: 错误信息
+        """
+        task = self._active.get(execution_id)
+        if task is None:
+            return
+        
+        task['end_time'] = datetime.now()
+        task['status'] = status
+        task['return_code'] = return_code
+        task['error'] = error
+        # 先更新状态再关闭日志，推送连接被唤醒时能读到最终状态
+        task_log = task['log']
+        task_log.close()
+        log_path = task_log.spill_path if task_log.next_seq else None
+        
+        if self.persistent:
+            self._db_call('update_task_execution', execution_id, {
+                'status': status,
+                'return_code': return_code,
+                'error': error,
+                'finished_at': task['end_time'],
+                'log_path': log_path,
+                'log_lines': task_log.next_seq
+            })
+        
+        # 内存中只保留不含输出缓冲的摘要
+        entry = {k: v for k, v in task.items() if k not in ('log', 'job')}
+        entry['log_path'] = log_path
+        entry['log_lines'] = task_log.next_seq
+        with self._lock:
+            self._active.pop(execution_id, None)
+            self._release_key(task)
+            self._remember(entry)
+        
+        self.maybe_prune()
+    
+    def _remember(self, entry: Dict) -> None:
+        """放入最近任务缓存（调用方持有锁）"""
+        self._recent[entry['id']] = entry
+        self._recent.move_to_end(entry['id'])
+        while len(self._recent) > self.recent_cache_size:
+            _, evicted = self._recent.popitem(last=False)
+            # 只保存在内存中时，移出缓存即丢弃记录，输出文件一并删除
+            if not self.persistent:
+                self._remove_log_file(evicted.get('log_path'))
+    
+    def get(self, execution_id: str) -> Optional[Dict]:
+        """
+        获取任务（未结束的任务返回内存中的任务字典，已结束的任务从压缩文件加载输出）
+        
+        Returns:
+            Optional[dict]: 任务字典（含 'log'），不存在时返回None
+        """
+        with self._lock:
+            task = self._active.get(execution_id)
+            if task is not None:
+                return task
+            entry = self._recent.get(execution_id)
+            if entry is not None:
+                self._recent.move_to_end(execution_id)
+        
+        if entry is None and self.persistent:
+            row = self._db_call('get_task_execution', execution_id)
+            if row is not None:
+                entry = self._from_row(row)
+                with self._lock:
+                    self._remember(entry)
+        
+        if entry is None:
+            return None
+        return dict(entry, log=TaskLog.load(entry.get('log_path')))
+    
+    def list(self, page: int = 1, page_size: int = 50, status: Optional[str] = None) -> Tuple[List[Dict], int]:
+        """
+        按创建时间倒序分页列出任务（不含输出）
+        
+        Args:
+            page: 页码（从1开始）
+            page_size: 每页数量
+            status: 只列出该状态的任务
+        
+        Returns:
+            Tuple[List[dict], int]: (当前页任务, 总数)
+        """
+        offset = (max(page, 1) - 1) * page_size
+        if self.persistent:
+            result = self._db_call('list_task_executions', page_size, offset, status)
+            if result is not None:
+                rows, total = result
+                return [self._from_row(row) for row in rows], total
+        
+        with self._lock:
+            entries = [{k: v for k, v in task.items() if k not in ('log', 'job')}
+                       for task in self._active.values()]
+            entries.extend(self._recent.values())
+        if status:
+            entries = [e for e in entries if e['status'] == status]
+        entries.sort(key=lambda e: e['created_time'], reverse=True)
+        return entries[offset:offset + page_size], len(entries)
+    
+    def clear(self) -> None:
+        """清空已结束的任务记录和输出文件（未结束的任务不受影响）"""
+        with self._lock:
+            log_paths = [entry.get('log_path') for entry in self._recent.values()]
+            self._recent.clear()
+        if self.persistent:
+            log_paths.extend(self._db_call('delete_task_executions', default=[]))
+        for path in set(log_paths):
+            self._remove_log_file(path)
+    
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """
+        按保留天数和最大记录数清理已结束的任务记录及输出文件
+        
+        Returns:
+            int: 删除的输出文件数
+        """
+        before = (now or datetime.now()) - timedelta(days=self.retention_days)
+        with self._lock:
+            expired = [key for key, entry in self._recent.items() if entry['created_time'] < before]
+            log_paths = [self._recent.pop(key).get('log_path') for key in expired]
+        if self.persistent:
+            log_paths.extend(self._db_call('delete_task_executions', before, self.max_records, default=[]))
+        
+        log_paths = {path for path in log_paths if path}
+        for path in log_paths:
+            self._remove_log_file(path)
+        if log_paths:
+            logger.info(f"清理过期任务记录，删除输出文件 {len(log_paths)} 个")
+        return len(log_paths)
+    
+    def maybe_prune(self) -> None:
+        """距离上次清理超过 prune_interval 时执行清理"""
+        now = time.time()
+        with self._lock:
+            if now - self._last_prune < self.prune_interval:
+                return
+            self._last_prune = now
+        try:
+            self.prune()
+        except Exception as e:
+            logger.error(f"清理任务记录失败: {str(e)}")
@@ -0,0 +1,3 @@
+"""
+任务统计辅助模块
+"""
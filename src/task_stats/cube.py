@@ -0,0 +1,199 @@
+"""
+任务统计立方体模块
+按 日期 × 租户 × 任务类型 × 统计指标 预先聚合计数，租户和任务类型的任意组合通过数组切片求和得到
+"""
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+# 统计指标（与统计SQL中的列名一致）
+MEASURES = [
+    'total_count',
+    'failed_count',
+    'timeout_count',
+    'succeed_count',
+    'timeout_but_succeed',
+    'succeed_not_timeout',
+    'timeout_not_succeed'
+]
+
+
+class StatisticsCube:
+    """任务统计立方体，values的形状为 (日期, 租户, 任务类型, 指标)"""
+    
+    def __init__(self, dates: List[str], tenant_ids: List[str], task_types: List[str],
+                 values: Optional[np.ndarray] = None):
+        """
+        初始化统计立方体
+        
+        Args:
+            dates: 日期列表（YYYY-MM-DD）
+            tenant_ids: 租户ID列表
+            task_types: 任务类型列表
+            values: 计数数组，为空时初始化为全0
+        """
+        self.dates = list(dates)
+        self.tenant_ids = list(tenant_ids)
+        self.task_types = list(task_types)
+        self._date_index = {d: i for i, d in enumerate(self.dates)}
+        self._tenant_index = {t: i for i, t in enumerate(self.tenant_ids)}
+        self._type_index = {t: i for i, t in enumerate(self.task_types)}
+        
+        shape = (len(self.dates), len(self.tenant_ids), len(self.task_types), len(MEASURES))
+        if values is None:
+            values = np.zeros(shape, dtype=np.int32)
+        elif values.shape != shape:
+            raise ValueError(f"统计数组形状不匹配: {values.shape} != {shape}")
+        self.values = values
+    
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict], tenant_ids: List[str], task_types: List[str]) -> 'StatisticsCube':
+        """
+        由分组查询结果构建立方体，同一单元格的多行（来自不同分表）会累加
+        
+        Args:
+            rows: 包含 date, tenant_id, task_type 及各统计指标列的记录
+            tenant_ids: 租户ID列表
+            task_types: 任务类型列表
+            
+        Returns:
+            StatisticsCube: 统计立方体
+        """
+        rows = list(rows)
+        dates = sorted({str(row['date']) for row in rows}, reverse=True)
+        cube = cls(dates, tenant_ids, task_types)
+        cube.add_rows(rows)
+        return cube
+    
+    def add_rows(self, rows: Iterable[Dict]) -> None:
+        """将分组查询结果累加到立方体中（未知的日期、租户或任务类型会被忽略）"""
+        for row in rows:
+            d = self._date_index.get(str(row['date']))
+            t = self._tenant_index.get(row['tenant_id'])
+            k = self._type_index.get(row['task_type'])
+            if d is None or t is None or k is None:
+                continue
+            self.values[d, t, k] += [int(row[m] or 0) for m in MEASURES]
+    
+    def overlay(self, other: 'StatisticsCube', start_date: Optional[str] = None,
+                end_date: Optional[str] = None) -> 'StatisticsCube':
+        """
+        用另一个立方体中的日期覆盖本立方体的对应日期，返回新的立方体
+        
+        用于将重新统计的实时窗口（最近几天）合并到缓存的完整日期范围中。
+        
+        Args:
+            other: 租户、任务类型与本立方体一致的立方体
+            start_date: 只合并不早于该日期的数据
+            end_date: 只合并不晚于该日期的数据
+        
+        Returns:
+            StatisticsCube: 合并后的立方体
+        
+        Raises:
+            ValueError: 两个立方体的租户或任务类型不一致
+        """
+        if other.tenant_ids != self.tenant_ids or other.task_types != self.task_types:
+            raise ValueError("统计立方体的租户或任务类型不一致")
+        
+        other_dates = [d for d in other.dates
+                       if (start_date is None or d >= start_date) and (end_date is None or d <= end_date)]
+        dates = sorted(set(self.dates) | set(other_dates), reverse=True)
+        result = StatisticsCube(dates, self.tenant_ids, self.task_types)
+        
+        for d, date_str in enumerate(self.dates):
+            result.values[result._date_index[date_str]] = self.values[d]
+        for date_str in other_dates:
+            result.values[result._date_index[date_str]] = other.values[other._date_index[date_str]]
+        return result
+    
+    def _indices(self, index: Dict[str, int], keys: Optional[Iterable[str]]) -> List[int]:
+        """将键列表转换为数组下标，None表示全部"""
+        if keys is None:
+            return list(index.values())
+        return [index[k] for k in keys if k in index]
+    
+    def slice(self, tenant_ids: Optional[Iterable[str]] = None,
+              task_types: Optional[Iterable[str]] = None) -> np.ndarray:
+        """
+        按租户求和并选取任务类型
+        
+        Returns:
+            np.ndarray: 形状为 (日期, 所选任务类型, 指标) 的计数数组
+        """
+        tenant_idx = self._indices(self._tenant_index, tenant_ids)
+        type_idx = self._indices(self._type_index, task_types)
+        selected = self.values[:, tenant_idx][:, :, type_idx]
+        return selected.sum(axis=1, dtype=np.int64)
+    
+    def _selected_types(self, task_types: Optional[Iterable[str]]) -> List[str]:
+        if task_types is None:
+            return list(self.task_types)
+        return [t for t in task_types if t in self._type_index]
+    
+    def to_statistics_data(self, tenant_ids: Optional[Iterable[str]] = None,
+                           task_types: Optional[Iterable[str]] = None) -> Dict[str, List[Dict]]:
+        """
+        输出按日期、任务类型展开的统计数据（日期倒序，只包含有数据的组合）
+        
+        Returns:
+            dict: {指标: [{'date', 'task_type', 'count'}]}
+        """
+        types = self._selected_types(task_types)
+        sliced = self.slice(tenant_ids, types)
+        
+        data = {measure: [] for measure in MEASURES}
+        for d, date_str in enumerate(self.dates):
+            for k, task_type in enumerate(types):
+                counts = sliced[d, k]
+                if counts[0] == 0:
+                    continue
+                for m, measure in enumerate(MEASURES):
+                    data[measure].append({
+                        'date': date_str,
+                        'task_type': task_type,
+                        'count': int(counts[m])
+                    })
+        return data
+    
+    def to_statistics_data_by_type(self, tenant_ids: Optional[Iterable[str]] = None,
+                                   task_types: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, List[Dict]]]:
+        """
+        输出按任务类型拆分的统计数据
+        
+        Returns:
+            dict: {任务类型: {指标: [{'date', 'count'}]}}
+        """
+        types = self._selected_types(task_types)
+        by_type = {task_type: {measure: [] for measure in MEASURES} for task_type in types}
+        
+        for measure, records in self.to_statistics_data(tenant_ids, types).items():
+            for record in records:
+                by_type[record['task_type']][measure].append({
+                    'date': record['date'],
+                    'count': record['count']
+                })
+        return by_type
+    
+    def to_summary(self, tenant_ids: Optional[Iterable[str]] = None,
+                   task_types: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, int]]:
+        """
+        输出按任务类型汇总的统计数据（只包含有数据的任务类型）
+        
+        Returns:
+            dict: {任务类型: {指标: 数量}}
+        """
+        types = self._selected_types(task_types)
+        totals = self.slice(tenant_ids, types).sum(axis=0)
+        
+        summary = {}
+        for k, task_type in enumerate(types):
+            if totals[k, 0] == 0:
+                continue
+            summary[task_type] = {measure: int(totals[k, m]) for m, measure in enumerate(MEASURES)}
+        return summary
+    
+    @property
+    def nbytes(self) -> int:
+        """计数数组占用的字节数"""
+        return self.values.nbytes
@@ -0,0 +1,87 @@
+"""
+统计详情行处理模块
+列表只返回轻量字段和预先计算的标记，重字段在展开单行时再格式化
+"""
+import json
+from collections import namedtuple
+from functools import lru_cache
+
+# 可重爬的错误信息（result中的E3001字段需完全一致）
+RECRAWL_ERROR_MESSAGE = "作业提交失败: 408 IORuntimeException - SocketTimeoutException: connect timed out"
+
+# 408 IO超时标记（用于列表高亮）
+IO_TIMEOUT_MARKER = "408 IORuntimeException - SocketTimeoutException: connect timed out"
+
+# 列表中result预览的最大长度
+PREVIEW_LENGTH = 100
+
+ResultSummary = namedtuple('ResultSummary', ['is_valid_json', 'is_io_timeout', 'is_recrawl_error'])
+
+
+def _to_text(value) -> str:
+    """将数据库字段统一为字符串"""
+    if value is None:
+        return ''
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace')
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+@lru_cache(maxsize=4096)
+def _classify_result_text(text: str) -> ResultSummary:
+    """解析一次result并分类（同样的错误内容在大量失败记录中重复出现，结果按内容缓存）"""
+    try:
+        parsed = json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return ResultSummary(False, False, False)
+    
+    if not isinstance(parsed, dict) or 'E3001' not in parsed:
+        return ResultSummary(True, False, False)
+    
+    error = parsed.get('E3001')
+    if not isinstance(error, str):
+        return ResultSummary(True, False, False)
+    
+    return ResultSummary(True, IO_TIMEOUT_MARKER in error, error == RECRAWL_ERROR_MESSAGE)
+
+
+def classify_result(raw_result) -> ResultSummary:
+    """
+    对job表的result字段分类
+    
+    Args:
+        raw_result: result字段原始内容
+        
+    Returns:
+        ResultSummary: (是否为有效JSON, 是否为408 IO超时, 是否为可重爬错误)
+    """
+    text = _to_text(raw_result)
+    if not text:
+        return ResultSummary(False, False, False)
+    return _classify_result_text(text)
+
+
+def is_recrawl_eligible(status: str, raw_result) -> bool:
+    """
+    判断记录是否可以重爬：状态为FAILED且result为408连接超时错误
+    
+    Args:
+        status: 任务状态
+        raw_result: result字段原始内容
+        
+    Returns:
+        bool: 是否可以重爬
+    """
+    if status != 'FAILED':
+        return False
+    return classify_result(raw_result).is_recrawl_error
+
+
+def preview_text(value, limit: int = PREVIEW_LENGTH) -> str:
+    """截取字段内容作为列表预览"""
+    text = _to_text(value)
+    if len(text) > limit:
+        return text[:limit] + '...'
+    return text
@@ -0,0 +1,137 @@
+"""
+统计详情导出模块
+将各分表按 (created_at, req_ssn) 倒序的流式结果归并，并分块编码为CSV或NDJSON
+"""
+import csv
+import heapq
+import io
+import json
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List
+
+from src.task_stats.details import classify_result
+from src.task_stats.pagination import row_sort_key
+
+# 支持的导出格式: 格式 -> (mimetype, 文件扩展名)
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'ndjson': ('application/x-ndjson; charset=utf-8', 'ndjson')
+}
+
+# 导出字段（顺序即CSV列顺序）
+EXPORT_COLUMNS = [
+    'source_table',
+    'req_ssn',
+    'ext_ssn',
+    'status',
+    'log_state',
+    'created_at',
+    'break_at',
+    'deliver_at',
+    'is_io_timeout',
+    'result',
+    'response_head'
+]
+
+# 每个输出块的目标大小（字节数按字符近似）
+CHUNK_SIZE = 64 * 1024
+
+
+def merge_shard_streams(shard_streams: List[Iterable[Dict]]) -> Iterator[Dict]:
+    """
+    对各分表已按 (created_at, req_ssn) 倒序的流式结果做k路归并
+    
+    heapq.merge 每个分表只保留一条记录，内存占用与结果总数无关。
+    """
+    return heapq.merge(*shard_streams, key=row_sort_key, reverse=True)
+
+
+def _format_value(value):
+    """导出字段格式化"""
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8', errors='replace')
+    return value
+
+
+def export_record(row: Dict) -> Dict:
+    """将一条详情查询结果转换为导出记录"""
+    record = {column: _format_value(row.get(column)) for column in EXPORT_COLUMNS}
+    record['is_io_timeout'] = classify_result(record['result']).is_io_timeout
+    return record
+
+
+def _chunked(lines: Iterable[str], chunk_size: int) -> Iterator[str]:
+    """将多行文本合并为约 chunk_size 大小的块"""
+    buffer = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def _csv_lines(rows: Iterable[Dict]) -> Iterator[str]:
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow(export_record(row))
+        yield output.getvalue()
+        output.seek(0)
+        output.truncate()
+
+
+def _ndjson_lines(rows: Iterable[Dict]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(export_record(row), ensure_ascii=False) + '\n'
+
+
+def stream_export(rows: Iterable[Dict], export_format: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    将详情记录流编码为导出文件内容块
+    
+    CSV格式先立即输出表头（带BOM，方便Excel识别UTF-8），客户端无需等待第一批数据。
+    
+    Args:
+        rows: 详情记录（可以是惰性迭代器）
+        export_format: 'csv' 或 'ndjson'
+        chunk_size: 每个输出块的目标大小
+        
+    Returns:
+        Iterator[str]: 文件内容块
+        
+    Raises:
+        ValueError: 不支持的导出格式
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f'不支持的导出格式: {export_format}')
+    
+    if export_format == 'csv':
+        header = '\ufeff' + ','.join(EXPORT_COLUMNS) + '\r\n'
+        return _chain_header(header, _chunked(_csv_lines(rows), chunk_size))
+    return _chunked(_ndjson_lines(rows), chunk_size)
+
+
+def export_error(message: str, export_format: str) -> str:
+    """
+    导出中途失败时追加在文件末尾的错误标记，避免不完整的文件被当作完整结果
+    
+    NDJSON 为一行 {"error": ...}；CSV 为 source_table 列为 ERROR、result 列为错误信息的一行。
+    """
+    if export_format == 'csv':
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=EXPORT_COLUMNS)
+        writer.writerow({'source_table': 'ERROR', 'result': message})
+        return output.getvalue()
+    return json.dumps({'error': message}, ensure_ascii=False) + '\n'
+
+
+def _chain_header(header: str, chunks: Iterator[str]) -> Iterator[str]:
+    yield header
+    yield from chunks
@@ -0,0 +1,196 @@
+"""
+统计SQL索引检查模块
+渲染所有统计SQL，在各分表上执行 EXPLAIN FORMAT=JSON，找出全表扫描和文件排序并给出索引建议
+"""
+import json
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from config.task_statistics_config import SQL_TEMPLATES, get_sql_template
+from src.task_stats.queries import (
+    DETAIL_TYPES, cube_query, details_where_condition, details_list_query, details_count_query
+)
+
+# 各查询建议的覆盖索引列（顺序即索引列顺序）
+SUGGESTED_INDEXES = {
+    'statistics': ['type', 'created_at', 'tenant_id', 'status', 'break_at', 'deliver_at'],
+    'details_list': ['type', 'created_at', 'req_ssn', 'tenant_id', 'status'],
+    'log_join': ['req_ssn']
+}
+
+# 执行计划中需要关注的问题
+ISSUE_DESCRIPTIONS = {
+    'full_scan': '全表扫描',
+    'full_index_scan': '全索引扫描',
+    'filesort': '文件排序',
+    'temporary': '使用临时表'
+}
+
+
+def render_statistics_queries(table: str, tenant_ids: List[str], task_types: List[str],
+                              reference_time: str, start_time: str, end_time: str) -> List[Tuple[str, str, List]]:
+    """
+    使用给定参数渲染指定分表上的所有统计SQL
+    
+    Returns:
+        List[Tuple[str, str, List]]: [(查询名, sql, params)]
+    """
+    queries = []
+    
+    # config/task_statistics_config.py 中的SQL模板
+    for template_name in SQL_TEMPLATES:
+        sql = get_sql_template(template_name, table, tenant_ids, task_types)
+        # 模板开头的占位符是超时判断的参考时间，其余依次为时间范围、租户、任务类型
+        placeholder_count = sql.replace('%%', '').count('%s')
+        leading_count = placeholder_count - 2 - len(tenant_ids) - len(task_types)
+        params = [reference_time] * leading_count + [start_time, end_time] + list(tenant_ids) + list(task_types)
+        queries.append((template_name, sql, params))
+    
+    # Web接口使用的统计立方体查询
+    sql, params = cube_query(table, tenant_ids, task_types, reference_time, start_time, end_time)
+    queries.append(('statistics_cube', sql, params))
+    
+    # 统计详情列表和总数查询（每种详情类型）
+    for detail_type in DETAIL_TYPES:
+        where_condition, params = details_where_condition(
+            detail_type, tenant_ids, task_types[0], start_time, end_time, reference_time
+        )
+        queries.append((f'details_list:{detail_type}', details_list_query(table, where_condition, 21, 200), params))
+        queries.append((f'details_count:{detail_type}', details_count_query(table, where_condition), params))
+    
+    return queries
+
+
+def explain_query(db, sql: str, params: List) -> Dict:
+    """
+    执行 EXPLAIN FORMAT=JSON 并返回解析后的执行计划
+    
+    Args:
+        db: 已连接的数据库连接器
+        sql: SQL语句
+        params: 查询参数
+    """
+    rows = db.execute_query(f"EXPLAIN FORMAT=JSON {sql}", params)
+    if not rows:
+        raise RuntimeError('EXPLAIN 未返回执行计划')
+    plan = list(rows[0].values())[0]
+    if isinstance(plan, (bytes, bytearray)):
+        plan = plan.decode('utf-8')
+    return json.loads(plan)
+
+
+def analyze_plan(plan: Dict) -> Dict:
+    """
+    分析执行计划，找出访问的表、使用的索引和问题
+    
+    Args:
+        plan: EXPLAIN FORMAT=JSON 的结果
+        
+    Returns:
+        dict: {'tables': [{'table', 'access_type', 'key', 'possible_keys', 'rows', 'issues'}], 'issues': [问题]}
+    """
+    tables = []
+    issues = []
+    
+    def walk(node):
+        if isinstance(node, dict):
+            if node.get('using_filesort'):
+                issues.append('filesort')
+            if node.get('using_temporary_table'):
+                issues.append('temporary')
+            
+            if 'table_name' in node and 'access_type' in node:
+                table_issues = []
+                if node['access_type'] == 'ALL':
+                    table_issues.append('full_scan')
+                elif node['access_type'] == 'index':
+                    table_issues.append('full_index_scan')
+                tables.append({
+                    'table': node['table_name'],
+                    'access_type': node['access_type'],
+                    'key': node.get('key'),
+                    'possible_keys': node.get('possible_keys') or [],
+                    'rows': node.get('rows_examined_per_scan'),
+                    'issues': table_issues
+                })
+                issues.extend(table_issues)
+            
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+    
+    walk(plan)
+    return {'tables': tables, 'issues': list(OrderedDict.fromkeys(issues))}
+
+
+def get_table_indexes(db, table: str) -> Dict[str, List[str]]:
+    """
+    获取表上已有的索引
+    
+    Returns:
+        dict: {索引名: [列名（按索引顺序）]}
+    """
+    indexes = OrderedDict()
+    for row in db.execute_query(f"SHOW INDEX FROM {table}"):
+        indexes.setdefault(row['Key_name'], []).append((row['Seq_in_index'], row['Column_name']))
+    return {name: [column for _, column in sorted(columns)] for name, columns in indexes.items()}
+
+
+def _find_matching_index(indexes: Dict[str, List[str]], columns: List[str]) -> str:
+    """查找以建议的前两列开头的已有索引"""
+    prefix = columns[:2]
+    for name, index_columns in indexes.items():
+        if index_columns[:len(prefix)] == prefix:
+            return name
+    return ''
+
+
+def suggest_for_query(query_name: str, job_table: str, analysis: Dict,
+                      indexes: Dict[str, Dict[str, List[str]]]) -> List[str]:
+    """
+    根据执行计划分析结果给出建议
+    
+    Args:
+        query_name: 查询名
+        job_table: job分表名
+        analysis: analyze_plan 的结果
+        indexes: {表名: get_table_indexes 的结果}
+        
+    Returns:
+        List[str]: 建议列表（ALTER TABLE 语句或 INDEX_HINTS 配置）
+    """
+    suggestions = []
+    base_name = query_name.split(':')[0]
+    
+    for table_info in analysis['tables']:
+        if not table_info['issues']:
+            continue
+        
+        table = table_info['table']
+        if table == 'b' or table.startswith('log_'):
+            # 详情查询关联log表
+            log_table = job_table.replace('job_', 'log_')
+            if not _find_matching_index(indexes.get(log_table, {}), SUGGESTED_INDEXES['log_join']):
+                suggestions.append(f"ALTER TABLE {log_table} ADD INDEX idx_req_ssn (req_ssn);")
+            continue
+        
+        columns = SUGGESTED_INDEXES['details_list' if base_name == 'details_list' else 'statistics']
+        existing = _find_matching_index(indexes.get(job_table, {}), columns)
+        if existing and existing != table_info['key']:
+            suggestions.append(
+                f"INDEX_HINTS['{job_table}']['{base_name}'] = 'FORCE INDEX ({existing})'"
+            )
+        elif not existing:
+            index_name = 'idx_' + '_'.join(c.replace('_at', '') for c in columns[:3])
+            suggestions.append(
+                f"ALTER TABLE {job_table} ADD INDEX {index_name} ({', '.join(columns)});"
+            )
+    
+    if 'filesort' in analysis['issues'] and base_name == 'details_list':
+        suggestions.append(
+            f"{job_table}: ORDER BY created_at, req_ssn 需要以 ({', '.join(SUGGESTED_INDEXES['details_list'][:3])}) 开头的索引避免文件排序"
+        )
+    
+    return list(OrderedDict.fromkeys(suggestions))
@@ -0,0 +1,238 @@
+"""
+实时统计推送模块
+所有订阅共用一个后台轮询线程：每轮只重新统计实时窗口（最近几天）一次，
+与各订阅日期范围的缓存立方体合并后，只向统计结果有变化的订阅者推送
+"""
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from src.task_stats.cube import MEASURES, StatisticsCube
+
+logger = logging.getLogger(__name__)
+
+# 默认轮询间隔（秒）
+DEFAULT_POLL_INTERVAL = 30
+
+# 实时窗口天数（UTC今天及之前的天数），更早的任务状态视为稳定，直接使用缓存
+DEFAULT_LIVE_DAYS = 2
+
+
+class Subscription:
+    """一个客户端对 (日期范围, 租户, 任务类型) 视图的订阅"""
+    
+    def __init__(self, start_date: str, end_date: str, tenant_ids: List[str], task_types: List[str],
+                 max_pending: int = 5):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.tenant_ids = list(tenant_ids)
+        self.task_types = list(task_types)
+        self.last_summary = None
+        self._last_data = None
+        self._events = queue.Queue(maxsize=max_pending)
+    
+    @property
+    def range_key(self):
+        return self.start_date, self.end_date
+    
+    def publish(self, cube: StatisticsCube, updated_at: str) -> bool:
+        """
+        根据最新立方体生成该视图的统计数据，有变化时放入待发送队列
+        
+        Returns:
+            bool: 是否推送了新数据
+        """
+        data = cube.to_statistics_data(self.tenant_ids, self.task_types)
+        if data == self._last_data:
+            return False
+        
+        summary = cube.to_summary(self.tenant_ids, self.task_types)
+        event = {
+            'data': data,
+            'summary': summary,
+            'summary_delta': _summary_delta(self.last_summary, summary),
+            'task_types': self.task_types,
+            'updated_at': updated_at
+        }
+        self._last_data = data
+        self.last_summary = summary
+        
+        # 客户端消费过慢时丢弃最旧的事件，只保留最新的统计结果
+        while True:
+            try:
+                self._events.put_nowait(event)
+                return True
+            except queue.Full:
+                try:
+                    self._events.get_nowait()
+                except queue.Empty:
+                    pass
+    
+    def next_event(self, timeout: float) -> Optional[Dict]:
+        """等待下一个事件，超时返回None（用于发送心跳）"""
+        try:
+            return self._events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+def _summary_delta(old: Optional[Dict], new: Dict) -> Dict[str, Dict[str, int]]:
+    """汇总数据的变化量（只包含有变化的任务类型和指标）"""
+    if old is None:
+        return {}
+    
+    delta = {}
+    for task_type in set(old) | set(new):
+        old_counts = old.get(task_type, {})
+        new_counts = new.get(task_type, {})
+        changes = {m: new_counts.get(m, 0) - old_counts.get(m, 0) for m in MEASURES}
+        changes = {m: v for m, v in changes.items() if v}
+        if changes:
+            delta[task_type] = changes
+    return delta
+
+
+class LiveStatisticsHub:
+    """实时统计推送中心（进程内单例使用）"""
+    
+    def __init__(self, load_cube: Callable[[str, str], Optional[StatisticsCube]],
+                 fetch_live_cube: Callable[[str, str], Optional[StatisticsCube]],
+                 poll_interval: int = DEFAULT_POLL_INTERVAL, live_days: int = DEFAULT_LIVE_DAYS):
+        """
+        初始化推送中心
+        
+        Args:
+            load_cube: (start_date, end_date) -> 缓存的完整日期范围立方体
+            fetch_live_cube: (start_date, end_date) -> 实时窗口重新统计的立方体（不使用缓存）
+            poll_interval: 轮询间隔（秒）
+            live_days: 实时窗口天数
+        """
+        self.load_cube = load_cube
+        self.fetch_live_cube = fetch_live_cube
+        self.poll_interval = poll_interval
+        self.live_days = live_days
+        
+        self._subscriptions = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._live_cube = None
+        self._live_window = None
+        self._updated_at = None
+        self.poll_count = 0
+    
+    def live_window(self, now: Optional[datetime] = None):
+        """当前实时窗口 (开始日期, 结束日期)"""
+        today = (now or datetime.now(timezone.utc)).date()
+        start = today - timedelta(days=self.live_days - 1)
+        return start.strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d')
+    
+    def subscribe(self, start_date: str, end_date: str, tenant_ids: List[str],
+                  task_types: List[str]) -> Subscription:
+        """
+        订阅视图：立即推送当前数据，并确保后台轮询线程在运行
+        
+        Returns:
+            Subscription: 订阅对象，使用完毕后必须调用 unsubscribe
+        """
+        subscription = Subscription(start_date, end_date, tenant_ids, task_types)
+        
+        cube = self._view_cube(start_date, end_date, self._live_cube, self._live_window)
+        if cube is not None:
+            subscription.publish(cube, self._updated_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        
+        with self._lock:
+            self._subscriptions.append(subscription)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='live-statistics', daemon=True)
+                self._thread.start()
+        
+        logger.info(f"新增实时统计订阅: {start_date} ~ {end_date}，当前订阅数 {self.subscriber_count}")
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """取消订阅（没有订阅者时后台线程会自动退出）"""
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+            remaining = len(self._subscriptions)
+        if remaining == 0:
+            self._wakeup.set()
+        logger.info(f"取消实时统计订阅，当前订阅数 {remaining}")
+    
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscriptions)
+    
+    def _view_cube(self, start_date: str, end_date: str, live_cube: Optional[StatisticsCube],
+                   live_window) -> Optional[StatisticsCube]:
+        """缓存的日期范围立方体与实时窗口合并"""
+        cube = self.load_cube(start_date, end_date)
+        if cube is None or live_cube is None:
+            return cube
+        # 实时窗口与订阅范围的交集
+        return cube.overlay(live_cube, max(start_date, live_window[0]), min(end_date, live_window[1]))
+    
+    def poll_once(self, now: Optional[datetime] = None) -> int:
+        """
+        执行一轮轮询：实时窗口只统计一次，再按日期范围分组推送给所有订阅者
+        
+        Returns:
+            int: 本轮推送的事件数
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        
+        live_window = self.live_window(now)
+        # 只有订阅范围与实时窗口有交集时才需要查询数据库
+        active = [s for s in subscriptions if s.start_date <= live_window[1] and s.end_date >= live_window[0]]
+        if not active:
+            return 0
+        
+        live_cube = self.fetch_live_cube(*live_window)
+        if live_cube is None:
+            logger.warning("实时窗口统计失败，跳过本轮推送")
+            return 0
+        
+        self._live_cube = live_cube
+        self._live_window = live_window
+        self._updated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.poll_count += 1
+        
+        published = 0
+        view_cubes = {}
+        for subscription in active:
+            if subscription.range_key not in view_cubes:
+                view_cubes[subscription.range_key] = self._view_cube(
+                    subscription.start_date, subscription.end_date, live_cube, live_window
+                )
+            cube = view_cubes[subscription.range_key]
+            if cube is not None and subscription.publish(cube, self._updated_at):
+                published += 1
+        
+        logger.info(f"实时统计轮询完成: {len(active)} 个订阅，{len(view_cubes)} 个日期范围，推送 {published} 个更新")
+        return published
+    
+    def _run(self) -> None:
+        """后台轮询线程"""
+        logger.info("实时统计轮询线程启动")
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            
+            with self._lock:
+                if not self._subscriptions:
+                    self._thread = None
+                    break
+            
+            started = time.time()
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.error(f"实时统计轮询失败: {str(e)}")
+            logger.debug(f"实时统计轮询耗时 {time.time() - started:.2f} 秒")
+        logger.info("没有实时统计订阅，轮询线程退出")
@@ -0,0 +1,105 @@
+"""
+统计详情分页模块
+基于 (created_at, req_ssn) 的游标分页，以及多分表结果的全局归并
+"""
+import base64
+import heapq
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+def _format_cursor_time(value) -> str:
+    """将created_at统一转换为可比较、可回传给MySQL的字符串"""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    return str(value)
+
+
+def encode_cursor(created_at, req_ssn: str) -> str:
+    """
+    生成不透明的分页游标
+    
+    Args:
+        created_at: 当前页最后一条记录的创建时间
+        req_ssn: 当前页最后一条记录的请求SSN
+        
+    Returns:
+        str: URL安全的base64游标字符串
+    """
+    payload = json.dumps([_format_cursor_time(created_at), req_ssn or ''], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    解析分页游标
+    
+    Args:
+        cursor: encode_cursor 生成的游标，为空表示第一页
+        
+    Returns:
+        Optional[Tuple[str, str]]: (created_at, req_ssn)，游标为空返回None
+        
+    Raises:
+        ValueError: 游标格式无效
+    """
+    if not cursor:
+        return None
+    
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, req_ssn = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+    
+    if not isinstance(created_at, str) or not isinstance(req_ssn, str):
+        raise ValueError(f"无效的分页游标: {cursor}")
+    
+    return created_at, req_ssn
+
+
+def keyset_condition(alias: str = 'a') -> str:
+    """
+    获取游标分页的WHERE条件（按创建时间和SSN倒序）
+    
+    参数顺序: created_at, created_at, req_ssn
+    """
+    return (f"({alias}.created_at < %s OR "
+            f"({alias}.created_at = %s AND {alias}.req_ssn < %s))")
+
+
+def row_sort_key(row: Dict) -> Tuple[str, str]:
+    """详情行的全局排序键"""
+    return _format_cursor_time(row.get('created_at')), row.get('req_ssn') or ''
+
+
+def merge_shard_pages(shard_rows: List[List[Dict]], page_size: int) -> Tuple[List[Dict], Optional[str]]:
+    """
+    对各分表已按 (created_at, req_ssn) 倒序排列的结果做k路归并
+    
+    每个分表只需要提供 page_size + 1 条记录，即可确定全局的当前页以及是否还有下一页。
+    
+    Args:
+        shard_rows: 每个分表的查询结果列表
+        page_size: 每页记录数
+        
+    Returns:
+        Tuple[List[Dict], Optional[str]]: (当前页记录, 下一页游标)，没有下一页时游标为None
+    """
+    merged = heapq.merge(*shard_rows, key=row_sort_key, reverse=True)
+    
+    page = []
+    has_more = False
+    for row in merged:
+        if len(page) == page_size:
+            has_more = True
+            break
+        page.append(row)
+    
+    next_cursor = None
+    if has_more and page:
+        last_created_at, last_req_ssn = row_sort_key(page[-1])
+        next_cursor = encode_cursor(last_created_at, last_req_ssn)
+    
+    return page, next_cursor
@@ -0,0 +1,213 @@
+"""
+任务统计SQL模块
+统一生成统计、详情查询的SQL（Web接口和索引检查工具共用），并按分表应用索引提示
+"""
+from typing import List, Optional, Tuple
+
+from config.task_statistics_config import get_index_hint
+
+# 超时判断条件（参数: 参考时间）
+TIMEOUT_CONDITION = """break_at < %s
+        AND (deliver_at IS NULL OR deliver_at > break_at)
+        AND `status` != 'FAILED'"""
+
+# 详情类型（与前端detail_type一致）
+DETAIL_TYPES = [
+    'failed',
+    'timeout',
+    'succeed',
+    'timeout_but_succeed',
+    'succeed_not_timeout',
+    'timeout_not_succeed'
+]
+
+
+def _placeholders(items: List) -> str:
+    return ','.join(['%s'] * len(items))
+
+
+def cube_query(table: str, tenant_ids: List[str], task_types: List[str],
+               reference_time: str, start_time: str, end_time: str) -> Tuple[str, List]:
+    """
+    统计立方体的分组查询：按 日期、租户、任务类型 分组统计所有指标
+    
+    Args:
+        table: job分表名
+        tenant_ids: 租户ID列表
+        task_types: 任务类型列表
+        reference_time: 超时判断的参考时间（UTC）
+        start_time: 开始时间（UTC）
+        end_time: 结束时间（UTC）
+        
+    Returns:
+        Tuple[str, List]: (sql, params)
+    """
+    timeout_condition = TIMEOUT_CONDITION.strip()
+    sql = f"""
+            SELECT 
+                DATE(created_at) AS date,
+                tenant_id,
+                type as task_type,
+                COUNT(*) as total_count,
+                SUM(CASE WHEN `status` = 'FAILED' THEN 1 ELSE 0 END) as failed_count,
+                SUM(CASE WHEN {timeout_condition} THEN 1 ELSE 0 END) as timeout_count,
+                SUM(CASE WHEN `status` = 'SUCCEED' THEN 1 ELSE 0 END) as succeed_count,
+                SUM(CASE WHEN ({timeout_condition}) AND `status` = 'SUCCEED' THEN 1 ELSE 0 END) as timeout_but_succeed,
+                SUM(CASE WHEN NOT ({timeout_condition}) AND `status` = 'SUCCEED' THEN 1 ELSE 0 END) as succeed_not_timeout,
+                SUM(CASE WHEN ({timeout_condition}) AND `status` != 'SUCCEED' AND `status` != 'FAILED' THEN 1 ELSE 0 END) as timeout_not_succeed
+            FROM {table} {get_index_hint(table, 'statistics_cube')}
+            WHERE created_at >= %s 
+                AND created_at <= %s
+                AND tenant_id IN ({_placeholders(tenant_ids)})
+                AND type IN ({_placeholders(task_types)})
+            GROUP BY date, tenant_id, task_type
+        """
+    
+    # 参数：reference_time (4次), start_time, end_time, tenant_ids, task_types
+    params = [reference_time] * 4 + [start_time, end_time] + list(tenant_ids) + list(task_types)
+    return sql, params
+
+
+def details_where_condition(detail_type: str, tenant_ids: List[str], task_type: str,
+                            start_time: str, end_time: str, reference_time: str) -> Tuple[str, List]:
+    """
+    根据详情类型构建详情查询的WHERE条件（job表别名为a）
+    
+    Args:
+        detail_type: 详情类型
+        tenant_ids: 租户ID列表
+        task_type: 任务类型
+        start_time: 开始时间（UTC）
+        end_time: 结束时间（UTC）
+        reference_time: 超时判断的参考时间（UTC）
+        
+    Returns:
+        Tuple[str, List]: (where_sql, params)
+        
+    Raises:
+        ValueError: 不支持的详情类型
+    """
+    tenant_placeholders = ', '.join(['%s'] * len(tenant_ids))
+    base_condition = f"""
+                WHERE a.created_at >= %s 
+                    AND a.created_at <= %s 
+                    AND a.tenant_id IN ({tenant_placeholders})
+                    AND a.type = %s"""
+    params = [start_time, end_time] + list(tenant_ids) + [task_type]
+    
+    if detail_type == 'failed':
+        return base_condition + """
+                    AND a.status = 'FAILED'
+                """, params
+    
+    if detail_type == 'succeed':
+        # 已完成
+        return base_condition + """
+                    AND a.status = 'SUCCEED'
+                """, params
+    
+    timeout_condition = TIMEOUT_CONDITION.strip()
+    
+    if detail_type == 'timeout':
+        extra = f"""
+                    AND {timeout_condition}
+                """
+    elif detail_type == 'timeout_but_succeed':
+        # 已超时但已完成
+        extra = f"""
+                    AND {timeout_condition}
+                    AND a.status = 'SUCCEED'
+                """
+    elif detail_type == 'succeed_not_timeout':
+        # 未超时且已完成
+        extra = f"""
+                    AND NOT ({timeout_condition})
+                    AND a.status = 'SUCCEED'
+                """
+    elif detail_type == 'timeout_not_succeed':
+        # 超时未完成
+        extra = f"""
+                    AND {timeout_condition}
+                    AND a.status != 'SUCCEED'
+                    AND a.status != 'FAILED'
+                """
+    else:
+        raise ValueError(f'不支持的详情类型: {detail_type}')
+    
+    return base_condition + extra, params + [reference_time]
+
+
+def details_list_query(table: str, where_condition: str, limit: Optional[int], response_head_length: int) -> str:
+    """
+    详情列表查询（只查询轻量字段，按 created_at, req_ssn 倒序）
+    
+    Args:
+        table: job分表名
+        where_condition: details_where_condition 生成的条件（可追加游标条件）
+        limit: 返回记录数，None表示不限制（流式导出）
+        response_head_length: response字段截取长度
+    """
+    log_table = table.replace('job_', 'log_')
+    limit_clause = f"LIMIT {int(limit)}" if limit is not None else ''
+    return f"""
+                SELECT 
+                    a.created_at,
+                    a.break_at,
+                    a.deliver_at,
+                    a.req_ssn,
+                    a.result,
+                    b.ext_ssn,
+                    LEFT(b.response, {response_head_length}) as response_head,
+                    a.status,
+                    b.state as log_state,
+                    '{table}' as source_table
+                FROM {table} a {get_index_hint(table, 'details_list')}
+                LEFT JOIN {log_table} b ON b.req_ssn = a.req_ssn
+                {where_condition}
+                ORDER BY a.created_at DESC, a.req_ssn DESC
+                {limit_clause}
+                """
+
+
+def recrawl_candidates_query(table: str, where_condition: str) -> str:
+    """
+    重爬候选记录查询（只读 job 表的 req_ssn、status、result，不关联 log 表，按 created_at, req_ssn 倒序）
+    
+    Args:
+        table: job分表名
+        where_condition: details_where_condition 生成的条件（只引用 job 表）
+    """
+    return f"""
+                SELECT a.req_ssn, a.status, a.result
+                FROM {table} a {get_index_hint(table, 'details_list')}
+                {where_condition}
+                ORDER BY a.created_at DESC, a.req_ssn DESC
+                """
+
+
+def details_count_query(table: str, where_condition: str) -> str:
+    """详情总数查询（只扫描job表）"""
+    return f"SELECT COUNT(*) AS total FROM {table} a {get_index_hint(table, 'details_count')} {where_condition}"
+
+
+def detail_row_query(table: str) -> str:
+    """单条详情记录查询（包含全部重字段，参数: req_ssn）"""
+    log_table = table.replace('job_', 'log_')
+    return f"""
+            SELECT 
+                a.created_at,
+                a.break_at,
+                a.deliver_at,
+                a.req_ssn,
+                a.payload,
+                a.result,
+                b.ext_ssn,
+                b.analysis_response,
+                b.response,
+                a.status,
+                b.state as log_state
+            FROM {table} a 
+            LEFT JOIN {log_table} b ON b.req_ssn = a.req_ssn
+            WHERE a.req_ssn = %s
+            LIMIT 1
+        """
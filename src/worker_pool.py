@@ -0,0 +1,183 @@
+"""
+读取器工作线程池模块
+在Web进程内用常驻线程执行读取任务，复用已导入的模块、Azure客户端和访问令牌，
+并按任务捕获输出（print 和日志）
+"""
+import io
+import logging
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from src.job_queue import PRIORITY_BULK, PRIORITY_INTERACTIVE, Job, JobQueue
+
+logger = logging.getLogger(__name__)
+
+# 捕获到任务输出中的日志格式（与命令行运行时一致）
+TASK_LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class _LineSink:
+    """按行回调的输出缓冲"""
+    
+    def __init__(self, on_line: Callable[[str], None]):
+        self.on_line = on_line
+        self._partial = ''
+    
+    def write(self, text: str) -> None:
+        text = self._partial + text
+        lines = text.split('\n')
+        self._partial = lines.pop()
+        for line in lines:
+            self.on_line(line.rstrip('\r'))
+    
+    def write_line(self, line: str) -> None:
+        """写入完整的一行（先输出未换行的部分，避免与日志混在同一行）"""
+        self.close()
+        self.on_line(line)
+    
+    def close(self) -> None:
+        if self._partial:
+            self.on_line(self._partial)
+            self._partial = ''
+
+
+class _ThreadRoutedStream(io.TextIOBase):
+    """按线程分发的标准输出：注册了捕获的线程写入对应任务，其余线程写入原始输出"""
+    
+    def __init__(self, fallback, sinks: Dict[int, _LineSink]):
+        self._fallback = fallback
+        self._sinks = sinks
+    
+    def write(self, text: str) -> int:
+        sink = self._sinks.get(threading.get_ident())
+        if sink is not None:
+            sink.write(text)
+        else:
+            self._fallback.write(text)
+        return len(text)
+    
+    def flush(self) -> None:
+        if threading.get_ident() not in self._sinks:
+            self._fallback.flush()
+    
+    def isatty(self) -> bool:
+        return False
+    
+    @property
+    def encoding(self):
+        return getattr(self._fallback, 'encoding', 'utf-8')
+
+
+class _ThreadRoutedLogHandler(logging.Handler):
+    """将任务线程中产生的日志写入该任务的输出"""
+    
+    def __init__(self, sinks: Dict[int, _LineSink]):
+        super().__init__()
+        self._sinks = sinks
+        self.setFormatter(logging.Formatter(TASK_LOG_FORMAT))
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        sink = self._sinks.get(record.thread)
+        if sink is None:
+            return
+        try:
+            sink.write_line(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+# 线程ID -> 当前任务的输出缓冲
+_sinks: Dict[int, _LineSink] = {}
+_install_lock = threading.Lock()
+_log_handler = _ThreadRoutedLogHandler(_sinks)
+
+
+def _install_output_routing() -> None:
+    """替换 sys.stdout/sys.stderr 并挂载日志处理器（已替换时跳过，被其他代码还原后会重新替换）"""
+    with _install_lock:
+        if not isinstance(sys.stdout, _ThreadRoutedStream):
+            sys.stdout = _ThreadRoutedStream(sys.stdout, _sinks)
+        if not isinstance(sys.stderr, _ThreadRoutedStream):
+            sys.stderr = _ThreadRoutedStream(sys.stderr, _sinks)
+        root_logger = logging.getLogger()
+        if _log_handler not in root_logger.handlers:
+            root_logger.addHandler(_log_handler)
+
+
+@contextmanager
+def capture_output(on_line: Callable[[str], None]):
+    """
+    在当前线程内捕获 print 输出和日志，逐行回调
+    
+    Args:
+        on_line: 每输出一行调用一次
+    """
+    _install_output_routing()
+    ident = threading.get_ident()
+    sink = _LineSink(on_line)
+    _sinks[ident] = sink
+    try:
+        yield
+    finally:
+        _sinks.pop(ident, None)
+        sink.close()
+
+
+def _load_reader():
+    """导入读取器模块（Azure SDK 等重量级依赖只在第一次调用时导入）"""
+    from src import azure_resource_reader
+    return azure_resource_reader
+
+
+class ReaderWorkerPool:
+    """读取器工作线程池（任务在共享的有界任务队列中排队执行）"""
+    
+    def __init__(self, job_queue: JobQueue):
+        """
+        初始化工作线程池
+        
+        Args:
+            job_queue: 执行任务的队列（决定并发数、排队上限和调度顺序）
+        """
+        self.job_queue = job_queue
+    
+    @property
+    def max_workers(self) -> int:
+        return self.job_queue.max_workers
+    
+    def warm_up(self) -> Job:
+        """在后台导入读取器模块并预热Azure客户端，不阻塞Web进程启动"""
+        def _warm_up():
+            _load_reader().warm_up_readers()
+        
+        return self.job_queue.submit(_warm_up, priority=PRIORITY_BULK, fairness_key='warm_up', name='读取器预热')
+    
+    def submit(self, argv: List[str], on_line: Callable[[str], None],
+               on_start: Optional[Callable[[], None]] = None,
+               priority: int = PRIORITY_INTERACTIVE, fairness_key: str = 'default') -> Job:
+        """
+        提交读取任务
+        
+        Args:
+            argv: 读取器参数（与命令行一致，不含脚本名）
+            on_line: 任务输出的每一行
+            on_start: 任务开始执行时调用
+            priority: 任务优先级
+            fairness_key: 公平调度键（如任务类型）
+            
+        Returns:
+            Job: 任务对象，job.future 的结果为读取器退出码
+            
+        Raises:
+            QueueFullError: 排队任务数已达上限
+        """
+        def _run():
+            if on_start:
+                on_start()
+            with capture_output(on_line):
+                return _load_reader().run_reader(argv)
+        
+        return self.job_queue.submit(_run, priority=priority, fairness_key=fairness_key,
+                                     name=' '.join(argv))
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+目录索引测试模块
+"""
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.dir_index import DirectoryIndex
+
+
+class TestDirectoryIndex(unittest.TestCase):
+    """目录索引测试类"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.dir = self.temp_dir.name
+        os.mkdir(os.path.join(self.dir, 'sub'))
+        self.write('page_2.html', b'<p>2</p>')
+        self.write('page_1.html', b'<p>1</p>')
+        self.age_dir()
+    
+    def write(self, name, data):
+        path = os.path.join(self.dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+    
+    def age_dir(self, seconds=60):
+        """把目录的修改时间调早，避免落在 racy_window 内"""
+        mtime = time.time() - seconds
+        os.utime(self.dir, (mtime, mtime))
+    
+    def test_list_files(self):
+        index = DirectoryIndex()
+        files = index.list_files(self.dir)
+        self.assertEqual([f.name for f in files], ['page_1.html', 'page_2.html'])
+        self.assertEqual(files[0].size, 8)
+        self.assertAlmostEqual(files[0].mtime, os.stat(os.path.join(self.dir, 'page_1.html')).st_mtime)
+    
+    def test_cached_until_directory_changes(self):
+        index = DirectoryIndex()
+        index.list_files(self.dir)
+        index.list_files(self.dir + os.sep)
+        self.assertEqual((index.hits, index.misses), (1, 1))
+        
+        self.write('parse_result.json', b'{}')
+        self.age_dir(30)
+        self.assertIn('parse_result.json', [f.name for f in index.list_files(self.dir)])
+        self.assertEqual(index.misses, 2)
+    
+    def test_invalidate(self):
+        """原地改写文件不改变目录修改时间，写入方调用 invalidate"""
+        index = DirectoryIndex()
+        index.list_files(self.dir)
+        mtime = os.stat(self.dir).st_mtime
+        self.write('page_1.html', b'<p>changed</p>')
+        os.utime(self.dir, (mtime, mtime))
+        self.assertEqual(index.list_files(self.dir)[0].size, 8)
+        
+        index.invalidate(self.dir)
+        self.assertEqual(index.list_files(self.dir)[0].size, 14)
+        self.assertEqual(index.list_files(self.dir, refresh=True)[0].size, 14)
+    
+    def test_recently_modified_not_cached(self):
+        index = DirectoryIndex()
+        self.write('page_3.html', b'')
+        index.list_files(self.dir)
+        index.list_files(self.dir)
+        self.assertEqual(index.misses, 2)
+    
+    def test_missing_or_not_directory(self):
+        index = DirectoryIndex()
+        self.assertIsNone(index.try_list_files(os.path.join(self.dir, 'missing')))
+        with self.assertRaises(NotADirectoryError):
+            index.list_files(os.path.join(self.dir, 'page_1.html'))
+    
+    def test_lru_eviction(self):
+        index = DirectoryIndex(max_entries=1)
+        sub = os.path.join(self.dir, 'sub')
+        os.utime(sub, (time.time() - 60,) * 2)
+        index.list_files(self.dir)
+        index.list_files(sub)
+        index.list_files(self.dir)
+        self.assertEqual(index.misses, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
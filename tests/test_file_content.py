@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+文件内容读取测试模块
+"""
+import gzip
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.file_content import (
+    FALLBACK_ENCODING, EncodingCache, FileContentCache, http_charset, logical_name, resolve_stored_file,
+    sniff_encoding
+)
+
+
+class TestFileContent(unittest.TestCase):
+    """文件内容读取测试类"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+    
+    def write(self, name, data):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+    
+    def test_sniff_encoding(self):
+        self.assertEqual(sniff_encoding('商品'.encode('utf-8'), complete=True), 'utf-8')
+        self.assertEqual(sniff_encoding(b'\xef\xbb\xbf<html>', complete=True), 'utf-8-sig')
+        self.assertEqual(sniff_encoding('カート'.encode('shift_jis'), complete=True), 'shift_jis')
+        # 样本末尾被截断的多字节字符不影响检测
+        self.assertEqual(sniff_encoding('商品'.encode('utf-8')[:-1], complete=False), 'utf-8')
+    
+    def test_http_charset(self):
+        self.assertEqual(http_charset('utf-8-sig'), 'utf-8')
+        self.assertEqual(http_charset('cp1252'), 'windows-1252')
+        self.assertEqual(http_charset('shift_jis'), 'shift_jis')
+        self.assertIsNone(http_charset(FALLBACK_ENCODING))
+    
+    def test_cached_by_mtime(self):
+        """同一文件只检测一次，修改后重新检测"""
+        cache = EncodingCache()
+        path = self.write('page.html', '<p>カート</p>'.encode('shift_jis'))
+        
+        self.assertEqual(cache.read_text(path), ('<p>カート</p>', 'shift_jis'))
+        self.assertEqual(cache.get(path), 'shift_jis')
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        
+        self.write('page.html', '<p>商品</p>'.encode('utf-8'))
+        os.utime(path, ns=(0, 1))
+        self.assertEqual(cache.read_text(path), ('<p>商品</p>', 'utf-8'))
+        self.assertEqual(cache.misses, 2)
+    
+    def test_redetect_after_sample(self):
+        """样本之后出现无法按样本编码解码的内容时，按完整内容重新检测"""
+        cache = EncodingCache(sample_size=16)
+        text = 'a' * 32 + 'カート'
+        path = self.write('page.html', text.encode('shift_jis'))
+        
+        self.assertEqual(cache.read_text(path), (text, 'shift_jis'))
+        self.assertEqual(cache.get(path), 'shift_jis')
+    
+    def test_lru_eviction(self):
+        cache = EncodingCache(max_entries=2)
+        paths = [self.write(f'{i}.txt', b'x') for i in range(3)]
+        for path in paths:
+            cache.get(path)
+        self.assertEqual(len(cache._entries), 2)
+        cache.get(paths[0])
+        self.assertEqual(cache.misses, 4)
+    
+    
+    def test_compressed_storage(self):
+        """保持压缩保存的文件按解压后的文件名访问，读取时透明解压"""
+        path = self.write('page_1.html.gz', gzip.compress('<p>カート</p>'.encode('shift_jis')))
+        logical_path = path[:-len('.gz')]
+        
+        self.assertEqual(logical_name('page_1.html.gz'), 'page_1.html')
+        self.assertEqual(logical_name('page_1.gz'), 'page_1.gz')
+        self.assertEqual(resolve_stored_file(logical_path), (path, True))
+        self.assertEqual(resolve_stored_file(path), (path, True))
+        self.assertEqual(EncodingCache().read_text(path), ('<p>カート</p>', 'shift_jis'))
+        
+        # 未压缩的文件优先
+        self.write('page_1.html', b'<p>plain</p>')
+        self.assertEqual(resolve_stored_file(logical_path), (logical_path, False))
+
+
+
+class TestFileContentCache(unittest.TestCase):
+    """热点文件内容缓存测试类"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+    
+    def write(self, name, data):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+    
+    def test_text_and_json_cached(self):
+        cache = FileContentCache()
+        path = self.write('parse_result.json', '{"title": "商品"}'.encode('utf-8'))
+        
+        self.assertEqual(cache.read_text(path), ('{"title": "商品"}', 'utf-8'))
+        parsed = cache.read_json(path)
+        self.assertEqual(parsed, {'title': '商品'})
+        self.assertIs(cache.read_json(path), parsed)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (2, 1, 1))
+        self.assertAlmostEqual(stats['hit_rate'], 2 / 3, places=3)
+        
+        # 文件修改后重新读取
+        self.write('parse_result.json', b'[]')
+        os.utime(path, ns=(0, 1))
+        self.assertEqual(cache.read_json(path), [])
+        self.assertEqual(cache.stats()['misses'], 2)
+    
+    def test_invalid_json(self):
+        cache = FileContentCache()
+        path = self.write('broken.json', b'{broken')
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                cache.read_json(path)
+        self.assertEqual(cache.read_text(path)[0], '{broken')
+    
+    def test_memory_bound(self):
+        """按估算的内存占用淘汰最久未使用的文件，过大的文件不缓存"""
+        paths = [self.write(f'{i}.txt', b'x' * 1000) for i in range(3)]
+        cache = FileContentCache(max_bytes=2500, max_entry_bytes=2000)
+        for path in paths:
+            cache.read_text(path)
+        stats = cache.stats()
+        self.assertEqual((stats['entries'], stats['evictions']), (2, 1))
+        self.assertLessEqual(stats['bytes'], 2500)
+        
+        cache.read_text(paths[0])
+        self.assertEqual(cache.stats()['misses'], 4)
+        
+        large = self.write('large.txt', b'x' * 3000)
+        cache.read_text(large)
+        cache.read_text(large)
+        self.assertEqual(cache.stats()['misses'], 6)
+        
+        # 解析后的 JSON 计入内存占用
+        cache = FileContentCache(max_bytes=100000)
+        path = self.write('items.json', b'[' + b'1,' * 999 + b'1]')
+        cache.read_text(path)
+        before = cache.stats()['bytes']
+        cache.read_json(path)
+        self.assertGreater(cache.stats()['bytes'], before)
+
+
+if __name__ == '__main__':
+    unittest.main()
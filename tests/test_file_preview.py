@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+文件预览测试模块
+"""
+import gzip
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.file_preview import JSON_PREVIEW_LENGTH, METADATA_FIELDS, build_file_metadata, json_empty_type
+
+
+class TestFilePreview(unittest.TestCase):
+    """文件预览测试类"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+    
+    def write(self, name, data):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+    
+    def test_json_metadata(self):
+        content = {'items': [{'name': f'商品{i}'} for i in range(200)]}
+        path = self.write('parse_result.json', json.dumps(content, ensure_ascii=False).encode('utf-8'))
+        
+        metadata = build_file_metadata(path)
+        self.assertEqual(set(metadata), set(METADATA_FIELDS))
+        self.assertEqual(metadata['preview_type'], 'json')
+        self.assertEqual(metadata['json_type'], 'object')
+        self.assertEqual(metadata['json_length'], 1)
+        self.assertFalse(metadata['is_empty_json'])
+        self.assertEqual(metadata['line_count'], 1)
+        self.assertEqual(metadata['preview'],
+                         json.dumps(content, indent=2, ensure_ascii=False)[:JSON_PREVIEW_LENGTH])
+    
+    def test_empty_json(self):
+        self.assertEqual(json_empty_type([]), 'empty_array')
+        self.assertEqual(json_empty_type(''), 'empty_string')
+        self.assertIsNone(json_empty_type(0))
+        
+        metadata = build_file_metadata(self.write('parse_result.json', b'{}'))
+        self.assertTrue(metadata['is_empty_json'])
+        self.assertEqual(metadata['empty_json_type'], 'empty_object')
+    
+    def test_html_and_text(self):
+        html = '<p>カート</p>\n' * 100
+        metadata = build_file_metadata(self.write('page_1.html', html.encode('shift_jis')))
+        self.assertEqual(metadata['preview_type'], 'html')
+        self.assertEqual(metadata['preview'], html[:500] + '...')
+        self.assertEqual(metadata['line_count'], 100)
+        self.assertIsNone(metadata['json_type'])
+        
+        metadata = build_file_metadata(self.write('notes.txt', b'line'))
+        self.assertEqual((metadata['preview'], metadata['preview_type']), ('line', 'text'))
+    
+    def test_compressed_storage(self):
+        """保持压缩保存的文件按解压后的内容预览，也可以按解压后的文件名查找"""
+        path = self.write('page_1.html.gz', gzip.compress(b'<p>stored</p>'))
+        for file_path in (path, path[:-len('.gz')]):
+            metadata = build_file_metadata(file_path)
+            self.assertEqual((metadata['preview'], metadata['preview_type']), ('<p>stored</p>', 'html'))
+    
+    def test_errors(self):
+        metadata = build_file_metadata(os.path.join(self.temp_dir.name, 'missing.json'))
+        self.assertEqual((metadata['preview'], metadata['preview_type']), ('文件不存在', 'error'))
+        
+        metadata = build_file_metadata(self.write('raw_1.gz', gzip.compress(b'data')))
+        self.assertEqual(metadata['preview_type'], 'error')
+        
+        metadata = build_file_metadata(self.write('parse_result.json', b'{broken'))
+        self.assertEqual(metadata['preview_type'], 'error')
+        self.assertTrue(metadata['preview'].startswith('预览失败'))
+
+
+if __name__ == '__main__':
+    unittest.main()
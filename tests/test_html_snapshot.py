@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+HTML精简快照测试模块
+"""
+import gzip
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.html_snapshot import LiteHtmlCache, build_lite_html
+
+PAGE = '''<!DOCTYPE html>
+<html><head><meta charset="shift_jis"><title>  Amazon.co.jp:
+  商品 </title>
+<link rel="canonical" href="https://www.amazon.co.jp/dp/B0TEST">
+<link rel="stylesheet" href="/styles.css"><style>.a-price{color:red}</style>
+<script>var html = "<div>";</script></head>
+<body class="a-m-jp" onload="init()">
+  <div id="price" class="a-section" data-csa-c-id="abc" style="margin:0">
+    <span class="a-offscreen">￥1,980</span><span aria-hidden="true">￥1,980</span>
+  </div>
+  <img src="/images/I/main.jpg" srcset="/a.jpg 1x, /b.jpg 2x" alt="商品画像">
+  <img src="//fls.amazon.co.jp/t.gif" width="1" height="1">
+  <a href="javascript:void(0)">閉じる</a> <a href="/dp/B0OTHER">関連</a>
+  <div style="display: none">隠し</div><div hidden>隠し</div>
+  <input type="hidden" name="token" value="secret">
+  <noscript><img src="/pixel.gif"></noscript><!-- comment -->
+  <pre>  整形
+    済み </pre>
+</body></html>'''
+
+
+class TestHtmlSnapshot(unittest.TestCase):
+    """HTML精简快照测试类"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+    
+    def test_build_lite_html(self):
+        lite = build_lite_html(PAGE).decode('utf-8')
+        
+        for removed in ('<script', '<style>.a', 'stylesheet', 'onload', 'data-csa', 'class=', 'srcset',
+                        'a-offscreen', '隠し', 'secret', 'pixel.gif', 't.gif', 'comment', 'javascript:'):
+            self.assertNotIn(removed, lite)
+        self.assertIn('<meta charset="utf-8">', lite)
+        self.assertIn('<title>Amazon.co.jp: 商品</title>', lite)
+        self.assertEqual(lite.count('￥1,980'), 1)
+        self.assertIn('<img src="https://www.amazon.co.jp/images/I/main.jpg" alt="商品画像" loading="lazy">', lite)
+        self.assertIn('href="https://www.amazon.co.jp/dp/B0OTHER"', lite)
+        self.assertIn('id="price"', lite)
+        self.assertIn('<pre>  整形\n    済み </pre>', lite)
+        self.assertNotIn('\n  ', lite.replace('<pre>  整形\n    済み </pre>', ''))
+    
+    def test_relative_assets_without_page_url(self):
+        """无法确定原站点时删除相对的资源地址（避免向看板请求）"""
+        lite = build_lite_html('<html><body><img src="/images/a.jpg" alt="a"><a href="#top">top</a></body></html>')
+        self.assertIn(b'<img alt="a" loading="lazy">', lite)
+        self.assertIn(b'href="#top"', lite)
+    
+    def test_cache(self):
+        path = os.path.join(self.temp_dir.name, 'page_1.html.gz')
+        with open(path, 'wb') as f:
+            f.write(gzip.compress(PAGE.encode('shift_jis')))
+        cache = LiteHtmlCache(os.path.join(self.temp_dir.name, 'cache'))
+        
+        snapshot = cache.get(path)
+        self.assertEqual(cache.get(path), snapshot)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        with open(snapshot, encoding='utf-8') as f:
+            self.assertIn('￥1,980', f.read())
+        
+        # 原始页面修改后重新生成，删除旧的快照
+        with open(path, 'wb') as f:
+            f.write(gzip.compress('<p>更新</p>'.encode('utf-8')))
+        os.utime(path, ns=(0, 1))
+        updated = cache.get(path)
+        self.assertNotEqual(updated, snapshot)
+        self.assertFalse(os.path.exists(snapshot))
+        self.assertEqual(os.listdir(cache.cache_dir), [os.path.basename(updated)])
+
+
+if __name__ == '__main__':
+    unittest.main()
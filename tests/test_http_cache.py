@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+HTTP缓存和压缩测试模块
+"""
+import gzip
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from flask import Flask, jsonify
+
+from src.http_cache import HTTPCache, content_etag, etag_matches, not_modified
+
+
+class TestHTTPCache(unittest.TestCase):
+    """HTTP缓存和压缩测试类"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.file_path = os.path.join(self.temp_dir.name, 'page.html')
+        with open(self.file_path, 'w', encoding='utf-8') as f:
+            f.write('<p>review</p>' * 1000)
+        self.stored_path = os.path.join(self.temp_dir.name, 'page_1.html.gz')
+        with open(self.stored_path, 'wb') as f:
+            f.write(gzip.compress(b'<p>stored</p>' * 1000))
+        
+        app = Flask(__name__)
+        self.cache = HTTPCache(app, min_size=100)
+        
+        @app.route('/items')
+        def items():
+            return jsonify({'items': list(range(500))})
+        
+        @app.route('/small')
+        def small():
+            return jsonify({'ok': True})
+        
+        @app.route('/file')
+        def file():
+            return self.cache.send_file(self.file_path, mimetype='text/html', charset='utf-8')
+        
+        @app.route('/stored')
+        def stored():
+            return self.cache.send_file(self.stored_path, stored_gzip=True, as_attachment=True,
+                                        download_name='page_1.html')
+        
+        @app.route('/query', methods=['POST'])
+        def query():
+            etag = content_etag('query', 1)
+            if etag_matches(etag):
+                return not_modified(etag)
+            response = jsonify({'rows': list(range(500))})
+            response.set_etag(etag)
+            return response
+        
+        self.client = app.test_client()
+    
+    def test_json_etag_and_gzip(self):
+        response = self.client.get('/items', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertIn(b'499', gzip.decompress(response.data))
+        etag = response.headers['ETag']
+        self.assertTrue(etag.endswith('-gzip"'))
+        
+        response = self.client.get('/items', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+    
+    def test_uncompressed(self):
+        """客户端不接受压缩或响应很小时不压缩"""
+        response = self.client.get('/items')
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.get_json()['items'][-1], 499)
+        
+        response = self.client.get('/small', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertIn('ETag', response.headers)
+    
+    def test_file_compressed_variant_cached(self):
+        for _ in range(2):
+            response = self.client.get('/file', headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+            self.assertEqual(response.headers['Content-Type'], 'text/html; charset=utf-8')
+            self.assertIn('Last-Modified', response.headers)
+            self.assertEqual(gzip.decompress(response.data).decode(), '<p>review</p>' * 1000)
+        self.assertEqual((self.cache.files.hits, self.cache.files.misses), (1, 1))
+        
+        response = self.client.get('/file', headers={'Accept-Encoding': 'gzip',
+                                                     'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+        
+        # 文件修改后 ETag 变化，重新压缩
+        with open(self.file_path, 'a', encoding='utf-8') as f:
+            f.write('<p>new</p>')
+        response = self.client.get('/file', headers={'Accept-Encoding': 'gzip',
+                                                     'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.cache.files.misses, 2)
+    
+    def test_file_range_uncompressed(self):
+        response = self.client.get('/file', headers={'Accept-Encoding': 'gzip', 'Range': 'bytes=0-2'})
+        self.assertEqual(response.status_code, 206)
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.data, b'<p>')
+    
+    def test_post_query_not_modified(self):
+        response = self.client.post('/query', headers={'Accept-Encoding': 'gzip'})
+        etag = response.headers['ETag']
+        self.assertTrue(etag.endswith('-gzip"'))
+        
+        response = self.client.post('/query', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    
+    def test_stored_gzip(self):
+        """压缩保存的文件直接以 Content-Encoding: gzip 发送，客户端不接受压缩时解压"""
+        response = self.client.get('/stored', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.mimetype, 'text/html')
+        self.assertIn('page_1.html', response.headers['Content-Disposition'])
+        with open(self.stored_path, 'rb') as f:
+            self.assertEqual(response.data, f.read())
+        
+        response = self.client.get('/stored')
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.data, b'<p>stored</p>' * 1000)
+        
+        response = self.client.get('/stored', headers={'Accept-Encoding': 'gzip', 'Range': 'bytes=0-2'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, b'<p>')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+启动导入耗时测试模块
+"""
+import os
+import re
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# 命令行 --help 的导入耗时上限（微秒，-X importtime 的累计耗时，不含解释器自身的 site 导入）
+CLI_IMPORT_BUDGET_US = 150000
+
+# --help 不应导入的重量级依赖
+HEAVY_MODULES = ('azure.identity', 'azure.storage.blob', 'pandas', 'tabulate', 'requests', 'mysql.connector')
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def profile_imports(*args):
+    """
+    以 -X importtime 运行命令
+    
+    Returns:
+        tuple: (顶层导入的累计耗时之和（微秒，不含 site）, 导入的模块名集合)
+    """
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=60
+    )
+    if result.returncode != 0:
+        raise AssertionError(f"命令执行失败: {args}\n{result.stderr[-2000:]}")
+    
+    total = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, name = match.groups()
+        modules.add(name)
+        # 缩进为1个空格的是顶层导入，其余已计入上层的累计耗时
+        if len(indent) == 1 and name != 'site':
+            total += int(cumulative)
+    return total, modules
+
+
+class TestImportTime(unittest.TestCase):
+    """启动导入耗时测试类"""
+    
+    def assert_fast_help(self, script):
+        # 取多次运行的最小值，减少磁盘缓存和机器负载的影响
+        runs = [profile_imports(script, '--help') for _ in range(3)]
+        total = min(run[0] for run in runs)
+        modules = runs[0][1]
+        
+        heavy = sorted(name for name in HEAVY_MODULES if name in modules)
+        self.assertEqual(heavy, [], f"{script} --help 导入了重量级依赖: {heavy}")
+        self.assertLess(total, CLI_IMPORT_BUDGET_US,
+                        f"{script} --help 导入耗时 {total / 1000:.1f}ms 超过预算 {CLI_IMPORT_BUDGET_US / 1000:.0f}ms")
+    
+    def test_main_help(self):
+        """数据处理命令行的 --help 不导入 pandas/requests 等依赖"""
+        self.assert_fast_help('src/main.py')
+    
+    def test_reader_help(self):
+        """Azure读取器的 --help 不导入 Azure SDK"""
+        self.assert_fast_help('src/azure_resource_reader.py')
+    
+    def test_reader_show_mapping(self):
+        """查看映射关系不需要 Azure SDK 和数据库驱动"""
+        _, modules = profile_imports('src/azure_resource_reader.py', '--show-mapping')
+        self.assertNotIn('azure.identity', modules)
+        self.assertNotIn('mysql.connector', modules)
+    
+    def test_web_app_skips_http_client(self):
+        """看板启动时不导入 requests（首次批量重爬时才导入）"""
+        _, modules = profile_imports('-c', 'import web_app')
+        self.assertNotIn('requests', modules)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Web任务队列测试模块
+"""
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.job_queue import JobQueue, QueueFullError, PRIORITY_BULK, PRIORITY_INTERACTIVE
+
+
+class TestJobQueue(unittest.TestCase):
+    """任务队列测试类"""
+    
+    def setUp(self):
+        self.queue = JobQueue(max_workers=1, max_pending=5)
+        # 占住唯一的工作线程，使后续任务全部排队
+        self.release = threading.Event()
+        self.blocker = self.queue.submit(self.release.wait, name='blocker')
+        while self.blocker.started_at is None:
+            time.sleep(0.01)
+        self.order = []
+    
+    def tearDown(self):
+        self.release.set()
+        self.queue.shutdown()
+    
+    def _submit(self, name, priority, key):
+        return self.queue.submit(lambda: self.order.append(name), priority=priority,
+                                 fairness_key=key, name=name)
+    
+    def test_priority_and_fairness(self):
+        """交互任务优先；同一优先级内不同公平键轮转执行"""
+        self._submit('bulk-a1', PRIORITY_BULK, 'a')
+        self._submit('bulk-a2', PRIORITY_BULK, 'a')
+        self._submit('bulk-b1', PRIORITY_BULK, 'b')
+        last = self._submit('interactive', PRIORITY_INTERACTIVE, 'c')
+        
+        self.assertEqual(self.queue.position(last), 1)
+        metrics = self.queue.metrics()
+        self.assertEqual(metrics['depth'], {'interactive': 1, 'bulk': 3})
+        self.assertEqual(metrics['depth_by_key']['bulk'], {'a': 2, 'b': 1})
+        
+        self.release.set()
+        self.queue.shutdown()
+        self.assertEqual(self.order, ['interactive', 'bulk-a1', 'bulk-b1', 'bulk-a2'])
+        
+        metrics = self.queue.metrics()
+        self.assertEqual(metrics['completed'], 5)
+        self.assertEqual(metrics['wait_seconds']['bulk']['count'], 3)
+    
+    def test_backpressure(self):
+        """排队任务数达到上限时拒绝提交"""
+        for i in range(5):
+            self._submit(f'job-{i}', PRIORITY_BULK, 'a')
+        with self.assertRaises(QueueFullError):
+            self._submit('overflow', PRIORITY_INTERACTIVE, 'a')
+        self.assertEqual(self.queue.metrics()['rejected'], 1)
+    
+    def test_failed_job(self):
+        """任务异常记录在 future 中，不影响工作线程"""
+        def fail():
+            raise RuntimeError('boom')
+        
+        job = self.queue.submit(fail)
+        self.release.set()
+        with self.assertRaises(RuntimeError):
+            job.future.result(timeout=5)
+        self.assertEqual(self._submit('after', PRIORITY_BULK, 'a').future.result(timeout=5), None)
+        self.assertEqual(self.queue.metrics()['failed'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
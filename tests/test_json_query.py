@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+JSON查询测试模块
+"""
+import gzip
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.json_query import JsonIndexCache, build_index, format_json_path, parse_json_path
+
+DOCUMENT = {
+    'meta': {'count': 3, 'k.e"y': [1, 2], 'text': 'a [b] {c} "d" \\ e'},
+    'data': {'items': [{'id': i, 'name': f'商品{i}', 'deep': {'tags': ['x', {'v': i}]}} for i in range(250)]},
+    'empty_array': [ ],
+    'empty_object': {},
+    'flag': None
+}
+
+
+class TestJsonQuery(unittest.TestCase):
+    """JSON查询测试类"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = self.write('parse_result.json', json.dumps(DOCUMENT, ensure_ascii=False, indent=2).encode())
+        self.cache = JsonIndexCache()
+    
+    def write(self, name, data):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+    
+    def test_parse_path(self):
+        self.assertEqual(parse_json_path('$'), ([], None))
+        self.assertEqual(parse_json_path('data.items[-1].name'), (['data', 'items', -1, 'name'], None))
+        self.assertEqual(parse_json_path('$.meta["k.e\\"y"][0]'), (['meta', 'k.e"y', 0], None))
+        self.assertEqual(parse_json_path("$['a b'][10:20]"), (['a b'], (10, 20)))
+        self.assertEqual(format_json_path(['meta', 'k.e"y', 0]), '$.meta["k.e\\"y"][0]')
+        for bad in ('$..x', '$[1:2].x', '$.a[b]'):
+            with self.assertRaises(ValueError):
+                parse_json_path(bad)
+    
+    def test_array_page(self):
+        result = self.cache.query(self.path, '$.data.items', offset=240, limit=20)
+        self.assertEqual((result['type'], result['length'], result['has_more']), ('array', 250, False))
+        self.assertEqual([item['id'] for item in result['value']], list(range(240, 250)))
+        
+        result = self.cache.query(self.path, 'data.items[10:12]')
+        self.assertEqual([item['name'] for item in result['value']], ['商品10', '商品11'])
+        self.assertTrue(result['has_more'])
+    
+    def test_object_page(self):
+        result = self.cache.query(self.path, '$', limit=2)
+        self.assertEqual(result['type'], 'object')
+        self.assertEqual(result['length'], 5)
+        self.assertEqual(list(result['value']), ['meta', 'data'])
+        self.assertEqual(self.cache.query(self.path, '$.meta')['value'], DOCUMENT['meta'])
+    
+    def test_subtree_below_index(self):
+        """超过索引深度的子树从所在元素解析"""
+        result = self.cache.query(self.path, '$.data.items[-1].deep.tags[1].v')
+        self.assertEqual(result['path'], '$.data.items[249].deep.tags[1].v')
+        self.assertEqual((result['type'], result['value'], result['length']), ('number', 249, None))
+        self.assertEqual(self.cache.query(self.path, 'data.items.3.deep.tags')['value'], ['x', {'v': 3}])
+    
+    def test_empty_and_scalar(self):
+        self.assertEqual(self.cache.query(self.path, 'empty_array')['value'], [])
+        self.assertEqual(self.cache.query(self.path, 'empty_object')['length'], 0)
+        self.assertEqual(self.cache.query(self.path, 'flag')['type'], 'null')
+        self.assertEqual(self.cache.query(self.path, 'meta["k.e\\"y"][1]')['value'], 2)
+        
+        path = self.write('scalar.json', b'"only"')
+        self.assertEqual(self.cache.query(path)['value'], 'only')
+    
+    def test_missing_path(self):
+        for missing in ('$.nope', 'data.items[250]', 'meta.count.x', 'data.items.name'):
+            with self.assertRaises(KeyError):
+                self.cache.query(self.path, missing)
+    
+    def test_cached_until_modified(self):
+        self.cache.query(self.path, '$')
+        self.cache.query(self.path, '$.data')
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        
+        self.write('parse_result.json', b'{"data": [1]}')
+        os.utime(self.path, ns=(0, 1))
+        self.assertEqual(self.cache.query(self.path, '$.data')['value'], [1])
+        self.assertEqual(self.cache.misses, 2)
+    
+    def test_compressed_storage(self):
+        path = self.write('stored.json.gz', gzip.compress(json.dumps(DOCUMENT).encode()))
+        self.assertEqual(self.cache.query(path, 'data.items[5].id')['value'], 5)
+    
+    def test_invalid_structure(self):
+        for data in (b'{"a": [1, 2}', b'{"a": 1', b'[1] [2]'):
+            with self.assertRaises(ValueError):
+                build_index(data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+批量重爬测试模块
+"""
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.recrawl import RecrawlManager, dedupe_job_ids, to_job_id
+
+
+class RecordingClient:
+    """记录调用和最大并发数的客户端"""
+    
+    def __init__(self, pool_size):
+        self.pool_size = pool_size
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+    
+    def resubmit(self, job_id):
+        with self._lock:
+            self.calls.append(job_id)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        with self._lock:
+            self.active -= 1
+        status = 'failed' if job_id.endswith('9') else 'submitted'
+        return {'job_id': job_id, 'status': status, 'http_status': 200 if status == 'submitted' else 500, 'message': ''}
+
+
+class TestRecrawl(unittest.TestCase):
+    """批量重爬测试类"""
+    
+    def setUp(self):
+        self.clients = []
+        
+        def factory(pool_size):
+            client = RecordingClient(pool_size)
+            self.clients.append(client)
+            return client
+        
+        self.manager = RecrawlManager(client_factory=factory, concurrency=3, max_batches=2)
+    
+    def test_job_ids_deduped_with_prefix(self):
+        """req_ssn 加上SL前缀后去重，保持原有顺序"""
+        self.assertEqual(to_job_id('123'), 'SL123')
+        self.assertEqual(to_job_id('SL123'), 'SL123')
+        self.assertEqual(dedupe_job_ids(['2', 'SL1', '1', '', None, '2']), ['SL2', 'SL1'])
+    
+    def test_run_with_bounded_concurrency(self):
+        """批次并发提交不超过并发上限，进度统计成功和失败数"""
+        job_ids = [f'SL{i}' for i in range(20)]
+        batch = self.manager.create('req_ssns', job_ids)
+        progress = self.manager.run(batch)
+        
+        client = self.clients[0]
+        self.assertEqual(client.pool_size, 3)
+        self.assertEqual(sorted(client.calls), sorted(job_ids))
+        self.assertLessEqual(client.max_active, 3)
+        self.assertEqual(progress['status'], 'completed')
+        self.assertEqual(progress['done'], 20)
+        self.assertEqual(progress['failed'], 2)
+        self.assertEqual(len(batch.progress(include_results=True)['results']), 20)
+        
+        # 后续批次复用同一个客户端
+        self.manager.run(self.manager.create('req_ssns', ['SL100']))
+        self.assertEqual(len(self.clients), 1)
+    
+    def test_collect_and_truncate(self):
+        """按筛选条件收集的任务去重后提交，超过上限时截断"""
+        batch = self.manager.create('filter')
+        progress = self.manager.run(batch, collect=lambda: ['1', '2', '1', '3'], max_jobs=2)
+        self.assertEqual(batch.job_ids, ['SL1', 'SL2'])
+        self.assertTrue(progress['truncated'])
+        self.assertEqual(progress['submitted'], 2)
+    
+    def test_collect_error_and_batch_retention(self):
+        """收集失败时批次状态为error；只保留最近的批次"""
+        def failing_collect():
+            raise RuntimeError('数据库连接失败')
+        
+        batch = self.manager.create('filter')
+        progress = self.manager.run(batch, collect=failing_collect)
+        self.assertEqual(progress['status'], 'error')
+        self.assertIn('数据库连接失败', progress['error'])
+        
+        self.manager.create('a')
+        self.manager.create('b')
+        self.assertIsNone(self.manager.get(batch.id))
+
+
+if __name__ == '__main__':
+    unittest.main()
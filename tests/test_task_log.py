@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+任务日志缓冲测试模块
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.task_log import TaskLog
+
+
+class TestTaskLog(unittest.TestCase):
+    """任务日志缓冲测试类"""
+    
+    def test_incremental_reads(self):
+        """按序号增量读取新行"""
+        log = TaskLog()
+        self.assertEqual(log.since(0), {'lines': [], 'first_seq': 0, 'next_seq': 0, 'truncated': False})
+        
+        log.append('a')
+        log.append('b')
+        result = log.since(0)
+        self.assertEqual(result['lines'], ['a', 'b'])
+        self.assertEqual(result['next_seq'], 2)
+        
+        log.append('c')
+        self.assertEqual(log.since(result['next_seq'])['lines'], ['c'])
+        self.assertEqual(log.since(99)['lines'], [])
+        self.assertEqual(log.text(), 'a\nb\nc')
+    
+    def test_bounded_buffer(self):
+        """超过上限时丢弃最早的行，并标记读取范围被截断"""
+        log = TaskLog(max_lines=3)
+        for i in range(5):
+            log.append(str(i))
+        
+        result = log.since(1)
+        self.assertEqual(result['lines'], ['2', '3', '4'])
+        self.assertEqual(result['first_seq'], 2)
+        self.assertTrue(result['truncated'])
+        self.assertFalse(log.since(3)['truncated'])
+    
+    def test_wait_for_change(self):
+        """等待者在追加输出、状态变化或关闭时被唤醒，无变化时超时返回原版本号"""
+        log = TaskLog()
+        version = log.version
+        self.assertEqual(log.wait_for_change(version, timeout=0.05), version)
+        
+        timer = threading.Timer(0.05, log.append, args=('line',))
+        timer.start()
+        started = time.time()
+        version = log.wait_for_change(version, timeout=5)
+        self.assertLess(time.time() - started, 5)
+        self.assertEqual(log.since(0)['lines'], ['line'])
+        
+        log.mark_changed()
+        self.assertNotEqual(log.wait_for_change(version, timeout=0), version)
+        
+        self.assertFalse(log.closed)
+        log.close()
+        self.assertTrue(log.closed)
+    
+    def test_spill_and_load(self):
+        """完整输出写入压缩文件，加载时只保留最后的行且序号不变"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'task', 'output.log.gz')
+            log = TaskLog(max_lines=2, spill_path=path)
+            for i in range(4):
+                log.append(str(i))
+            log.close()
+            
+            loaded = TaskLog.load(path, max_lines=3)
+            self.assertTrue(loaded.closed)
+            self.assertEqual(loaded.next_seq, 4)
+            self.assertEqual(loaded.since(0)['lines'], ['1', '2', '3'])
+            self.assertTrue(loaded.since(0)['truncated'])
+            
+            self.assertEqual(TaskLog.load(os.path.join(tmpdir, 'missing.log.gz')).next_seq, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+任务映射搜索测试模块
+"""
+import sys
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.db.local_connector import build_task_mapping_search, escape_like
+
+
+class TestTaskMappingSearch(unittest.TestCase):
+    """任务映射搜索测试类"""
+    
+    def test_escape_like(self):
+        self.assertEqual(escape_like('50%_a\\b'), '50\\%\\_a\\\\b')
+    
+    def test_no_search(self):
+        where, params, order, order_params = build_task_mapping_search(None)
+        self.assertEqual((where, params, order_params), ('', [], []))
+        self.assertEqual(order, 'ORDER BY tm.updated_at DESC')
+    
+    def test_like_search(self):
+        where, params, order, order_params = build_task_mapping_search('job_1')
+        self.assertNotIn('MATCH', where)
+        self.assertEqual(where.count('LIKE %s'), 3)
+        self.assertEqual(params, ['%job\\_1%'] * 3)
+        self.assertTrue(order.endswith('DESC, tm.updated_at DESC'))
+        self.assertEqual(order_params, ['job\\_1%'] * 3)
+    
+    def test_fulltext_search(self):
+        where, params, _, _ = build_task_mapping_search('Amazon123', fulltext=True)
+        self.assertIn('MATCH(tm.job_id, tm.actual_task_id, tm.task_type) AGAINST (%s IN BOOLEAN MODE)', where)
+        self.assertEqual(params, ['"Amazon123"'] + ['%Amazon123%'] * 3)
+    
+    def test_fulltext_skipped(self):
+        """比 ngram 短或含标点的搜索词不走全文索引"""
+        for term in ('a', 'job-1', 'x"y'):
+            where, params, _, _ = build_task_mapping_search(term, fulltext=True)
+            self.assertNotIn('MATCH', where)
+            self.assertEqual(len(params), 3)
+        where, _, _, _ = build_task_mapping_search('abc', fulltext=True, ngram_token_size=4)
+        self.assertNotIn('MATCH', where)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Web任务执行记录测试模块
+"""
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.task_registry import TaskRegistry
+
+
+class TestTaskRegistry(unittest.TestCase):
+    """Web任务执行记录测试类（本地数据库不可用，只保存在内存中）"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.registry = TaskRegistry(log_dir=self.tmpdir.name, recent_cache_size=2)
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def run_task(self, execution_id, lines, status='completed'):
+        task = self.registry.create(execution_id, f'run {execution_id}', task_id=execution_id, use_parse=False)
+        self.registry.mark_running(execution_id)
+        for line in lines:
+            task['log'].append(line)
+        self.registry.finish(execution_id, status, return_code=0 if status == 'completed' else 1)
+        return task
+    
+    def test_finished_task_output_loaded_from_file(self):
+        """任务结束后输出写入压缩文件，内存中不再保留输出缓冲"""
+        task = self.run_task('a', ['line 1', 'line 2'])
+        self.assertTrue(task['log'].closed)
+        self.assertTrue(os.path.exists(os.path.join(self.tmpdir.name, 'a.log.gz')))
+        self.assertNotIn('log', self.registry._recent['a'])
+        
+        loaded = self.registry.get('a')
+        self.assertEqual(loaded['status'], 'completed')
+        self.assertEqual(loaded['return_code'], 0)
+        self.assertEqual(loaded['log'].text(), 'line 1\nline 2')
+        self.assertEqual(loaded['log'].since(1)['lines'], ['line 2'])
+        self.assertIsNone(self.registry.get('missing'))
+    
+    def test_recent_cache_is_bounded(self):
+        """只保存在内存中时，超出缓存数量的最旧任务连同输出文件被丢弃"""
+        for execution_id in ('a', 'b', 'c'):
+            self.run_task(execution_id, ['output'])
+        
+        self.assertIsNone(self.registry.get('a'))
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir.name, 'a.log.gz')))
+        self.assertIsNotNone(self.registry.get('c'))
+    
+    def test_list_pagination_and_status_filter(self):
+        """按创建时间倒序分页，未结束的任务也会列出"""
+        self.run_task('a', [], status='failed')
+        self.run_task('b', [])
+        self.registry.create('c', 'run c')
+        
+        page, total = self.registry.list(page=1, page_size=2)
+        self.assertEqual(total, 3)
+        self.assertEqual([t['id'] for t in page], ['c', 'b'])
+        self.assertEqual([t['id'] for t in self.registry.list(page=2, page_size=2)[0]], ['a'])
+        self.assertEqual([t['id'] for t in self.registry.list(status='failed')[0]], ['a'])
+    
+    def test_discard_clear_and_prune(self):
+        """提交失败的任务被删除；清空只影响已结束的任务；过期记录被清理"""
+        self.registry.create('x', 'run x')
+        self.registry.discard('x')
+        self.assertIsNone(self.registry.get('x'))
+        
+        self.run_task('a', ['output'])
+        self.registry.create('b', 'run b')
+        self.registry.clear()
+        self.assertIsNone(self.registry.get('a'))
+        self.assertEqual(self.registry.get('b')['status'], 'pending')
+        
+        self.run_task('c', ['output'])
+        self.assertEqual(self.registry.prune(datetime.now() + timedelta(days=self.registry.retention_days + 1)), 1)
+        self.assertIsNone(self.registry.get('c'))
+    
+    
+    def test_duplicate_submissions_coalesce(self):
+        """相同去重键的任务执行中时关联到该任务，结束后在复用时间内可找到"""
+        key = ('1', 'html', False)
+        first, created = self.registry.create_or_attach(key, 'a', 'run a')
+        self.assertTrue(created)
+        second, created = self.registry.create_or_attach(key, 'b', 'run b')
+        self.assertFalse(created)
+        self.assertIs(second, first)
+        self.assertIsNone(self.registry.get('b'))
+        
+        other, created = self.registry.create_or_attach(('1', 'html', True), 'c', 'run c')
+        self.assertTrue(created)
+        
+        self.assertIsNone(self.registry.find_fresh(key, 300))
+        self.registry.finish('a', 'completed', return_code=0)
+        self.assertEqual(self.registry.find_fresh(key, 300)['id'], 'a')
+        self.assertIsNone(self.registry.find_fresh(key, 0))
+        
+        # 结束后再次提交会重新执行
+        third, created = self.registry.create_or_attach(key, 'd', 'run d')
+        self.assertTrue(created)
+        self.registry.finish('d', 'failed', return_code=1)
+        self.assertEqual(self.registry.find_fresh(key, 300)['id'], 'a')
+
+
+if __name__ == '__main__':
+    unittest.main()
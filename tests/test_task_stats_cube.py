@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+任务统计立方体测试模块
+"""
+import sys
+import unittest
+from datetime import date
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.task_stats.cube import MEASURES, StatisticsCube
+
+
+def _row(day, tenant_id, task_type, total, failed=0):
+    """构造一条分组查询结果"""
+    row = {m: 0 for m in MEASURES}
+    row.update({'date': date(2025, 5, day), 'tenant_id': tenant_id, 'task_type': task_type,
+                'total_count': total, 'failed_count': failed})
+    return row
+
+
+class TestStatisticsCube(unittest.TestCase):
+    """统计立方体测试类"""
+    
+    def setUp(self):
+        rows = [
+            _row(27, 'Anker', 'AmazonListingJob', 10, 2),
+            _row(27, 'Anker', 'AmazonListingJob', 5, 1),  # 另一个分表的同一分组
+            _row(27, 'AnkerCS', 'AmazonListingJob', 3),
+            _row(28, 'Anker', 'AmazonReviewJob', 7, 7),
+            _row(28, 'Unknown', 'AmazonReviewJob', 100),
+        ]
+        self.cube = StatisticsCube.from_rows(
+            rows, ['Anker', 'AnkerCS'], ['AmazonListingJob', 'AmazonReviewJob', 'GoogleSearchJob']
+        )
+    
+    def test_statistics_data(self):
+        """测试按租户和任务类型切片"""
+        data = self.cube.to_statistics_data(['Anker', 'AnkerCS'], ['AmazonListingJob'])
+        self.assertEqual(data['total_count'], [{'date': '2025-05-27', 'task_type': 'AmazonListingJob', 'count': 18}])
+        self.assertEqual(data['failed_count'][0]['count'], 3)
+    
+    def test_dates_descending_and_empty_groups_skipped(self):
+        """测试日期倒序且没有数据的组合不输出"""
+        data = self.cube.to_statistics_data(['Anker'], None)
+        self.assertEqual([r['date'] for r in data['total_count']], ['2025-05-28', '2025-05-27'])
+        self.assertNotIn('GoogleSearchJob', [r['task_type'] for r in data['total_count']])
+    
+    def test_summary(self):
+        """测试按任务类型汇总"""
+        summary = self.cube.to_summary(['AnkerCS'], ['AmazonListingJob', 'AmazonReviewJob'])
+        self.assertEqual(list(summary.keys()), ['AmazonListingJob'])
+        self.assertEqual(summary['AmazonListingJob']['total_count'], 3)
+    
+    def test_statistics_data_by_type(self):
+        """测试多任务类型一次切片并按类型拆分"""
+        by_type = self.cube.to_statistics_data_by_type(['Anker'], ['AmazonListingJob', 'AmazonReviewJob'])
+        self.assertEqual(by_type['AmazonListingJob']['total_count'], [{'date': '2025-05-27', 'count': 15}])
+        self.assertEqual(by_type['AmazonReviewJob']['failed_count'], [{'date': '2025-05-28', 'count': 7}])
+
+
+if __name__ == '__main__':
+    unittest.main()
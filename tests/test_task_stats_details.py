@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+统计详情行分类测试模块
+"""
+import json
+import sys
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.task_stats.details import (
+    RECRAWL_ERROR_MESSAGE, classify_result, is_recrawl_eligible, preview_text
+)
+
+
+class TestTaskStatsDetails(unittest.TestCase):
+    """详情行分类测试类"""
+    
+    def test_recrawl_eligible(self):
+        """测试408连接超时的失败记录可以重爬"""
+        result = json.dumps({'E3001': RECRAWL_ERROR_MESSAGE}, ensure_ascii=False)
+        self.assertTrue(is_recrawl_eligible('FAILED', result))
+        self.assertFalse(is_recrawl_eligible('SUCCEED', result))
+    
+    def test_other_errors(self):
+        """测试其他错误和无效JSON"""
+        summary = classify_result(json.dumps({'E3001': '其他错误'}, ensure_ascii=False))
+        self.assertTrue(summary.is_valid_json)
+        self.assertFalse(summary.is_recrawl_error)
+        
+        summary = classify_result('not json')
+        self.assertFalse(summary.is_valid_json)
+        self.assertFalse(is_recrawl_eligible('FAILED', None))
+    
+    def test_preview_text(self):
+        """测试预览截断"""
+        self.assertEqual(preview_text('a' * 150, limit=100), 'a' * 100 + '...')
+        self.assertEqual(preview_text(None), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
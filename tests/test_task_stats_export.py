@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+统计详情流式导出测试模块
+"""
+import csv
+import io
+import json
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.task_stats.details import IO_TIMEOUT_MARKER
+from src.task_stats.export import EXPORT_COLUMNS, export_error, merge_shard_streams, stream_export
+
+
+def _row(table, minute, req_ssn, result=None):
+    return {
+        'source_table': table,
+        'created_at': datetime(2024, 1, 1, 12, minute),
+        'req_ssn': req_ssn,
+        'status': 'FAILED',
+        'result': result
+    }
+
+
+class TestTaskStatsExport(unittest.TestCase):
+    """流式导出测试类"""
+    
+    def setUp(self):
+        self.shards = [
+            [_row('job_a', 30, 'a2'), _row('job_a', 10, 'a1')],
+            [_row('job_b', 20, 'b1', result=json.dumps({'E3001': IO_TIMEOUT_MARKER}))],
+        ]
+    
+    def test_merge_is_lazy_and_ordered(self):
+        """归并结果全局倒序，且按需从各分表读取"""
+        consumed = []
+        
+        def stream(rows):
+            for row in rows:
+                consumed.append(row['req_ssn'])
+                yield row
+        
+        merged = merge_shard_streams([stream(rows) for rows in self.shards])
+        self.assertEqual(next(merged)['req_ssn'], 'a2')
+        self.assertNotIn('a1', consumed)
+        self.assertEqual([row['req_ssn'] for row in merged], ['b1', 'a1'])
+    
+    def test_csv_export(self):
+        """CSV先输出表头，数据按列顺序写出"""
+        chunks = list(stream_export(merge_shard_streams(self.shards), 'csv', chunk_size=1))
+        self.assertTrue(chunks[0].startswith('\ufeff'))
+        self.assertEqual(len(chunks), 4)
+        
+        rows = list(csv.DictReader(io.StringIO(''.join(chunks).lstrip('\ufeff'))))
+        self.assertEqual([row['req_ssn'] for row in rows], ['a2', 'b1', 'a1'])
+        self.assertEqual(rows[0]['created_at'], '2024-01-01 12:30:00')
+        self.assertEqual(rows[1]['is_io_timeout'], 'True')
+    
+    def test_ndjson_export(self):
+        """NDJSON每行一条记录，小记录合并为一个块"""
+        chunks = list(stream_export(merge_shard_streams(self.shards), 'ndjson'))
+        self.assertEqual(len(chunks), 1)
+        
+        records = [json.loads(line) for line in chunks[0].splitlines()]
+        self.assertEqual([r['req_ssn'] for r in records], ['a2', 'b1', 'a1'])
+        self.assertEqual(list(records[0].keys()), EXPORT_COLUMNS)
+    
+    def test_error_marker(self):
+        """导出中途失败时追加的错误标记"""
+        self.assertEqual(json.loads(export_error('分表查询失败', 'ndjson')), {'error': '分表查询失败'})
+        
+        row = next(csv.DictReader(io.StringIO(export_error('a,"b"', 'csv')), fieldnames=EXPORT_COLUMNS))
+        self.assertEqual((row['source_table'], row['result'], row['req_ssn']), ('ERROR', 'a,"b"', ''))
+    
+    def test_invalid_format(self):
+        """不支持的格式立即报错"""
+        with self.assertRaises(ValueError):
+            stream_export([], 'xlsx')
+
+
+if __name__ == '__main__':
+    unittest.main()
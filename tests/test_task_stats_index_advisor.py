@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+统计SQL索引检查模块测试
+"""
+import sys
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.task_stats.index_advisor import analyze_plan, render_statistics_queries, suggest_for_query
+
+
+class TestIndexAdvisor(unittest.TestCase):
+    """索引检查测试"""
+
+    def test_rendered_params_match_placeholders(self):
+        """渲染的SQL占位符数量与参数数量一致"""
+        queries = render_statistics_queries('job_a', ['t1', 't2'], ['AmazonListingJob', 'AmazonReviewJob'],
+                                            '2024-01-08 00:00:00', '2024-01-01 00:00:00', '2024-01-07 23:59:59')
+        self.assertTrue(queries)
+        for name, sql, params in queries:
+            self.assertEqual(sql.replace('%%', '').count('%s'), len(params), name)
+
+    def test_analyze_plan_and_suggestions(self):
+        """识别全表扫描和文件排序，并给出建议"""
+        plan = {'query_block': {'ordering_operation': {
+            'using_filesort': True,
+            'nested_loop': [
+                {'table': {'table_name': 'a', 'access_type': 'ALL', 'rows_examined_per_scan': 1000}},
+                {'table': {'table_name': 'b', 'access_type': 'ref', 'key': 'idx_req_ssn'}}
+            ]
+        }}}
+        analysis = analyze_plan(plan)
+        self.assertEqual(analysis['issues'], ['filesort', 'full_scan'])
+        self.assertEqual([t['table'] for t in analysis['tables']], ['a', 'b'])
+
+        indexes = {'job_a': {'idx_type_created': ['type', 'created_at']}, 'log_a': {'idx_req_ssn': ['req_ssn']}}
+        suggestions = suggest_for_query('details_list:failed', 'job_a', analysis, indexes)
+        self.assertIn("INDEX_HINTS['job_a']['details_list'] = 'FORCE INDEX (idx_type_created)'", suggestions)
+        self.assertFalse(any('log_a' in s for s in suggestions))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+实时统计推送测试模块
+"""
+import sys
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.task_stats.cube import MEASURES, StatisticsCube
+from src.task_stats.live import LiveStatisticsHub
+
+TENANTS = ['t1', 't2']
+TYPES = ['AmazonListingJob', 'AmazonReviewJob']
+NOW = datetime(2024, 1, 10, 8, 0, tzinfo=timezone.utc)
+
+
+def _cube(counts):
+    """counts: {(date, tenant, type): total}"""
+    rows = []
+    for (date, tenant, task_type), total in counts.items():
+        row = {m: 0 for m in MEASURES}
+        row.update({'date': date, 'tenant_id': tenant, 'task_type': task_type, 'total_count': total})
+        rows.append(row)
+    return StatisticsCube.from_rows(rows, TENANTS, TYPES)
+
+
+class TestLiveStatisticsHub(unittest.TestCase):
+    """实时统计推送中心测试类"""
+    
+    def setUp(self):
+        self.base_cube = _cube({
+            ('2024-01-08', 't1', 'AmazonListingJob'): 5,
+            ('2024-01-09', 't1', 'AmazonListingJob'): 3
+        })
+        self.live_total = 4
+        self.live_calls = []
+        
+        def fetch_live_cube(start_date, end_date):
+            self.live_calls.append((start_date, end_date))
+            return _cube({('2024-01-09', 't1', 'AmazonListingJob'): self.live_total,
+                          ('2024-01-10', 't2', 'AmazonListingJob'): 1})
+        
+        self.hub = LiveStatisticsHub(lambda start, end: self.base_cube, fetch_live_cube)
+        self.hub._thread = _AliveThread()
+    
+    def test_overlay_replaces_live_dates(self):
+        """实时窗口的日期覆盖缓存数据，其余日期保持不变"""
+        merged = self.base_cube.overlay(self.hub.fetch_live_cube('2024-01-09', '2024-01-10'),
+                                        '2024-01-09', '2024-01-10')
+        self.assertEqual(merged.dates, ['2024-01-10', '2024-01-09', '2024-01-08'])
+        self.assertEqual(merged.to_summary()['AmazonListingJob']['total_count'], 10)
+    
+    def test_one_live_query_for_all_subscribers(self):
+        """多个订阅者每轮只统计一次实时窗口，且只推送有变化的视图"""
+        first = self.hub.subscribe('2024-01-04', '2024-01-10', ['t1'], ['AmazonListingJob'])
+        second = self.hub.subscribe('2024-01-04', '2024-01-10', ['t2'], ['AmazonListingJob'])
+        self.assertEqual(first.next_event(0)['summary']['AmazonListingJob']['total_count'], 8)
+        self.assertEqual(second.next_event(0)['summary'], {})
+        
+        self.assertEqual(self.hub.poll_once(NOW), 2)
+        self.assertEqual(self.live_calls, [('2024-01-09', '2024-01-10')])
+        event = first.next_event(0)
+        self.assertEqual(event['summary']['AmazonListingJob']['total_count'], 9)
+        self.assertEqual(event['summary_delta'], {'AmazonListingJob': {'total_count': 1}})
+        self.assertEqual(second.next_event(0)['summary']['AmazonListingJob']['total_count'], 1)
+        
+        # 数据未变化时不推送
+        self.assertEqual(self.hub.poll_once(NOW), 0)
+        self.assertIsNone(first.next_event(0))
+        
+        self.live_total = 6
+        self.assertEqual(self.hub.poll_once(NOW), 1)
+        self.assertEqual(len(self.live_calls), 3)
+    
+    def test_no_query_outside_live_window(self):
+        """订阅范围与实时窗口无交集时不查询数据库"""
+        subscription = self.hub.subscribe('2023-12-01', '2023-12-31', TENANTS, TYPES)
+        self.assertEqual(self.hub.poll_once(NOW), 0)
+        self.assertEqual(self.live_calls, [])
+        
+        self.hub.unsubscribe(subscription)
+        self.assertEqual(self.hub.subscriber_count, 0)
+
+
+class _AliveThread:
+    """测试中替代后台轮询线程，由测试直接调用 poll_once"""
+    
+    def is_alive(self):
+        return True
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+统计详情游标分页测试模块
+"""
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.task_stats.pagination import decode_cursor, encode_cursor, merge_shard_pages
+
+
+def _rows(table, *items):
+    """构造按 (created_at, req_ssn) 倒序排列的分表结果"""
+    rows = [{'created_at': datetime(2025, 5, 27, hour, minute), 'req_ssn': ssn, 'source_table': table}
+            for hour, minute, ssn in items]
+    rows.sort(key=lambda r: (r['created_at'], r['req_ssn']), reverse=True)
+    return rows
+
+
+class TestTaskStatsPagination(unittest.TestCase):
+    """游标分页测试类"""
+    
+    def test_cursor_round_trip(self):
+        """测试游标编码与解析"""
+        cursor = encode_cursor(datetime(2025, 5, 27, 8, 30, 0, 123), 'SL2796867471')
+        self.assertEqual(decode_cursor(cursor), ('2025-05-27 08:30:00.000123', 'SL2796867471'))
+        self.assertIsNone(decode_cursor(None))
+        self.assertIsNone(decode_cursor(''))
+    
+    def test_invalid_cursor(self):
+        """测试无效游标"""
+        with self.assertRaises(ValueError):
+            decode_cursor('not-a-cursor')
+    
+    def test_merge_is_global_order(self):
+        """测试多分表归并结果为全局倒序"""
+        shard_rows = [
+            _rows('job_a', (10, 0, 'SL1'), (8, 0, 'SL2'), (6, 0, 'SL3')),
+            _rows('job_b', (9, 0, 'SL4'), (7, 0, 'SL5')),
+            _rows('job_c'),
+            _rows('job_d', (10, 0, 'SL6'), (5, 0, 'SL7')),
+        ]
+        page, next_cursor = merge_shard_pages(shard_rows, page_size=4)
+        
+        self.assertEqual([r['req_ssn'] for r in page], ['SL6', 'SL1', 'SL4', 'SL2'])
+        self.assertEqual(decode_cursor(next_cursor), ('2025-05-27 08:00:00', 'SL2'))
+    
+    def test_merge_last_page(self):
+        """测试最后一页不返回游标"""
+        shard_rows = [_rows('job_a', (10, 0, 'SL1')), _rows('job_b', (9, 0, 'SL2'))]
+        page, next_cursor = merge_shard_pages(shard_rows, page_size=2)
+        
+        self.assertEqual(len(page), 2)
+        self.assertIsNone(next_cursor)
+
+
+if __name__ == '__main__':
+    unittest.main()
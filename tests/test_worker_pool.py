@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+读取器工作线程池测试模块
+"""
+import logging
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.job_queue import JobQueue
+from src.worker_pool import ReaderWorkerPool, capture_output
+
+
+class TestWorkerPool(unittest.TestCase):
+    """工作线程池测试类"""
+    
+    def test_capture_output_per_thread(self):
+        """并发任务的 print 输出和日志分别捕获到各自的任务"""
+        outputs = {'a': [], 'b': []}
+        barrier = threading.Barrier(2)
+        
+        def task(name):
+            with capture_output(outputs[name].append):
+                barrier.wait()
+                print(f"{name}-1")
+                logging.getLogger('test_worker_pool').warning(f"{name}-log")
+                print(f"{name}-2\n{name}-3", end='')
+        
+        threads = [threading.Thread(target=task, args=(name,)) for name in outputs]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        for name, lines in outputs.items():
+            self.assertEqual(lines[0], f"{name}-1")
+            self.assertTrue(lines[1].endswith(f"WARNING - {name}-log"))
+            self.assertEqual(lines[2:], [f"{name}-2", f"{name}-3"])
+    
+    def test_run_reader_argument_error(self):
+        """读取器参数错误返回非0退出码，输出写入任务"""
+        job_queue = JobQueue(max_workers=1)
+        pool = ReaderWorkerPool(job_queue)
+        lines = []
+        started = threading.Event()
+        try:
+            job = pool.submit(['AmazonListingJob', '1925464883027513344', 'pdf'], lines.append, on_start=started.set)
+            self.assertEqual(job.future.result(timeout=60), 2)
+        finally:
+            job_queue.shutdown()
+        
+        self.assertTrue(started.is_set())
+        self.assertTrue(any('invalid choice' in line for line in lines))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,13 +6,12 @@
 """
 
 import os
-import subprocess
 import threading
 import time
 import json
 import hashlib
 from datetime import datetime, timedelta, timezone
-from flask import Flask, render_template, request, jsonify, session, send_file
+from flask import Flask, render_template, request, jsonify, session, Response
 from flask_cors import CORS
 from pathlib import Path
 import uuid
@@ -48,12 +47,32 @@ def setup_logger():
 logger = setup_logger()
 
 # 导入数据库连接器和配置
-from src.db.connector import DatabaseConnector
+from src.db.connector import DatabaseConnector, MySQLError
 from config.db_config import DB_CONFIG
 from config.task_statistics_config import (
     DATABASE_TABLES, TASK_TYPES, TENANT_CONFIG, 
     get_sql_template, get_all_tenant_ids, TASK_STATISTICS_CONFIG
 )
+from src.task_stats.pagination import decode_cursor, keyset_condition, merge_shard_pages
+from src.task_stats.details import classify_result, is_recrawl_eligible, preview_text
+from src.task_stats.cube import StatisticsCube
+from src.task_stats.export import EXPORT_FORMATS, export_error, merge_shard_streams, stream_export
+from src.task_stats.live import LiveStatisticsHub
+from src.worker_pool import ReaderWorkerPool
+from src.job_queue import JobQueue, QueueFullError, PRIORITY_BULK, PRIORITY_INTERACTIVE
+from src.task_registry import TaskRegistry
+from src.recrawl import RecrawlManager, dedupe_job_ids, to_job_id
+from src.file_content import EncodingCache, FileContentCache, http_charset, logical_name, resolve_stored_file
+from src.dir_index import directory_index
+from src.file_preview import build_file_metadata, json_empty_type
+from src.json_query import DEFAULT_PAGE_SIZE, JsonIndexCache
+from src.html_snapshot import LiteHtmlCache
+from src.http_cache import HTTPCache, content_etag, etag_matches, file_etag, not_modified
+from config.worker_config import WORKER_CONFIG, TASK_HISTORY_CONFIG, HTTP_CACHE_CONFIG, LITE_HTML_CONFIG, FILE_CACHE_CONFIG
+from src.task_stats.queries import (
+    TIMEOUT_CONDITION, cube_query, details_where_condition, details_list_query,
+    details_count_query, detail_row_query, recrawl_candidates_query
+)
 
 # 添加本地数据库连接器导入
 try:
@@ -67,14 +86,47 @@ app = Flask(__name__)
 app.secret_key = 'azure_resource_reader_web_2024'
 
 # 配置CORS，允许前端跨域访问
-CORS(app, origins=['http://localhost:3000', 'http://localhost:3001'])
+CORS(app, origins=['http://localhost:3000', 'http://localhost:3001'], expose_headers=['ETag', 'X-File-Encoding'])
+
+# 条件请求（ETag/304）和响应压缩（按 Accept-Encoding 协商 br/gzip）
+http_cache = HTTPCache(app, **HTTP_CACHE_CONFIG)
 
-# 全局变量存储任务状态
-tasks = {}
+# Web任务执行记录：未结束的任务在内存中，历史记录保存在本地数据库，输出保存在压缩文件
+task_registry = TaskRegistry(LocalDatabaseConnector if LOCAL_DB_AVAILABLE else None, **TASK_HISTORY_CONFIG)
 
 # 简单的内存缓存机制
 statistics_cache = {}
+
+# Web任务队列：/submit 和 /api/resubmit_crawler 提交的任务在这里排队执行，并发数和排队数有上限
+job_queue = JobQueue(WORKER_CONFIG['max_workers'], WORKER_CONFIG['max_pending'], name='web-task')
+
+# 读取器工作线程池（进程内执行 /submit 提交的任务）
+reader_pool = ReaderWorkerPool(job_queue)
+
+# 重爬提交：所有批次共用一个HTTP连接池，每个批次并发数有上限
+recrawl_manager = RecrawlManager(concurrency=WORKER_CONFIG['recrawl_concurrency'])
+
+# 结果文件的编码检测缓存（按路径和修改时间）
+encoding_cache = EncodingCache()
+
+# 热点文件内容缓存（解码后的文本和解析后的JSON，按修改时间和大小失效）
+content_cache = FileContentCache(FILE_CACHE_CONFIG['max_bytes'], encoding_cache)
+
+# 对比查看使用的HTML精简快照（每个页面只生成一次）
+lite_html_cache = LiteHtmlCache(LITE_HTML_CONFIG['cache_dir'], content_cache)
+
+# JSON文件的结构索引缓存（/api/json_query 按路径分页查询大文件）
+json_index_cache = JsonIndexCache()
+
+# /api/file_content 支持的文件类型
+FILE_CONTENT_TYPES = {
+    '.html': 'text/html',
+    '.htm': 'text/html',
+    '.json': 'application/json',
+    '.txt': 'text/plain'
+}
 CACHE_DURATION = 21600  # 缓存6小时（6 * 60 * 60 = 21600秒）
+LIVE_CACHE_DURATION = 60  # 日期范围包含实时窗口（近两天）时的缓存时长，新任务仍在写入
 
 def get_utc_now():
     """获取当前UTC时间字符串"""
@@ -106,11 +158,7 @@ def get_timeout_condition(reference_time=None):
     if reference_time is None:
         reference_time = get_utc_now()
     
-    condition_sql = """break_at < %s
-        AND (deliver_at IS NULL OR deliver_at > break_at)
-        AND `status` != 'FAILED'"""
-    
-    return condition_sql.strip(), reference_time
+    return TIMEOUT_CONDITION.strip(), reference_time
 
 def clean_sql_for_debug(sql_string):
     """
@@ -123,46 +171,46 @@ def clean_sql_for_debug(sql_string):
     cleaned = ' '.join(sql_string.replace('\n', ' ').replace('\t', ' ').split())
     return cleaned
 
-def execute_command(task_id, command, working_dir):
-    """在后台执行命令"""
-    try:
-        tasks[task_id]['status'] = 'running'
-        tasks[task_id]['start_time'] = datetime.now()
-        
-        # 执行命令
-        process = subprocess.Popen(
-            command,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            cwd=working_dir,
-            bufsize=1,
-            universal_newlines=True
-        )
-        
-        # 实时读取输出
-        output_lines = []
-        while True:
-            output = process.stdout.readline()
-            if output == '' and process.poll() is not None:
-                break
-            if output:
-                line = output.strip()
-                output_lines.append(line)
-                tasks[task_id]['output'] = '\n'.join(output_lines)
-        
-        # 获取返回码
-        return_code = process.poll()
-        
-        tasks[task_id]['status'] = 'completed' if return_code == 0 else 'failed'
-        tasks[task_id]['return_code'] = return_code
-        tasks[task_id]['end_time'] = datetime.now()
-        
-    except Exception as e:
-        tasks[task_id]['status'] = 'error'
-        tasks[task_id]['error'] = str(e)
-        tasks[task_id]['end_time'] = datetime.now()
+def parse_priority(value, default=PRIORITY_INTERACTIVE):
+    """解析请求中的任务优先级（interactive: 交互式单个任务，bulk: 批量任务）"""
+    if value == 'bulk':
+        return PRIORITY_BULK
+    if value == 'interactive':
+        return PRIORITY_INTERACTIVE
+    return default
+
+
+def run_reader_task(task_id, argv, priority=PRIORITY_INTERACTIVE, fairness_key='default'):
+    """
+    将读取任务提交到常驻工作线程池执行
+    
+    读取器以库函数方式在Web进程内运行，复用已导入的模块和Azure客户端，
+    print 输出和日志按任务逐行写入任务的 'log'（有界环形缓冲，完整输出写入压缩文件）。
+    
+    Raises:
+        QueueFullError: 任务队列已满
+    """
+    task = task_registry.get(task_id)
+    task_log = task['log']
+    
+    def on_start():
+        task_registry.mark_running(task_id)
+    
+    def on_line(line):
+        task_log.append(line.strip())
+    
+    def on_done(future):
+        try:
+            return_code = future.result()
+        except Exception as e:
+            task_registry.finish(task_id, 'error', error=str(e))
+            return
+        task_registry.finish(task_id, 'completed' if return_code == 0 else 'failed', return_code=return_code)
+    
+    job = reader_pool.submit(argv, on_line, on_start=on_start, priority=priority, fairness_key=fairness_key)
+    task['job'] = job
+    job.future.add_done_callback(on_done)
+    return job
 
 def format_timestamp(iso_timestamp):
     """格式化ISO时间戳为易读格式"""
@@ -330,22 +378,24 @@ def list_files():
             return jsonify({'success': False, 'error': '缺少路径参数'})
         
         path = Path(dir_path)
-        if not path.exists():
+        try:
+            entries = directory_index.list_files(path)
+        except FileNotFoundError:
             return jsonify({'success': False, 'error': '目录不存在'})
-        
-        if not path.is_dir():
+        except NotADirectoryError:
             return jsonify({'success': False, 'error': '路径不是目录'})
         
         files = []
-        for file_path in path.iterdir():
-            if file_path.is_file():
-                stat = file_path.stat()
-                files.append({
-                    'name': file_path.name,
-                    'path': str(file_path),
-                    'size': stat.st_size,
-                    'modified': datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M')
-                })
+        for entry in entries:
+            # 保持压缩保存的文件（page_1.html.gz）按解压后的文件名显示，读取时透明解压
+            name = logical_name(entry.name)
+            files.append({
+                'name': name,
+                'path': str(path / name),
+                'size': entry.size,
+                'compressed': name != entry.name,
+                'modified': datetime.fromtimestamp(entry.mtime).strftime('%Y-%m-%d %H:%M')
+            })
         
         # 按名称排序
         files.sort(key=lambda x: x['name'])
@@ -367,7 +417,9 @@ def download_file():
         if not file_path:
             return jsonify({'success': False, 'error': '缺少文件路径参数'})
         
-        path = Path(file_path)
+        # 文件可能保持压缩保存为 file_path + '.gz'
+        stored_path, stored_gzip = resolve_stored_file(file_path)
+        path = Path(stored_path)
         if not path.exists():
             return jsonify({'success': False, 'error': '文件不存在'})
         
@@ -381,7 +433,8 @@ def download_file():
         except ValueError:
             return jsonify({'success': False, 'error': '文件访问权限不足'})
         
-        return send_file(path, as_attachment=True, download_name=path.name)
+        return http_cache.send_file(path, stored_gzip=stored_gzip, as_attachment=True,
+                                    download_name=logical_name(path.name))
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
@@ -394,7 +447,9 @@ def get_file_content():
         if not file_path:
             return jsonify({'success': False, 'error': '缺少文件路径参数'})
         
-        path = Path(file_path)
+        # 文件可能保持压缩保存为 file_path + '.gz'
+        stored_path, stored_gzip = resolve_stored_file(file_path)
+        path = Path(stored_path)
         if not path.exists():
             return jsonify({'success': False, 'error': '文件不存在'})
         
@@ -408,103 +463,132 @@ def get_file_content():
         except ValueError:
             return jsonify({'success': False, 'error': '文件访问权限不足'})
         
-        # 根据文件类型读取内容
-        file_ext = path.suffix.lower()
+        # 根据文件类型读取内容（压缩保存的文件按解压后的文件名判断）
+        filename = logical_name(path.name)
+        file_ext = Path(filename).suffix.lower()
+        if file_ext not in FILE_CONTENT_TYPES:
+            return jsonify({'success': False, 'error': '不支持的文件类型'})
         
-        def read_file_with_encoding_detection(file_path):
-            """智能读取文件，自动检测编码"""
-            # 尝试多种编码方式读取文件
-            encodings_to_try = ['utf-8', 'shift_jis', 'gbk', 'big5', 'iso-8859-1', 'cp1252']
-            content = None
-            used_encoding = None
-            
-            for encoding in encodings_to_try:
-                try:
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        content = f.read()
-                        used_encoding = encoding
-                        break
-                except UnicodeDecodeError:
-                    continue
-            
-            if content is None:
-                # 如果所有编码都失败，尝试二进制模式读取
-                try:
-                    with open(file_path, 'rb') as f:
-                        raw_data = f.read()
-                        # 尝试自动检测编码
-                        try:
-                            import chardet
-                            detected = chardet.detect(raw_data)
-                            if detected['encoding'] and detected['confidence'] > 0.7:
-                                content = raw_data.decode(detected['encoding'])
-                                used_encoding = f"{detected['encoding']} (detected)"
-                        except ImportError:
-                            pass
-                        
-                        # 如果检测失败，使用UTF-8并忽略错误
-                        if content is None:
-                            content = raw_data.decode('utf-8', errors='ignore')
-                            used_encoding = 'utf-8 (with errors ignored)'
-                except Exception:
-                    raise Exception('无法读取文件内容')
-            
-            return content, used_encoding
+        # 原始内容：直接发送文件字节（支持 Range 分段读取），不做 JSON 包装
+        if request.args.get('raw') in ('1', 'true'):
+            if request.args.get('lite') in ('1', 'true') and file_ext in ('.html', '.htm'):
+                # 精简快照：去掉脚本、样式和隐藏节点，统一为 UTF-8
+                response = http_cache.send_file(lite_html_cache.get(str(path)), mimetype='text/html',
+                                                charset='utf-8')
+                encoding = 'utf-8'
+            else:
+                encoding = encoding_cache.get(str(path))
+                charset = http_charset(encoding)
+                response = http_cache.send_file(path, mimetype=FILE_CONTENT_TYPES[file_ext], charset=charset,
+                                                stored_gzip=stored_gzip)
+            response.headers['X-File-Encoding'] = encoding
+            response.headers['X-Content-Type-Options'] = 'nosniff'
+            # 抓取的页面来自外部网站，禁止在看板的源下执行脚本
+            response.headers['Content-Security-Policy'] = 'sandbox'
+            return response
+        
+        # 内容只由文件决定：ETag 由修改时间和大小生成，文件未修改时不再读取
+        stat = path.stat()
+        etag = file_etag(stat)
+        if etag_matches(etag):
+            return not_modified(etag)
         
         if file_ext in ['.html', '.htm']:
-            content, encoding = read_file_with_encoding_detection(path)
-            return jsonify({
+            content, encoding = content_cache.read_text(str(path))
+            result = {
                 'success': True,
                 'content': content,
                 'type': 'html',
-                'filename': path.name,
+                'filename': filename,
                 'encoding': encoding
-            })
+            }
         elif file_ext == '.json':
-            content, encoding = read_file_with_encoding_detection(path)
+            content, encoding = content_cache.read_text(str(path))
             
-            # 检测JSON内容是否为空或无意义
-            is_empty_json = False
+            # 检测JSON内容是否为空或无意义（解析结果随内容缓存）
             empty_json_type = None
-            
             try:
-                parsed_content = json.loads(content)
-                # 检测各种"空"情况
-                if parsed_content == "":
-                    is_empty_json = True
-                    empty_json_type = "empty_string"
-                elif parsed_content == {}:
-                    is_empty_json = True
-                    empty_json_type = "empty_object"
-                elif parsed_content == []:
-                    is_empty_json = True
-                    empty_json_type = "empty_array"
-                elif parsed_content is None:
-                    is_empty_json = True
-                    empty_json_type = "null"
-            except json.JSONDecodeError:
+                empty_json_type = json_empty_type(content_cache.read_json(str(path)))
+            except ValueError:
                 pass
             
-            return jsonify({
+            result = {
                 'success': True,
                 'content': content,
                 'type': 'json',
-                'filename': path.name,
+                'filename': filename,
                 'encoding': encoding,
-                'is_empty_json': is_empty_json,
+                'is_empty_json': empty_json_type is not None,
                 'empty_json_type': empty_json_type
-            })
-        elif file_ext == '.txt':
-            content, encoding = read_file_with_encoding_detection(path)
-            return jsonify({
+            }
+        else:
+            content, encoding = content_cache.read_text(str(path))
+            result = {
                 'success': True,
                 'content': content,
                 'type': 'text',
-                'filename': path.name,
+                'filename': filename,
                 'encoding': encoding
-            })
-        else:
-            return jsonify({'success': False, 'error': '不支持的文件类型'})
+            }
+        
+        response = jsonify(result)
+        response.set_etag(etag)
+        response.last_modified = stat.st_mtime
+        return response
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/json_query')
+def query_json_file():
+    """
+    按路径查询JSON文件的子树，对象和数组分页返回（大文件不整个发送到浏览器）
+    
+    参数: path 文件路径，q 查询路径（如 $.data.items[0]，末尾可带切片 [0:50]），offset、limit 分页
+    """
+    try:
+        file_path = request.args.get('path')
+        if not file_path:
+            return jsonify({'success': False, 'error': '缺少文件路径参数'})
+        
+        # 文件可能保持压缩保存为 file_path + '.gz'
+        stored_path, _ = resolve_stored_file(file_path)
+        path = Path(stored_path)
+        if not path.is_file():
+            return jsonify({'success': False, 'error': '文件不存在'})
+        
+        # 安全检查：确保文件在data/output目录下
+        data_output_path = Path('data/output').resolve()
+        try:
+            path.resolve().relative_to(data_output_path)
+        except ValueError:
+            return jsonify({'success': False, 'error': '文件访问权限不足'})
+        
+        if Path(logical_name(path.name)).suffix.lower() != '.json':
+            return jsonify({'success': False, 'error': '不是JSON文件'})
+        
+        json_path = request.args.get('q', '$')
+        try:
+            offset = int(request.args.get('offset', 0))
+            limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+        except ValueError:
+            return jsonify({'success': False, 'error': '分页参数无效'}), 400
+        
+        # 结果只由文件和查询参数决定
+        etag = content_etag(file_etag(path.stat()), json_path, offset, limit)
+        if etag_matches(etag):
+            return not_modified(etag)
+        
+        try:
+            result = json_index_cache.query(str(path), json_path, offset, limit)
+        except KeyError as e:
+            return jsonify({'success': False, 'error': f'路径不存在: {e.args[0]}'}), 404
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        response = jsonify({'success': True, 'filename': logical_name(path.name), **result})
+        response.set_etag(etag)
+        return response
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
@@ -519,17 +603,18 @@ def compare_view():
     # 获取任务目录下的文件列表
     try:
         path = Path(task_path)
-        if not path.exists() or not path.is_dir():
+        entries = directory_index.try_list_files(path)
+        if entries is None:
             return "任务目录不存在", 404
         
         files = []
-        for file_path in path.iterdir():
-            if file_path.is_file():
-                files.append({
-                    'name': file_path.name,
-                    'path': str(file_path),
-                    'type': file_path.suffix.lower()
-                })
+        for entry in entries:
+            name = logical_name(entry.name)
+            files.append({
+                'name': name,
+                'path': str(path / name),
+                'type': Path(name).suffix.lower()
+            })
         
         # 按类型分组
         html_files = [f for f in files if f['type'] in ['.html', '.htm']]
@@ -545,12 +630,20 @@ def compare_view():
 
 @app.route('/submit', methods=['POST'])
 def submit_command():
-    """提交命令执行"""
+    """
+    提交命令执行
+    
+    相同的 (任务ID, 输出类型, 是否解析) 正在执行时，关联到该执行（coalesced），不会重复下载；
+    在 reuse_window 秒内已成功执行过且输出文件仍存在时，直接返回该执行（reused），
+    传入 force=on 时总是重新执行。
+    """
     try:
         # 获取表单数据
         task_id_input = request.form.get('task_id', '').strip()
         output_type = request.form.get('output_type', 'html')
         use_parse = request.form.get('use_parse') == 'on'
+        force = request.form.get('force') == 'on'
+        priority = parse_priority(request.form.get('priority'))
         
         # 验证输入
         if not task_id_input:
@@ -559,6 +652,21 @@ def submit_command():
                 'error': '请填写任务ID'
             })
         
+        dedupe_key = (task_id_input, output_type, use_parse)
+        
+        # 最近已成功执行过的相同请求直接使用已有的输出文件
+        if not force:
+            fresh = task_registry.find_fresh(dedupe_key, WORKER_CONFIG['reuse_window'])
+            if fresh is not None and task_output_exists(task_id_input):
+                logger.info(f"复用最近的执行结果: {task_id_input}（{output_type}）-> {fresh['id']}")
+                return jsonify({
+                    'success': True,
+                    'task_id': fresh['id'],
+                    'command': fresh['command'],
+                    'reused': True,
+                    'finished_time': fresh['end_time'].strftime('%Y-%m-%d %H:%M:%S')
+                })
+        
         # 自动获取任务类型
         from src.azure_resource_reader import get_task_type_by_job_id
         task_type = get_task_type_by_job_id(task_id_input)
@@ -569,41 +677,48 @@ def submit_command():
                 'error': f'无法找到任务ID {task_id_input} 对应的任务类型，请检查任务ID是否正确'
             })
         
-        # 构建智能模式命令（直接使用job_id，让脚本自动识别任务类型）
-        command_parts = [
-            'python3',
-            'src/azure_resource_reader.py',
-            task_id_input,  # 直接使用job_id
-            output_type
-        ]
+        # 构建智能模式参数（直接使用job_id，让读取器自动识别任务类型）
+        reader_args = [task_id_input, output_type]  # 直接使用job_id
         
         if use_parse:
-            command_parts.append('--with-parse')
+            reader_args.append('--with-parse')
+        if WORKER_CONFIG['keep_compressed']:
+            reader_args.append('--keep-compressed')
         
-        command = ' '.join(command_parts)
+        # 等价的命令行（用于展示）
+        command = ' '.join(['python3', 'src/azure_resource_reader.py'] + reader_args)
         
         # 生成任务ID
         execution_id = str(uuid.uuid4())
         
-        # 初始化任务状态
-        tasks[execution_id] = {
-            'command': command,
-            'status': 'pending',
-            'output': '',
-            'created_time': datetime.now(),
-            'task_type': task_type,
-            'task_id': task_id_input,
-            'output_type': output_type,
-            'use_parse': use_parse
-        }
-        
-        # 在后台线程中执行命令
-        thread = threading.Thread(
-            target=execute_command,
-            args=(execution_id, command, os.getcwd())
+        # 登记任务执行记录（相同请求正在执行时关联到该执行）
+        task, created = task_registry.create_or_attach(
+            dedupe_key,
+            execution_id,
+            command,
+            task_type=task_type,
+            task_id=task_id_input,
+            output_type=output_type,
+            use_parse=use_parse
         )
-        thread.daemon = True
-        thread.start()
+        if not created:
+            logger.info(f"相同任务正在执行，关联到已有执行: {task_id_input}（{output_type}）-> {task['id']}")
+            return jsonify({
+                'success': True,
+                'task_id': task['id'],
+                'command': task['command'],
+                'coalesced': True
+            })
+        
+        # 在常驻工作线程池中排队执行（同优先级内按任务类型轮转）
+        try:
+            run_reader_task(execution_id, reader_args, priority=priority, fairness_key=task_type)
+        except QueueFullError as e:
+            task_registry.discard(execution_id)
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 429
         
         return jsonify({
             'success': True,
@@ -617,65 +732,244 @@ def submit_command():
             'error': f'提交失败: {str(e)}'
         })
 
+def task_output_exists(job_id):
+    """任务的输出目录是否存在（根据本地数据库中的任务映射，数据库模块不可用时视为存在）"""
+    if not LOCAL_DB_AVAILABLE:
+        return True
+    
+    db = LocalDatabaseConnector()
+    try:
+        mapping = db.get_task_mapping_by_job_id(job_id)
+    finally:
+        db.disconnect()
+    if mapping is None:
+        return False
+    
+    relative_path = mapping.get('relative_path') or ''
+    if relative_path.startswith('./'):
+        relative_path = relative_path[2:]
+    return os.path.exists(mapping.get('full_path') or f"data/output/{relative_path}")
+
 @app.route('/status/<task_id>')
 def get_status(task_id):
-    """获取任务状态"""
-    if task_id not in tasks:
+    """
+    获取任务状态
+    
+    传入 since=<序号>（上一次返回的 next_seq）时只返回之后的新输出行（lines），
+    不传时返回完整输出（output）。
+    """
+    task = task_registry.get(task_id)
+    if task is None:
         return jsonify({
             'success': False,
             'error': '任务不存在'
         })
     
-    task = tasks[task_id]
+    # 任务输出：增量（since）或完整
+    since = request.args.get('since', type=int)
+    task_log = task['log']
+    if since is not None:
+        log_data = task_log.since(since)
+    else:
+        log_data = {'output': task_log.text(), 'next_seq': task_log.next_seq}
     
+    return jsonify({
+        'success': True,
+        **log_data,
+        'command': task['command'],
+        'created_time': task['created_time'].strftime('%Y-%m-%d %H:%M:%S'),
+        **get_task_state(task)
+    })
+
+
+def get_task_state(task):
+    """任务的状态字段：状态、执行时间、返回码、错误，排队中的任务还包括队列位置和已等待时间"""
     # 计算执行时间
     duration = None
     if 'start_time' in task:
         end_time = task.get('end_time', datetime.now())
         duration = str(end_time - task['start_time'])
     
-    return jsonify({
-        'success': True,
+    # 排队中的任务返回队列位置和已等待时间
+    queue_position = None
+    wait_time = None
+    job = task.get('job')
+    if job is not None:
+        queue_position = job_queue.position(job)
+        wait_time = round(job.wait_time, 3)
+    
+    return {
         'status': task['status'],
-        'output': task.get('output', ''),
-        'command': task['command'],
-        'created_time': task['created_time'].strftime('%Y-%m-%d %H:%M:%S'),
         'duration': duration,
         'return_code': task.get('return_code'),
-        'error': task.get('error')
+        'error': task.get('error'),
+        'queue_position': queue_position,
+        'wait_time': wait_time
+    }
+
+
+# 任务推送中等待新输出的最长时间（秒），超时后发送心跳
+TASK_STREAM_HEARTBEAT_INTERVAL = 15
+
+# 任务排队时刷新队列位置的间隔（秒）
+TASK_STREAM_QUEUED_INTERVAL = 2
+
+
+@app.route('/status/<task_id>/stream')
+def stream_task_status(task_id):
+    """
+    任务输出和状态推送（Server-Sent Events）
+    
+    有新的输出行时推送 log 事件（id 为下一次的起始序号），状态变化时推送 status 事件，
+    任务结束且输出发送完毕后推送 done 事件并关闭连接。
+    断线重连时浏览器会带上 Last-Event-ID，从该序号继续推送；也可以用 since 参数指定起始序号。
+    """
+    task = task_registry.get(task_id)
+    if task is None:
+        return jsonify({'success': False, 'error': '任务不存在'}), 404
+    
+    task_log = task['log']
+    since = request.headers.get('Last-Event-ID', type=int)
+    if since is None:
+        since = request.args.get('since', 0, type=int)
+    
+    def generate():
+        seq = since
+        version = None
+        last_state = None
+        yield 'retry: 3000\n\n'
+        while True:
+            # 先读版本号和结束标记再读数据，读取期间的更新会让下一次等待立即返回
+            current = task_log.version
+            closed = task_log.closed
+            
+            if current != version:
+                version = current
+                log_data = task_log.since(seq)
+                if log_data['lines'] or log_data['truncated']:
+                    seq = log_data['next_seq']
+                    yield f"id: {seq}\nevent: log\ndata: {json.dumps(log_data, ensure_ascii=False)}\n\n"
+            
+            # 队列位置变化不会通知等待者，每轮都比较状态（执行时间一直在变，不参与比较）
+            state = get_task_state(task)
+            state.pop('wait_time')
+            compared = {k: v for k, v in state.items() if k != 'duration'}
+            if compared != last_state:
+                last_state = compared
+                yield f"event: status\ndata: {json.dumps(state, ensure_ascii=False)}\n\n"
+            
+            if closed:
+                yield f"event: done\ndata: {json.dumps({'next_seq': seq})}\n\n"
+                return
+            
+            # 排队中的任务较频繁地刷新队列位置
+            timeout = TASK_STREAM_QUEUED_INTERVAL if state['status'] == 'pending' else TASK_STREAM_HEARTBEAT_INTERVAL
+            if task_log.wait_for_change(version, timeout) == version:
+                yield ': keepalive\n\n'
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
     })
 
-@app.route('/tasks')
-def list_tasks():
-    """列出所有任务"""
+
+@app.route('/api/queue/metrics')
+def get_queue_metrics():
+    """获取Web任务队列的统计信息（队列深度、等待时间等）"""
+    return jsonify({
+        'success': True,
+        'data': job_queue.metrics()
+    })
+
+@app.route('/api/cache/metrics')
+def get_cache_metrics():
+    """获取文件相关缓存的统计信息（命中率等）"""
+    def hit_stats(cache):
+        requests = cache.hits + cache.misses
+        return {
+            'hits': cache.hits,
+            'misses': cache.misses,
+            'hit_rate': round(cache.hits / requests, 4) if requests else None
+        }
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            'file_content': content_cache.stats(),
+            'encoding': hit_stats(encoding_cache),
+            'compressed_files': hit_stats(http_cache.files),
+            'json_index': hit_stats(json_index_cache),
+            'lite_html': hit_stats(lite_html_cache),
+            'directory_index': hit_stats(directory_index)
+        }
+    })
+
+# 任务历史每页数量
+TASK_LIST_PAGE_SIZE = 50
+
+
+def list_task_page():
+    """
+    按查询参数 page, page_size, status 分页获取任务历史（按创建时间倒序）
+    
+    Returns:
+        tuple: (任务列表, 分页信息)
+    """
+    page = max(request.args.get('page', 1, type=int), 1)
+    page_size = min(max(request.args.get('page_size', TASK_LIST_PAGE_SIZE, type=int), 1), 200)
+    status = request.args.get('status') or None
+    
+    entries, total = task_registry.list(page, page_size, status)
+    
     task_list = []
-    for task_id, task in tasks.items():
+    for task in entries:
         duration = None
-        if 'start_time' in task:
-            end_time = task.get('end_time', datetime.now())
+        if task.get('start_time'):
+            end_time = task.get('end_time') or datetime.now()
             duration = str(end_time - task['start_time'])
         
         task_list.append({
-            'id': task_id,
+            'id': task['id'],
             'command': task['command'],
             'status': task['status'],
             'created_time': task['created_time'].strftime('%Y-%m-%d %H:%M:%S'),
             'duration': duration,
             'task_type': task.get('task_type'),
             'task_id': task.get('task_id'),
-            'use_parse': task.get('use_parse', False)
+            'use_parse': task.get('use_parse', False),
+            'return_code': task.get('return_code'),
+            'error': task.get('error')
         })
     
-    # 按创建时间倒序排列
-    task_list.sort(key=lambda x: x['created_time'], reverse=True)
-    
-    return render_template('tasks.html', tasks=task_list)
+    pagination = {
+        'page': page,
+        'page_size': page_size,
+        'total': total,
+        'total_pages': (total + page_size - 1) // page_size,
+        'status': status
+    }
+    return task_list, pagination
+
+@app.route('/tasks')
+def list_tasks():
+    """任务历史（分页）"""
+    task_list, pagination = list_task_page()
+    return render_template('tasks.html', tasks=task_list, pagination=pagination)
+
+@app.route('/api/tasks')
+def api_list_tasks():
+    """任务历史（分页，JSON）"""
+    task_list, pagination = list_task_page()
+    return jsonify({
+        'success': True,
+        'tasks': task_list,
+        'pagination': pagination
+    })
 
 @app.route('/clear_tasks', methods=['POST'])
 def clear_tasks():
-    """清空任务历史"""
-    global tasks
-    tasks = {}
+    """清空任务历史（未结束的任务保留）"""
+    task_registry.clear()
     return jsonify({'success': True})
 
 @app.route('/api/get_task_type')
@@ -767,7 +1061,7 @@ def get_statistics_config():
 
 @app.route('/api/statistics/data', methods=['POST'])
 def get_statistics_data():
-    """获取任务统计数据"""
+    """获取任务统计数据（从统计立方体切片得到）"""
     try:
         data = request.get_json()
         
@@ -775,7 +1069,6 @@ def get_statistics_data():
         start_date = data.get('start_date')
         end_date = data.get('end_date')
         tenant_ids = data.get('tenant_ids', [])
-        task_type = data.get('task_type', '')  # 改为单个任务类型
         refresh_timestamp = data.get('_refresh')  # 刷新时间戳
         
         # 参数验证
@@ -785,57 +1078,88 @@ def get_statistics_data():
         if not tenant_ids:
             return jsonify({'success': False, 'error': '至少选择一个租户'})
         
-        if not task_type:
-            return jsonify({'success': False, 'error': '请选择任务类型'})
-        
-        # 生成缓存键（如果有刷新时间戳，则包含在缓存键中以绕过缓存）
-        cache_key_params = ['statistics_data', start_date, end_date, tenant_ids, task_type]
-        if refresh_timestamp:
-            cache_key_params.append(refresh_timestamp)
-        cache_key = generate_cache_key(*cache_key_params)
+        # 任务类型：task_types 列表、"all"，或单个 task_type
+        try:
+            task_types = parse_task_types(data)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)})
         
-        # 检查缓存（如果是刷新请求，跳过缓存检查）
-        if not refresh_timestamp:
-            cached_result = get_from_cache(cache_key)
-            if cached_result:
-                return jsonify({
-                    'success': True,
-                    'data': cached_result['data'],
-                    'from_cache': True,
-                    'cache_time': cached_result['cache_time'],
-                    '_debug': cached_result['debug_info']
-                })
+        # 刷新请求重新构建立方体，否则优先使用缓存
+        cube_entry = get_statistics_cube(start_date, end_date, refresh=bool(refresh_timestamp))
+        if cube_entry is None:
+            return jsonify({'success': False, 'error': '数据库连接或查询失败'})
         
-        # 创建数据库连接
-        db_config = DB_CONFIG.copy()
-        db_config['database'] = 'shulex_collector_prod'
+        # 立方体未重建时相同查询的结果不变，客户端带 If-None-Match 时返回304
+        etag = statistics_etag('data', cube_entry, start_date, end_date, tenant_ids, task_types)
+        if etag_matches(etag):
+            return not_modified(etag)
         
-        db = DatabaseConnector(db_config)
-        if not db.connect():
-            return jsonify({'success': False, 'error': '数据库连接失败'})
+        cube = cube_entry['data']
+        statistics_data = cube.to_statistics_data(tenant_ids, task_types)
         
-        try:
-            # 使用优化的查询策略
-            statistics_data, debug_info = get_optimized_statistics_data(db, start_date, end_date, tenant_ids, task_type)
-            
-            # 存入缓存
-            set_to_cache(cache_key, statistics_data, debug_info)
-            
-            return jsonify({
-                'success': True,
-                'data': statistics_data,
-                'cache_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                '_debug': debug_info
-            })
-            
-        finally:
-            db.disconnect()
+        response = jsonify({
+            'success': True,
+            'data': statistics_data,
+            'by_type': cube.to_statistics_data_by_type(tenant_ids, task_types),
+            'task_types': task_types,
+            'from_cache': cube_entry['from_cache'],
+            'cache_time': cube_entry['cache_time'],
+            '_debug': cube_entry['debug_info']
+        })
+        response.set_etag(etag)
+        return response
             
     except Exception as e:
         logger.error(f"获取统计数据失败: {str(e)}")
         return jsonify({'success': False, 'error': str(e)})
 
 
+def parse_task_types(params):
+    """
+    解析统计请求中的任务类型参数
+    
+    支持 task_types 列表、task_types/task_type 为 "all"（全部任务类型），以及单个 task_type。
+    
+    Args:
+        params: 请求参数字典
+        
+    Returns:
+        list: 任务类型列表
+        
+    Raises:
+        ValueError: 未选择任务类型或任务类型无效
+    """
+    task_types = params.get('task_types')
+    if task_types is None:
+        task_types = params.get('task_type', '')
+    
+    if task_types == 'all':
+        return list(TASK_TYPES)
+    
+    if isinstance(task_types, str):
+        task_types = [task_types] if task_types else []
+    
+    if not task_types:
+        raise ValueError('请选择任务类型')
+    
+    invalid_types = [t for t in task_types if t not in TASK_TYPES]
+    if invalid_types:
+        raise ValueError(f"无效的任务类型: {', '.join(invalid_types)}")
+    
+    # 去重并保持顺序
+    return list(dict.fromkeys(task_types))
+
+
+def statistics_etag(view, cube_entry, start_date, end_date, tenant_ids, task_types):
+    """
+    统计接口的 ETag：由立方体版本（构建时间和对象）和查询参数生成
+    
+    from_cache 不参与计算，命中缓存和刚构建完成时相同查询返回相同的 ETag
+    """
+    return content_etag(view, cube_entry['cache_time'], id(cube_entry['data']),
+                        start_date, end_date, sorted(tenant_ids), task_types)
+
+
 def generate_cache_key(*args):
     """生成缓存键"""
     key_string = '|'.join(str(arg) for arg in args)
@@ -846,7 +1170,7 @@ def get_from_cache(cache_key):
     """从缓存获取数据"""
     if cache_key in statistics_cache:
         cache_entry = statistics_cache[cache_key]
-        if time.time() - cache_entry['timestamp'] < CACHE_DURATION:
+        if time.time() - cache_entry['timestamp'] < cache_entry.get('ttl', CACHE_DURATION):
             return {
                 'data': cache_entry['data'],
                 'cache_time': cache_entry['cache_time'],
@@ -858,178 +1182,225 @@ def get_from_cache(cache_key):
     return None
 
 
-def set_to_cache(cache_key, data, debug_info=None):
-    """设置缓存数据"""
+def set_to_cache(cache_key, data, debug_info=None, ttl=CACHE_DURATION):
+    """设置缓存数据（ttl 为缓存有效秒数）"""
     cache_time = datetime.now()
     statistics_cache[cache_key] = {
         'data': data,
         'timestamp': time.time(),
+        'ttl': ttl,
         'cache_time': cache_time.strftime('%Y-%m-%d %H:%M:%S'),
         'debug_info': debug_info or []
     }
 
 
-def get_optimized_statistics_data(db, start_date, end_date, tenant_ids, task_type):
+# 统计立方体构建锁：同一日期范围同时只构建一次
+# cache_key -> [锁, 引用数]，没有线程使用时删除，任意日期范围的请求不会让字典持续增长
+_cube_build_locks = {}
+_cube_build_locks_guard = threading.Lock()
+
+
+def get_statistics_cube(start_date, end_date, refresh=False):
     """
-    优化的统计数据查询
-    使用单个查询获取所有统计数据，减少数据库往返次数
+    获取指定日期范围的统计立方体（日期 × 租户 × 任务类型 × 指标）
+    
+    立方体覆盖所有租户和所有任务类型，每个日期范围只扫描一次生产库，
+    之后任意租户和任务类型组合的查询都通过切片求和得到。
+    
+    Args:
+        start_date: 开始日期
+        end_date: 结束日期
+        refresh: 是否忽略缓存重新构建
+        
+    Returns:
+        dict: {'data': StatisticsCube, 'cache_time', 'debug_info', 'from_cache'}，数据库连接或任一分表查询失败返回None
     """
-    statistics_data = {
-        'failed_count': [],
-        'timeout_count': [],
-        'total_count': [],
-        'timeout_but_succeed': [],  # 已超时但已完成
-        'succeed_count': [],        # 已完成数量
-        'succeed_not_timeout': [],  # 未超时且已完成数量
-        'timeout_not_succeed': []   # 超时未完成数量
-    }
+    cache_key = generate_cache_key('statistics_cube', start_date, end_date)
+    
+    if not refresh:
+        cached_result = get_from_cache(cache_key)
+        if cached_result:
+            return {**cached_result, 'from_cache': True}
+    
+    with _cube_build_locks_guard:
+        entry = _cube_build_locks.setdefault(cache_key, [threading.Lock(), 0])
+        entry[1] += 1
+    build_lock = entry[0]
+    
+    try:
+        with build_lock:
+            # 等待期间其他请求可能已经构建完成
+            if not refresh:
+                cached_result = get_from_cache(cache_key)
+                if cached_result:
+                    return {**cached_result, 'from_cache': True}
+            
+            db_config = DB_CONFIG.copy()
+            db_config['database'] = 'shulex_collector_prod'
+            
+            db = DatabaseConnector(db_config)
+            if not db.connect():
+                return None
+            
+            try:
+                cube, debug_info = build_statistics_cube(db, start_date, end_date)
+            except MySQLError as e:
+                logger.error(f"构建统计立方体失败（不写入缓存）: {start_date} ~ {end_date}: {str(e)}")
+                return None
+            finally:
+                db.disconnect()
+            
+            set_to_cache(cache_key, cube, debug_info)
+            logger.info(f"📦 统计立方体已构建: {start_date} ~ {end_date}, "
+                        f"{len(cube.dates)} 天, {cube.nbytes} 字节")
+            
+            cached_result = get_from_cache(cache_key)
+            return {**cached_result, 'from_cache': False}
+    finally:
+        with _cube_build_locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _cube_build_locks[cache_key]
+
+
+def build_statistics_cube(db, start_date, end_date):
+    """
+    扫描所有分表，按 日期、租户、任务类型 分组统计，构建统计立方体
     
+    Args:
+        db: 已连接的数据库连接器
+        start_date: 开始日期
+        end_date: 结束日期
+        
+    Returns:
+        tuple: (StatisticsCube, debug_info)
+    """
     debug_info = []
+    rows = []
+    
+    tenant_ids = get_all_tenant_ids()
+    task_types = list(TASK_TYPES)
     
     # 超时判断应该使用当前UTC时间，而不是查询日期
     # 这样可以反映截至当前时间的真实超时状态
     current_utc_time = get_utc_now()
-    timeout_condition, _ = get_timeout_condition(current_utc_time)
     
     # 转换查询日期为UTC时间
     utc_start_date = convert_to_utc_datetime(start_date, "00:00:00")
     utc_end_date = convert_to_utc_datetime(end_date, "23:59:59")
     
-    # 遍历所有分表
+    # 遍历所有分表，每个分表一次分组查询获取所有租户、所有任务类型的统计数据
     for table in DATABASE_TABLES:
-        # 使用单个复合查询获取所有统计数据
-        optimized_sql = f"""
-            SELECT 
-                DATE(created_at) AS date,
-                type as task_type,
-                COUNT(*) as total_count,
-                SUM(CASE WHEN `status` = 'FAILED' THEN 1 ELSE 0 END) as failed_count,
-                SUM(CASE WHEN {timeout_condition} THEN 1 ELSE 0 END) as timeout_count,
-                SUM(CASE WHEN `status` = 'SUCCEED' THEN 1 ELSE 0 END) as succeed_count,
-                SUM(CASE WHEN ({timeout_condition}) AND `status` = 'SUCCEED' THEN 1 ELSE 0 END) as timeout_but_succeed,
-                SUM(CASE WHEN NOT ({timeout_condition}) AND `status` = 'SUCCEED' THEN 1 ELSE 0 END) as succeed_not_timeout,
-                SUM(CASE WHEN ({timeout_condition}) AND `status` != 'SUCCEED' AND `status` != 'FAILED' THEN 1 ELSE 0 END) as timeout_not_succeed
-            FROM {table}
-            WHERE created_at >= %s 
-                AND created_at <= %s
-                AND tenant_id IN ({','.join(['%s'] * len(tenant_ids))})
-                AND type = %s
-            GROUP BY date, task_type
-            ORDER BY date DESC, task_type
-        """
-        
-        # 参数：current_utc_time (4次), utc_start_date, utc_end_date, tenant_ids, task_type
-        params = [current_utc_time, current_utc_time, current_utc_time, current_utc_time, utc_start_date, utc_end_date] + tenant_ids + [task_type]
+        cube_sql, params = cube_query(table, tenant_ids, task_types, current_utc_time,
+                                      utc_start_date, utc_end_date)
         
         # 记录调试信息
         debug_info.append({
             'table': table,
-            'sql': clean_sql_for_debug(optimized_sql),
+            'sql': clean_sql_for_debug(cube_sql),
             'params': params,
             'query_time': get_utc_now(),
             'timeout_reference_time': current_utc_time
         })
         
-        # 执行查询
-        results = db.execute_query(optimized_sql, params)
-        
-        # 分解结果到不同的统计类型
-        for result in results:
-            date_str = str(result['date'])
-            task_type = result['task_type']
-            
-            # 添加表名信息
-            base_record = {
-                'date': date_str,
-                'task_type': task_type,
-                'table': table
-            }
-            
-            # 分别添加到不同的统计类型
-            statistics_data['total_count'].append({
-                **base_record,
-                'count': result['total_count']
-            })
-            
-            statistics_data['failed_count'].append({
-                **base_record,
-                'count': result['failed_count']
-            })
-            
-            statistics_data['timeout_count'].append({
-                **base_record,
-                'count': result['timeout_count']
-            })
-            
-            statistics_data['succeed_count'].append({
-                **base_record,
-                'count': result['succeed_count']
-            })
-            
-            statistics_data['timeout_but_succeed'].append({
-                **base_record,
-                'count': result['timeout_but_succeed']
-            })
-            
-            statistics_data['succeed_not_timeout'].append({
-                **base_record,
-                'count': result['succeed_not_timeout']
-            })
-            
-            statistics_data['timeout_not_succeed'].append({
-                **base_record,
-                'count': result['timeout_not_succeed']
-            })
+        # 分表查询失败时抛出异常：缺少分表的立方体不能被缓存和使用
+        rows.extend(db.execute_query(cube_sql, params, raise_errors=True))
     
-    # 数据聚合处理
-    return aggregate_statistics_data(statistics_data), debug_info
+    return StatisticsCube.from_rows(rows, tenant_ids, task_types), debug_info
 
 
-def aggregate_statistics_data(raw_data):
+def fetch_live_statistics_cube(start_date, end_date):
     """
-    聚合统计数据
+    重新统计实时窗口的立方体（不读写缓存，供实时推送使用）
     
-    Args:
-        raw_data: 原始数据字典
-        
     Returns:
-        dict: 聚合后的数据
+        StatisticsCube: 统计立方体，数据库连接或任一分表查询失败返回None
     """
-    aggregated = {}
+    db_config = DB_CONFIG.copy()
+    db_config['database'] = 'shulex_collector_prod'
     
-    for stat_type, records in raw_data.items():
-        # 按日期和任务类型聚合
-        date_task_map = {}
-        
-        for record in records:
-            date_str = str(record['date'])
-            task_type = record['task_type']
-            count = record['count']
-            
-            if date_str not in date_task_map:
-                date_task_map[date_str] = {}
-            
-            if task_type not in date_task_map[date_str]:
-                date_task_map[date_str][task_type] = 0
-            
-            date_task_map[date_str][task_type] += count
-        
-        # 转换为前端需要的格式
-        aggregated[stat_type] = []
-        for date_str in sorted(date_task_map.keys(), reverse=True):
-            for task_type, count in date_task_map[date_str].items():
-                aggregated[stat_type].append({
-                    'date': date_str,
-                    'task_type': task_type,
-                    'count': count
-                })
+    db = DatabaseConnector(db_config)
+    if not db.connect():
+        return None
+    
+    try:
+        cube, _ = build_statistics_cube(db, start_date, end_date)
+    except MySQLError as e:
+        logger.error(f"实时窗口统计失败: {str(e)}")
+        return None
+    finally:
+        db.disconnect()
+    return cube
+
+
+def load_cached_statistics_cube(start_date, end_date):
+    """获取日期范围的统计立方体（优先使用缓存），失败返回None"""
+    cube_entry = get_statistics_cube(start_date, end_date)
+    return cube_entry['data'] if cube_entry else None
+
+
+# 实时统计推送中心：所有订阅共用一个轮询线程，每轮只统计一次实时窗口
+live_statistics_hub = LiveStatisticsHub(load_cached_statistics_cube, fetch_live_statistics_cube)
+
+# SSE心跳间隔（秒），防止代理断开空闲连接
+SSE_HEARTBEAT_INTERVAL = 15
+
+
+@app.route('/api/statistics/stream', methods=['GET'])
+def stream_statistics():
+    """
+    实时统计推送（Server-Sent Events）
+    
+    订阅 (日期范围, 租户, 任务类型) 视图，连接后立即推送当前数据，之后仅在统计结果变化时推送。
+    多个客户端共用一个后台轮询，实时窗口之外的日期使用缓存，不会重复扫描。
+    
+    查询参数: start_date, end_date, tenant_ids（逗号分隔）, task_type 或 task_types（逗号分隔或 all）
+    """
+    args = request.args
+    start_date = args.get('start_date')
+    end_date = args.get('end_date')
+    tenant_ids = [t for t in args.get('tenant_ids', '').split(',') if t]
+    
+    # 参数验证
+    if not start_date or not end_date:
+        return jsonify({'success': False, 'error': '开始日期和结束日期不能为空'}), 400
+    
+    if not tenant_ids:
+        return jsonify({'success': False, 'error': '至少选择一个租户'}), 400
+    
+    # 任务类型：task_types（逗号分隔或 all），或单个 task_type
+    task_type_params = {'task_type': args.get('task_type', '')}
+    if args.get('task_types'):
+        task_types_param = args['task_types']
+        task_type_params['task_types'] = task_types_param if task_types_param == 'all' else task_types_param.split(',')
+    try:
+        task_types = parse_task_types(task_type_params)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    def generate():
+        subscription = live_statistics_hub.subscribe(start_date, end_date, tenant_ids, task_types)
+        try:
+            # 建议客户端断线5秒后重连
+            yield 'retry: 5000\n\n'
+            while True:
+                event = subscription.next_event(timeout=SSE_HEARTBEAT_INTERVAL)
+                if event is None:
+                    yield ': keepalive\n\n'
+                    continue
+                yield f"event: statistics\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        finally:
+            live_statistics_hub.unsubscribe(subscription)
     
-    return aggregated
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 
 @app.route('/api/statistics/summary', methods=['POST'])
 def get_statistics_summary():
-    """获取统计汇总数据"""
+    """获取统计汇总数据（从统计立方体切片得到）"""
     try:
         data = request.get_json()
         
@@ -1037,7 +1408,6 @@ def get_statistics_summary():
         start_date = data.get('start_date')
         end_date = data.get('end_date')
         tenant_ids = data.get('tenant_ids', [])
-        task_type = data.get('task_type', '')  # 改为单个任务类型
         refresh_timestamp = data.get('_refresh')  # 刷新时间戳
         
         # 参数验证
@@ -1047,117 +1417,33 @@ def get_statistics_summary():
         if not tenant_ids:
             return jsonify({'success': False, 'error': '至少选择一个租户'})
         
-        if not task_type:
-            return jsonify({'success': False, 'error': '请选择任务类型'})
+        # 任务类型：task_types 列表、"all"，或单个 task_type
+        try:
+            task_types = parse_task_types(data)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)})
         
-        # 生成缓存键（如果有刷新时间戳，则包含在缓存键中以绕过缓存）
-        cache_key_params = ['statistics_summary', start_date, end_date, tenant_ids, task_type]
-        if refresh_timestamp:
-            cache_key_params.append(refresh_timestamp)
-        cache_key = generate_cache_key(*cache_key_params)
+        # 刷新请求重新构建立方体，否则优先使用缓存
+        cube_entry = get_statistics_cube(start_date, end_date, refresh=bool(refresh_timestamp))
+        if cube_entry is None:
+            return jsonify({'success': False, 'error': '数据库连接或查询失败'})
         
-        # 检查缓存（如果是刷新请求，跳过缓存检查）
-        if not refresh_timestamp:
-            cached_result = get_from_cache(cache_key)
-            if cached_result:
-                return jsonify({
-                    'success': True,
-                    'data': cached_result['data'],
-                    'from_cache': True,
-                    'cache_time': cached_result['cache_time'],
-                    '_debug': cached_result['debug_info']
-                })
+        etag = statistics_etag('summary', cube_entry, start_date, end_date, tenant_ids, task_types)
+        if etag_matches(etag):
+            return not_modified(etag)
         
-        # 创建数据库连接
-        db_config = DB_CONFIG.copy()
-        db_config['database'] = 'shulex_collector_prod'
+        summary_data = cube_entry['data'].to_summary(tenant_ids, task_types)
         
-        db = DatabaseConnector(db_config)
-        if not db.connect():
-            return jsonify({'success': False, 'error': '数据库连接失败'})
-        
-        try:
-            summary_data = {}
-            debug_info = []
-            
-            # 超时判断应该使用当前UTC时间，而不是查询日期
-            # 这样可以反映截至当前时间的真实超时状态
-            current_utc_time = get_utc_now()
-            timeout_condition, _ = get_timeout_condition(current_utc_time)
-            
-            # 转换查询日期为UTC时间
-            utc_start_date = convert_to_utc_datetime(start_date, "00:00:00")
-            utc_end_date = convert_to_utc_datetime(end_date, "23:59:59")
-            
-            # 遍历所有分表获取汇总数据
-            for table in DATABASE_TABLES:
-                # 汇总SQL模板（优化版本）
-                summary_sql = f"""
-                    SELECT 
-                        type as task_type,
-                        COUNT(*) as total_count,
-                        SUM(CASE WHEN `status` = 'FAILED' THEN 1 ELSE 0 END) as failed_count,
-                        SUM(CASE WHEN {timeout_condition} THEN 1 ELSE 0 END) as timeout_count,
-                        SUM(CASE WHEN `status` = 'SUCCEED' THEN 1 ELSE 0 END) as succeed_count,
-                        SUM(CASE WHEN ({timeout_condition}) AND `status` = 'SUCCEED' THEN 1 ELSE 0 END) as timeout_but_succeed,
-                        SUM(CASE WHEN NOT ({timeout_condition}) AND `status` = 'SUCCEED' THEN 1 ELSE 0 END) as succeed_not_timeout,
-                        SUM(CASE WHEN ({timeout_condition}) AND `status` != 'SUCCEED' AND `status` != 'FAILED' THEN 1 ELSE 0 END) as timeout_not_succeed
-                    FROM {table}
-                    WHERE created_at >= %s 
-                        AND created_at <= %s
-                        AND tenant_id IN ({','.join(['%s'] * len(tenant_ids))})
-                        AND type = %s
-                    GROUP BY task_type
-                """
-                
-                # 参数：current_utc_time (4次), utc_start_date, utc_end_date, tenant_ids, task_type
-                params = [current_utc_time, current_utc_time, current_utc_time, current_utc_time, utc_start_date, utc_end_date] + tenant_ids + [task_type]
-                
-                # 记录调试信息
-                debug_info.append({
-                    'table': table,
-                    'sql': clean_sql_for_debug(summary_sql),
-                    'params': params,
-                    'query_time': get_utc_now(),
-                    'timeout_reference_time': current_utc_time
-                })
-                
-                results = db.execute_query(summary_sql, params)
-                
-                # 聚合数据
-                for result in results:
-                    task_type = result['task_type']
-                    if task_type not in summary_data:
-                        summary_data[task_type] = {
-                            'total_count': 0,
-                            'failed_count': 0,
-                            'timeout_count': 0,
-                            'succeed_count': 0,
-                            'timeout_but_succeed': 0,
-                            'succeed_not_timeout': 0,
-                            'timeout_not_succeed': 0
-                        }
-                    
-                    summary_data[task_type]['total_count'] += result['total_count']
-                    summary_data[task_type]['failed_count'] += result['failed_count']
-                    summary_data[task_type]['timeout_count'] += result['timeout_count']
-                    summary_data[task_type]['succeed_count'] += result['succeed_count']
-                    summary_data[task_type]['timeout_but_succeed'] += result['timeout_but_succeed']
-                    summary_data[task_type]['succeed_not_timeout'] += result['succeed_not_timeout']
-                    summary_data[task_type]['timeout_not_succeed'] += result['timeout_not_succeed']
-            
-            # 存入缓存
-            set_to_cache(cache_key, summary_data, debug_info)
-            
-            return jsonify({
-                'success': True,
-                'data': summary_data,
-                'cache_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                '_debug': debug_info
-            })
-            
-        finally:
-            db.disconnect()
+        response = jsonify({
+            'success': True,
+            'data': summary_data,
+            'task_types': task_types,
+            'from_cache': cube_entry['from_cache'],
+            'cache_time': cube_entry['cache_time'],
+            '_debug': cube_entry['debug_info']
+        })
+        response.set_etag(etag)
+        return response
             
     except Exception as e:
         logger.error(f"获取汇总数据失败: {str(e)}")
@@ -1166,7 +1452,13 @@ def get_statistics_summary():
 
 @app.route('/api/statistics/details', methods=['POST'])
 def get_statistics_details():
-    """获取统计详细数据"""
+    """
+    获取统计详细数据
+    
+    使用 (created_at, req_ssn) 游标分页：每个分表只取 page_size + 1 条记录，
+    再通过堆归并得到全局有序的当前页。请求中传入上一页返回的 cursor 获取下一页，
+    page 参数仅用于回显。total_count 来自单独的（带缓存的）COUNT 查询。
+    """
     try:
         data = request.get_json()
         
@@ -1186,7 +1478,13 @@ def get_statistics_details():
         detail_type = data['detail_type']  # 'failed', 'timeout', 'failed_timeout'
         target_date = data['date']
         page = data.get('page', 1)
-        page_size = data.get('page_size', 20)
+        try:
+            page_size = min(max(int(data.get('page_size', 20)), 1), 200)
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'message': f"无效的分页大小: {data.get('page_size')}"
+            }), 400
         target_table = data.get('table')  # 新增：指定查询的表，如果不指定则查询所有表
         
         # 验证参数
@@ -1196,6 +1494,14 @@ def get_statistics_details():
                 'message': '租户ID列表不能为空'
             }), 400
         
+        try:
+            cursor = decode_cursor(data.get('cursor'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
         # 获取配置
         tables = TASK_STATISTICS_CONFIG['tables']
         tenants_config = TASK_STATISTICS_CONFIG['tenants']
@@ -1218,251 +1524,77 @@ def get_statistics_details():
                     'message': f'无效的租户ID: {tenant_id}'
                 }), 400
         
+        # 计算最终的日期范围（查询范围与目标日期取交集）
+        final_start_date = max(convert_to_utc_datetime(start_date, "00:00:00"),
+                               convert_to_utc_datetime(target_date, "00:00:00"))
+        final_end_date = min(convert_to_utc_datetime(end_date, "23:59:59"),
+                             convert_to_utc_datetime(target_date, "23:59:59"))
+        
+        try:
+            where_condition, params = build_details_where_condition(
+                detail_type, tenant_ids, task_type, final_start_date, final_end_date
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
         # 创建数据库连接（修复：正确配置数据库）
         db_config = DB_CONFIG.copy()
         db_config['database'] = 'shulex_collector_prod'
         
-        all_details = []
+        connector = DatabaseConnector(db_config)
+        if not connector.connect():
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+        
+        shard_rows = []
         debug_info = []
         
-        # 查询每个表的详细数据
-        for table in tables:
-            job_table = table
-            log_table = table.replace('job_', 'log_')
-            
-            # 构建SQL查询
-            tenant_placeholders = ', '.join(['%s'] * len(tenant_ids))
-            
-            # 根据详情类型构建不同的WHERE条件
-            # 转换日期为UTC时间
-            target_date_start = convert_to_utc_datetime(target_date, "00:00:00")
-            target_date_end = convert_to_utc_datetime(target_date, "23:59:59")
-            
-            # 计算最终的日期范围（取交集）
-            final_start_date = max(convert_to_utc_datetime(start_date, "00:00:00"), target_date_start)
-            final_end_date = min(convert_to_utc_datetime(end_date, "23:59:59"), target_date_end)
+        try:
+            # 游标条件：只取上一页最后一条记录之后的数据
+            page_condition = where_condition
+            page_params = list(params)
+            if cursor:
+                page_condition += f" AND {keyset_condition('a')}"
+                page_params += [cursor[0], cursor[0], cursor[1]]
             
-            if detail_type == 'failed':
-                where_condition = f"""
-                WHERE a.created_at >= %s 
-                    AND a.created_at <= %s 
-                    AND a.tenant_id IN ({tenant_placeholders})
-                    AND a.type = %s
-                    AND a.status = 'FAILED'
-                """
-                params = [
-                    final_start_date,
-                    final_end_date
-                ] + tenant_ids + [
-                    task_type
-                ]
-            elif detail_type == 'timeout':
-                # 超时判断应该使用当前UTC时间，而不是目标日期
-                # 这样可以反映截至当前时间的真实超时状态
-                current_utc_time = get_utc_now()
-                timeout_condition, _ = get_timeout_condition(current_utc_time)
+            # 查询每个表的详细数据（列表只查询轻量字段）
+            for table in tables:
+                sql = details_list_query(table, page_condition, page_size + 1, RESPONSE_HEAD_LENGTH)
                 
-                where_condition = f"""
-                WHERE a.created_at >= %s 
-                    AND a.created_at <= %s 
-                    AND a.tenant_id IN ({tenant_placeholders})
-                    AND a.type = %s
-                    AND {timeout_condition}
-                """
-                params = [
-                    final_start_date,
-                    final_end_date
-                ] + tenant_ids + [
-                    task_type,
-                    current_utc_time
-                ]
-            elif detail_type == 'timeout_but_succeed':
-                # 已超时但已完成
-                current_utc_time = get_utc_now()
-                timeout_condition, _ = get_timeout_condition(current_utc_time)
-                
-                where_condition = f"""
-                WHERE a.created_at >= %s 
-                    AND a.created_at <= %s 
-                    AND a.tenant_id IN ({tenant_placeholders})
-                    AND a.type = %s
-                    AND {timeout_condition}
-                    AND a.status = 'SUCCEED'
-                """
-                params = [
-                    final_start_date,
-                    final_end_date
-                ] + tenant_ids + [
-                    task_type,
-                    current_utc_time
-                ]
-            elif detail_type == 'succeed':
-                # 已完成
-                where_condition = f"""
-                WHERE a.created_at >= %s 
-                    AND a.created_at <= %s 
-                    AND a.tenant_id IN ({tenant_placeholders})
-                    AND a.type = %s
-                    AND a.status = 'SUCCEED'
-                """
-                params = [
-                    final_start_date,
-                    final_end_date
-                ] + tenant_ids + [
-                    task_type
-                ]
-            elif detail_type == 'succeed_not_timeout':
-                # 未超时且已完成
-                current_utc_time = get_utc_now()
-                timeout_condition, _ = get_timeout_condition(current_utc_time)
-                
-                where_condition = f"""
-                WHERE a.created_at >= %s 
-                    AND a.created_at <= %s 
-                    AND a.tenant_id IN ({tenant_placeholders})
-                    AND a.type = %s
-                    AND NOT ({timeout_condition})
-                    AND a.status = 'SUCCEED'
-                """
-                params = [
-                    final_start_date,
-                    final_end_date
-                ] + tenant_ids + [
-                    task_type,
-                    current_utc_time
-                ]
-            elif detail_type == 'timeout_not_succeed':
-                # 超时未完成
-                current_utc_time = get_utc_now()
-                timeout_condition, _ = get_timeout_condition(current_utc_time)
+                # 记录调试信息
+                debug_info.append({
+                    'table': table,
+                    'sql': clean_sql_for_debug(sql),
+                    'params': page_params,
+                    'detail_type': detail_type,
+                    'query_time': get_utc_now()
+                })
                 
-                where_condition = f"""
-                WHERE a.created_at >= %s 
-                    AND a.created_at <= %s 
-                    AND a.tenant_id IN ({tenant_placeholders})
-                    AND a.type = %s
-                    AND {timeout_condition}
-                    AND a.status != 'SUCCEED'
-                    AND a.status != 'FAILED'
-                """
-                params = [
-                    final_start_date,
-                    final_end_date
-                ] + tenant_ids + [
-                    task_type,
-                    current_utc_time
-                ]
-            else:
-                return jsonify({
-                    'success': False,
-                    'message': f'不支持的详情类型: {detail_type}'
-                }), 400
-            
-            sql = f"""
-            SELECT 
-                a.created_at,
-                a.break_at,
-                a.deliver_at,
-                a.req_ssn,
-                a.payload,
-                a.result,
-                b.ext_ssn,
-                b.analysis_response,
-                b.response,
-                a.status,
-                b.state as log_state,
-                '{table}' as source_table
-            FROM {job_table} a 
-            LEFT JOIN {log_table} b ON b.req_ssn = a.req_ssn
-            {where_condition}
-            ORDER BY a.created_at DESC
-            LIMIT {page_size} OFFSET {(page - 1) * page_size}
-            """
+                try:
+                    results = connector.execute_query(sql, page_params)
+                    shard_rows.append([_normalize_detail_row(row) for row in results])
+                except Exception as e:
+                    logger.warning(f"查询表 {table} 详细数据失败: {str(e)}")
+                    debug_info[-1]['error'] = str(e)
             
-            # 记录调试信息
-            debug_info.append({
-                'table': table,
-                'sql': clean_sql_for_debug(sql),
-                'params': params,
-                'detail_type': detail_type,
-                'query_time': get_utc_now()
-            })
+            # 多分表k路归并，得到全局有序的当前页
+            page_rows, next_cursor = merge_shard_pages(shard_rows, page_size)
+            all_details = [_build_detail_item(row) for row in page_rows]
             
-            try:
-                # 执行查询
-                connector = DatabaseConnector(db_config)
-                if not connector.connect():
-                    logger.warning(f"数据库连接失败: {table}")
-                    continue
-                
-                results = connector.execute_query(sql, params)
-                
-                # 处理结果
-                for row in results:
-                    # 处理字典格式的结果
-                    if isinstance(row, dict):
-                        # 格式化JSON字段
-                        result_formatted = format_json_field(row.get('result'))
-                        response_formatted = format_json_field(row.get('response'))
-                        
-                        # 判断是否显示重爬按钮
-                        status = row.get('status') or ''
-                        show_recrawl = should_show_recrawl_button(status, result_formatted)
-                        
-                        detail_item = {
-                            'created_at': row.get('created_at').strftime('%Y-%m-%d %H:%M:%S') if row.get('created_at') else '',
-                            'break_at': row.get('break_at').strftime('%Y-%m-%d %H:%M:%S') if row.get('break_at') else '',
-                            'deliver_at': row.get('deliver_at').strftime('%Y-%m-%d %H:%M:%S') if row.get('deliver_at') else '',
-                            'req_ssn': row.get('req_ssn') or '',
-                            'payload': row.get('payload') or '',
-                            'result': result_formatted,
-                            'ext_ssn': row.get('ext_ssn') or '',
-                            'analysis_response': row.get('analysis_response') or '',
-                            'response': response_formatted,
-                            'status': status,
-                            'log_state': row.get('log_state') or '',
-                            'source_table': row.get('source_table') or table,
-                            'show_recrawl_button': show_recrawl
-                        }
-                    else:
-                        # 处理元组格式的结果
-                        # 格式化JSON字段
-                        result_formatted = format_json_field(row[5] if len(row) > 5 else '')
-                        response_formatted = format_json_field(row[8] if len(row) > 8 else '')
-                        
-                        # 判断是否显示重爬按钮
-                        status = row[9] if len(row) > 9 else ''
-                        show_recrawl = should_show_recrawl_button(status, result_formatted)
-                        
-                        detail_item = {
-                            'created_at': row[0].strftime('%Y-%m-%d %H:%M:%S') if row[0] else '',
-                            'break_at': row[1].strftime('%Y-%m-%d %H:%M:%S') if row[1] else '',
-                            'deliver_at': row[2].strftime('%Y-%m-%d %H:%M:%S') if row[2] else '',
-                            'req_ssn': row[3] or '',
-                            'payload': row[4] or '',
-                            'result': result_formatted,
-                            'ext_ssn': row[6] or '',
-                            'analysis_response': row[7] or '',
-                            'response': response_formatted,
-                            'status': status,
-                            'log_state': row[10] or '',
-                            'source_table': row[11] or table,
-                            'show_recrawl_button': show_recrawl
-                        }
-                    all_details.append(detail_item)
-                
-                connector.disconnect()
-                    
-            except Exception as e:
-                logger.warning(f"查询表 {table} 详细数据失败: {str(e)}")
-                debug_info[-1]['error'] = str(e)
-                continue
-        
-        # 按创建时间排序
-        all_details.sort(key=lambda x: x['created_at'], reverse=True)
-        
-        # 分页处理（已在SQL中处理，这里只是为了计算总数）
-        total_count = len(all_details)
+            # 真实总数（单独的COUNT查询，带缓存）
+            total_count = get_statistics_details_count(
+                connector, tables, where_condition, params,
+                cache_key_params=['statistics_details_count', start_date, end_date, tenant_ids,
+                                  task_type, detail_type, target_date, tables],
+                live=touches_live_window(min(end_date, target_date))
+            )
+        finally:
+            connector.disconnect()
         
         return jsonify({
             'success': True,
@@ -1472,6 +1604,8 @@ def get_statistics_details():
                 'page': page,
                 'page_size': page_size,
                 'total_pages': (total_count + page_size - 1) // page_size if total_count > 0 else 0,
+                'next_cursor': next_cursor,
+                'has_more': next_cursor is not None,
                 'queried_tables': tables  # 返回查询的表列表
             },
             '_debug': debug_info
@@ -1485,44 +1619,308 @@ def get_statistics_details():
         }), 500
 
 
-def should_show_recrawl_button(status, result_data):
+def build_details_where_condition(detail_type, tenant_ids, task_type, start_time, end_time):
     """
-    判断是否应该显示重爬按钮
+    根据详情类型构建详情查询的WHERE条件（job表别名为a）
     
-    Args:
-        status: 任务状态
-        result_data: 格式化后的result数据字典
+    超时判断使用当前UTC时间，反映截至当前时间的真实超时状态。
+    
+    Raises:
+        ValueError: 不支持的详情类型
+    """
+    return details_where_condition(detail_type, tenant_ids, task_type,
+                                   start_time, end_time, get_utc_now())
+
+
+def touches_live_window(end_date):
+    """日期范围（结束日期）是否包含实时窗口，窗口内的任务还在写入和变化"""
+    return end_date >= live_statistics_hub.live_window()[0]
+
+
+def get_statistics_details_count(connector, tables, where_condition, params, cache_key_params, live=False):
+    """
+    统计详情记录总数（各分表COUNT之和），结果写入缓存
+    
+    COUNT只扫描job表，不需要关联log表。任一分表统计失败时返回已统计的部分总数但不写入缓存；
+    live 为True（日期范围包含实时窗口）时只缓存 LIVE_CACHE_DURATION 秒。
+    """
+    cache_key = generate_cache_key(*cache_key_params)
+    cached_result = get_from_cache(cache_key)
+    if cached_result:
+        return cached_result['data']
+    
+    total_count = 0
+    failed = False
+    for table in tables:
+        count_sql = details_count_query(table, where_condition)
+        try:
+            results = connector.execute_query(count_sql, params, raise_errors=True)
+            if results:
+                total_count += results[0]['total'] or 0
+        except Exception as e:
+            failed = True
+            logger.warning(f"统计表 {table} 详情总数失败: {str(e)}")
+    
+    if not failed:
+        set_to_cache(cache_key, total_count, ttl=LIVE_CACHE_DURATION if live else CACHE_DURATION)
+    return total_count
+
+
+# 详情列表查询的字段顺序（用于兼容元组格式的查询结果）
+DETAIL_ROW_COLUMNS = [
+    'created_at', 'break_at', 'deliver_at', 'req_ssn', 'result',
+    'ext_ssn', 'response_head', 'status', 'log_state', 'source_table'
+]
+
+# 列表查询中response字段截取的长度（仅用于预览）
+RESPONSE_HEAD_LENGTH = 200
+
+
+def _normalize_detail_row(row):
+    """将查询结果统一为字典格式"""
+    if isinstance(row, dict):
+        return row
+    return dict(zip(DETAIL_ROW_COLUMNS, row))
+
+
+def _format_datetime(value):
+    """格式化数据库时间字段"""
+    return value.strftime('%Y-%m-%d %H:%M:%S') if value else ''
+
+
+def _build_detail_item(row):
+    """
+    将一条详情查询结果转换为列表行
+    
+    只包含轻量字段和预先计算的标记，result只解析一次；
+    完整的JSON字段通过 /api/statistics/details/<table>/<req_ssn> 按需获取。
+    """
+    status = row.get('status') or ''
+    raw_result = row.get('result')
+    summary = classify_result(raw_result)
+    
+    if raw_result:
+        result_preview = preview_text(raw_result)
+    else:
+        result_preview = preview_text(row.get('response_head'))
+    
+    return {
+        'created_at': _format_datetime(row.get('created_at')),
+        'break_at': _format_datetime(row.get('break_at')),
+        'deliver_at': _format_datetime(row.get('deliver_at')),
+        'req_ssn': row.get('req_ssn') or '',
+        'ext_ssn': row.get('ext_ssn') or '',
+        'status': status,
+        'log_state': row.get('log_state') or '',
+        'source_table': row.get('source_table') or '',
+        'result_preview': result_preview,
+        'result_is_valid_json': summary.is_valid_json,
+        'is_io_timeout': status == 'FAILED' and summary.is_io_timeout,
+        'show_recrawl_button': status == 'FAILED' and summary.is_recrawl_error
+    }
+
+
+@app.route('/api/statistics/details/<table>/<req_ssn>', methods=['GET'])
+def get_statistics_detail_row(table, req_ssn):
+    """获取单条统计详情记录的完整数据（展开行时调用，JSON字段已格式化）"""
+    try:
+        if table not in TASK_STATISTICS_CONFIG['tables']:
+            return jsonify({
+                'success': False,
+                'message': f'无效的表名: {table}'
+            }), 400
         
-    Returns:
-        bool: 是否显示重爬按钮
+        sql = detail_row_query(table)
+        
+        db_config = DB_CONFIG.copy()
+        db_config['database'] = 'shulex_collector_prod'
+        
+        connector = DatabaseConnector(db_config)
+        if not connector.connect():
+            return jsonify({
+                'success': False,
+                'message': '数据库连接失败'
+            }), 500
+        
+        try:
+            results = connector.execute_query(sql, (req_ssn,))
+        finally:
+            connector.disconnect()
+        
+        if not results:
+            return jsonify({
+                'success': False,
+                'message': f'记录不存在: {req_ssn}'
+            }), 404
+        
+        row = results[0]
+        return jsonify({
+            'success': True,
+            'data': {
+                'created_at': _format_datetime(row.get('created_at')),
+                'break_at': _format_datetime(row.get('break_at')),
+                'deliver_at': _format_datetime(row.get('deliver_at')),
+                'req_ssn': row.get('req_ssn') or '',
+                'ext_ssn': row.get('ext_ssn') or '',
+                'status': row.get('status') or '',
+                'log_state': row.get('log_state') or '',
+                'source_table': table,
+                'payload': format_json_field(row.get('payload')),
+                'analysis_response': format_json_field(row.get('analysis_response')),
+                'result': format_json_field(row.get('result')),
+                'response': format_json_field(row.get('response'))
+            }
+        })
+        
+    except Exception as e:
+        logger.error(f"获取统计详情记录失败: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'获取详情记录失败: {str(e)}'
+        }), 500
+
+
+@app.route('/api/statistics/details/export', methods=['GET'])
+def export_statistics_details():
     """
-    # 检查状态是否为FAILED
-    if status != 'FAILED':
-        return False
+    流式导出统计详情（CSV或NDJSON）
     
-    # 检查result数据是否有效
-    if not result_data or not result_data.get('is_valid_json'):
-        return False
+    每个分表使用独立连接和服务端游标读取全部匹配记录，按 (created_at, req_ssn) 倒序
+    k路归并后分块写入响应，Web节点内存占用与导出记录数无关。
     
+    查询参数: start_date, end_date, tenant_ids（逗号分隔）, task_type, detail_type,
+    date（可选，指定单日）, table（可选，指定分表）, format（csv/ndjson，默认csv）
+    """
     try:
-        # 解析JSON数据
-        if isinstance(result_data.get('raw'), str):
-            result_json = json.loads(result_data.get('raw'))
-        else:
-            result_json = result_data.get('raw')
+        args = request.args
+        
+        # 验证必需参数
+        required_fields = ['start_date', 'end_date', 'tenant_ids', 'task_type', 'detail_type']
+        for field in required_fields:
+            if not args.get(field):
+                return jsonify({
+                    'success': False,
+                    'message': f'缺少必需参数: {field}'
+                }), 400
         
-        # 检查是否包含特定的错误信息
-        expected_error = "作业提交失败: 408 IORuntimeException - SocketTimeoutException: connect timed out"
+        start_date = args['start_date']
+        end_date = args['end_date']
+        tenant_ids = [t for t in ','.join(args.getlist('tenant_ids')).split(',') if t]
+        task_type = args['task_type']
+        detail_type = args['detail_type']
+        target_date = args.get('date')
+        target_table = args.get('table')
+        export_format = args.get('format', 'csv')
         
-        if isinstance(result_json, dict) and 'E3001' in result_json:
-            actual_error = result_json.get('E3001', '')
-            return actual_error == expected_error
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({
+                'success': False,
+                'message': f'不支持的导出格式: {export_format}'
+            }), 400
         
-        return False
+        tables = TASK_STATISTICS_CONFIG['tables']
+        if target_table:
+            if target_table not in tables:
+                return jsonify({
+                    'success': False,
+                    'message': f'无效的表名: {target_table}'
+                }), 400
+            tables = [target_table]
         
-    except (json.JSONDecodeError, TypeError, AttributeError) as e:
-        logger.warning(f"⚠️ 解析result数据失败: {e}")
-        return False
+        # 验证租户ID
+        valid_tenant_ids = [t['id'] for t in TASK_STATISTICS_CONFIG['tenants']]
+        for tenant_id in tenant_ids:
+            if tenant_id not in valid_tenant_ids:
+                return jsonify({
+                    'success': False,
+                    'message': f'无效的租户ID: {tenant_id}'
+                }), 400
+        
+        # 计算最终的日期范围（指定了单日时与查询范围取交集）
+        final_start_date = convert_to_utc_datetime(start_date, "00:00:00")
+        final_end_date = convert_to_utc_datetime(end_date, "23:59:59")
+        if target_date:
+            final_start_date = max(final_start_date, convert_to_utc_datetime(target_date, "00:00:00"))
+            final_end_date = min(final_end_date, convert_to_utc_datetime(target_date, "23:59:59"))
+        
+        try:
+            where_condition, params = build_details_where_condition(
+                detail_type, tenant_ids, task_type, final_start_date, final_end_date
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        # 每个分表一个连接：非缓冲游标读取期间连接不能执行其他查询
+        db_config = DB_CONFIG.copy()
+        db_config['database'] = 'shulex_collector_prod'
+        
+        connectors = []
+        for _ in tables:
+            connector = DatabaseConnector(db_config)
+            if not connector.connect():
+                for opened in connectors:
+                    opened.disconnect()
+                return jsonify({
+                    'success': False,
+                    'message': '数据库连接失败'
+                }), 500
+            connectors.append(connector)
+        
+        def generate():
+            shard_streams = [
+                connector.iter_query(details_list_query(table, where_condition, None, RESPONSE_HEAD_LENGTH), params)
+                for connector, table in zip(connectors, tables)
+            ]
+            try:
+                yield from stream_export(merge_shard_streams(shard_streams), export_format)
+            except Exception as e:
+                # 响应头已经发出，无法再改状态码：先写入错误标记，再中断响应，客户端不会得到看似完整的文件
+                logger.error(f"导出统计详情中途失败: {str(e)}")
+                yield export_error(f'导出中断，结果不完整: {str(e)}', export_format)
+                raise
+            finally:
+                # 先关闭流式查询（客户端中断时会断开未读完的连接），再关闭连接
+                for stream in shard_streams:
+                    stream.close()
+                for connector in connectors:
+                    connector.disconnect()
+        
+        mimetype, extension = EXPORT_FORMATS[export_format]
+        filename = f"statistics_{detail_type}_{task_type}_{target_date or f'{start_date}_{end_date}'}.{extension}"
+        logger.info(f"开始导出统计详情: {filename}，分表: {tables}")
+        
+        return Response(generate(), mimetype=mimetype, headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Cache-Control': 'no-cache',
+            # 禁止反向代理缓冲，保证数据块立即发送
+            'X-Accel-Buffering': 'no'
+        })
+    
+    except Exception as e:
+        logger.error(f"导出统计详情失败: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'导出统计详情失败: {str(e)}'
+        }), 500
+
+
+def should_show_recrawl_button(status, result_data):
+    """
+    判断是否应该显示重爬按钮
+    
+    Args:
+        status: 任务状态
+        result_data: result字段原始内容，或format_json_field格式化后的字典
+        
+    Returns:
+        bool: 是否显示重爬按钮
+    """
+    if isinstance(result_data, dict):
+        result_data = result_data.get('raw')
+    return is_recrawl_eligible(status, result_data)
 
 
 def format_json_field(json_str):
@@ -1570,7 +1968,7 @@ def format_json_field(json_str):
 
 @app.route('/api/resubmit_crawler', methods=['POST'])
 def resubmit_crawler():
-    """重新提交爬虫任务"""
+    """重新提交单个爬虫任务（在任务队列中通过共享的HTTP客户端提交）"""
     try:
         data = request.get_json()
         
@@ -1582,75 +1980,28 @@ def resubmit_crawler():
             }), 400
         
         req_ssn = data['req_ssn']
+        # 单条重爬为交互式任务
+        priority = parse_priority(data.get('priority'))
+        job_id = to_job_id(req_ssn)
         
-        # 构建命令
-        job_id = f"SL{req_ssn}" if not req_ssn.startswith('SL') else req_ssn
-        command = f"python3 src/main.py resubmit_crawler_jobs --job-ids {job_id}"
-        
-        logger.info(f"🔄 执行重爬命令: {command} (req_ssn: {req_ssn})")
+        logger.info(f"🔄 提交重爬任务: {job_id} (req_ssn: {req_ssn})")
         
-        # 异步执行命令
-        def run_resubmit_command():
-            try:
-                process = subprocess.Popen(
-                    command,
-                    shell=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    cwd=os.getcwd(),
-                    bufsize=1,
-                    universal_newlines=True
-                )
-                
-                # 读取输出
-                output_lines = []
-                while True:
-                    output = process.stdout.readline()
-                    if output == '' and process.poll() is not None:
-                        break
-                    if output:
-                        line = output.strip()
-                        output_lines.append(line)
-                        logger.info(f"📝 重爬输出: {line}")
-                
-                return_code = process.poll()
-                
-                final_output = '\n'.join(output_lines)
-                success = return_code == 0
-                
-                logger.info(f"✅ 重爬命令完成，返回码: {return_code}")
-                logger.info(f"📋 完整输出:\n{final_output}")
-                
-                return {
-                    'success': success,
-                    'return_code': return_code,
-                    'output': final_output,
-                    'job_id': job_id,
-                    'req_ssn': req_ssn
-                }
-                
-            except Exception as e:
-                error_msg = f"执行重爬命令时出错: {str(e)}"
-                logger.error(error_msg)
-                return {
-                    'success': False,
-                    'error': error_msg,
-                    'job_id': job_id,
-                    'req_ssn': req_ssn
-                }
-        
-        # 在新线程中执行命令
-        thread = threading.Thread(target=run_resubmit_command)
-        thread.daemon = True
-        thread.start()
+        batch = recrawl_manager.create('req_ssn', [job_id])
+        try:
+            job_queue.submit(lambda: recrawl_manager.run(batch), priority=priority,
+                             fairness_key='resubmit_crawler', name=f'resubmit {job_id}')
+        except QueueFullError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 429
         
         return jsonify({
             'success': True,
             'message': f'重爬任务已提交，任务ID: {job_id}',
             'job_id': job_id,
             'req_ssn': req_ssn,
-            'command': command
+            'batch_id': batch.id
         })
         
     except Exception as e:
@@ -1662,6 +2013,133 @@ def resubmit_crawler():
         }), 500
 
 
+def collect_recrawl_req_ssns(tables, where_condition, params, max_jobs):
+    """
+    逐个分表流式读取失败记录，返回满足重爬条件的 req_ssn（去重）
+    
+    收集到 max_jobs + 1 个不同的任务后停止读取：多出的一个只用于让 RecrawlManager.run 标记 truncated。
+    分表连接或查询失败时抛出异常，批次以 error 结束，不会把漏掉的记录当作已完成。
+    """
+    db_config = DB_CONFIG.copy()
+    db_config['database'] = 'shulex_collector_prod'
+    
+    job_ids = {}
+    for table in tables:
+        connector = DatabaseConnector(db_config)
+        if not connector.connect():
+            raise RuntimeError(f'数据库连接失败: {table}')
+        rows = connector.iter_query(recrawl_candidates_query(table, where_condition), params)
+        try:
+            for row in rows:
+                if is_recrawl_eligible(row['status'], row['result']):
+                    job_ids.setdefault(to_job_id(row['req_ssn']), row['req_ssn'])
+                    if len(job_ids) > max_jobs:
+                        return list(job_ids.values())
+        finally:
+            # 提前停止时先关闭流式查询（断开未读完的连接），再关闭连接
+            rows.close()
+            connector.disconnect()
+    return list(job_ids.values())
+
+
+@app.route('/api/resubmit_crawler/batch', methods=['POST'])
+def resubmit_crawler_batch():
+    """
+    批量重新提交爬虫任务
+    
+    请求体二选一：
+    - req_ssns: req_ssn 列表
+    - filter: {start_date, end_date, tenant_ids, task_type, table（可选）, date（可选）}，
+      选取日期范围内所有满足重爬条件的失败记录
+    
+    任务ID去重后作为一个批量任务排队，通过共享连接池并发提交；
+    返回 batch_id，进度通过 GET /api/resubmit_crawler/batch/<batch_id> 查询。
+    """
+    try:
+        data = request.get_json() or {}
+        max_batch = WORKER_CONFIG['recrawl_max_batch']
+        collect = None
+        
+        if data.get('req_ssns') is not None:
+            if not isinstance(data['req_ssns'], list):
+                return jsonify({'success': False, 'message': 'req_ssns 必须是列表'}), 400
+            job_ids = dedupe_job_ids(data['req_ssns'])
+            if not job_ids:
+                return jsonify({'success': False, 'message': '没有需要重爬的任务'}), 400
+            if len(job_ids) > max_batch:
+                return jsonify({'success': False, 'message': f'单次最多重爬 {max_batch} 个任务'}), 400
+            batch = recrawl_manager.create('req_ssns', job_ids)
+        elif isinstance(data.get('filter'), dict):
+            criteria = data['filter']
+            for field in ['start_date', 'end_date', 'tenant_ids', 'task_type']:
+                if not criteria.get(field):
+                    return jsonify({'success': False, 'message': f'缺少必需参数: filter.{field}'}), 400
+            
+            tables = TASK_STATISTICS_CONFIG['tables']
+            target_table = criteria.get('table')
+            if target_table:
+                if target_table not in tables:
+                    return jsonify({'success': False, 'message': f'无效的表名: {target_table}'}), 400
+                tables = [target_table]
+            
+            valid_tenant_ids = [t['id'] for t in TASK_STATISTICS_CONFIG['tenants']]
+            for tenant_id in criteria['tenant_ids']:
+                if tenant_id not in valid_tenant_ids:
+                    return jsonify({'success': False, 'message': f'无效的租户ID: {tenant_id}'}), 400
+            
+            start_time = convert_to_utc_datetime(criteria['start_date'], "00:00:00")
+            end_time = convert_to_utc_datetime(criteria['end_date'], "23:59:59")
+            if criteria.get('date'):
+                start_time = max(start_time, convert_to_utc_datetime(criteria['date'], "00:00:00"))
+                end_time = min(end_time, convert_to_utc_datetime(criteria['date'], "23:59:59"))
+            
+            where_condition, params = build_details_where_condition(
+                'failed', criteria['tenant_ids'], criteria['task_type'], start_time, end_time
+            )
+            collect = lambda: collect_recrawl_req_ssns(tables, where_condition, params, max_batch)
+            batch = recrawl_manager.create(
+                f"filter: {criteria['task_type']} {criteria['start_date']} ~ {criteria['end_date']}"
+            )
+        else:
+            return jsonify({'success': False, 'message': '缺少必需参数: req_ssns 或 filter'}), 400
+        
+        try:
+            job_queue.submit(lambda: recrawl_manager.run(batch, collect, max_batch), priority=PRIORITY_BULK,
+                             fairness_key='resubmit_crawler', name=f'resubmit batch {batch.id}')
+        except QueueFullError as e:
+            return jsonify({'success': False, 'message': str(e)}), 429
+        
+        logger.info(f"🔄 批量重爬已提交: {batch.id}（{batch.source}，{len(batch.job_ids)} 个任务）")
+        return jsonify({
+            'success': True,
+            'message': '批量重爬任务已提交',
+            'batch_id': batch.id,
+            'total': len(batch.job_ids)
+        })
+        
+    except Exception as e:
+        error_msg = f"提交批量重爬任务失败: {str(e)}"
+        logger.error(error_msg)
+        return jsonify({
+            'success': False,
+            'message': error_msg
+        }), 500
+
+
+@app.route('/api/resubmit_crawler/batch/<batch_id>', methods=['GET'])
+def get_resubmit_crawler_batch(batch_id):
+    """查询批量重爬进度（results=1 时包含每个任务的提交结果）"""
+    batch = recrawl_manager.get(batch_id)
+    if batch is None:
+        return jsonify({'success': False, 'message': '批次不存在'}), 404
+    
+    include_results = request.args.get('results') in ('1', 'true')
+    return jsonify({
+        'success': True,
+        'data': batch.progress(include_results)
+    })
+
+
 @app.route('/api/task_mappings', methods=['GET'])
 def get_task_mappings():
     """
@@ -1680,35 +2158,13 @@ def get_task_mappings():
                 db = LocalDatabaseConnector()
                 offset = (page - 1) * per_page
                 
-                if search:
-                    # 简单的搜索实现（在job_id和task_type中搜索）
-                    # 这里简化处理，实际可以扩展更复杂的搜索逻辑
-                    mappings = []
-                    all_mappings = db.get_all_task_mappings(limit=1000, offset=0)
-                    for mapping in all_mappings:
-                        if (search.lower() in mapping.get('job_id', '').lower() or 
-                            search.lower() in mapping.get('task_type', '').lower()):
-                            mappings.append(mapping)
-                    
-                    # 手动分页
-                    total = len(mappings)
-                    mappings = mappings[offset:offset + per_page]
-                else:
-                    mappings = db.get_all_task_mappings(limit=per_page, offset=offset)
-                    # 这里应该也查询总数，简化处理
-                    total = len(mappings) + offset  # 简化的总数估算
+                # 搜索在数据库中完成（job_id、actual_task_id、task_type 的前缀和子串匹配），总数来自缓存的 COUNT
+                # 文件详情按整页一次查询，同一个连接完成
+                mappings = db.get_task_mappings_with_files(limit=per_page, offset=offset, search=search or None)
+                total = db.count_task_mappings(search or None)
                 
                 db.disconnect()
                 
-                # 为每个映射添加文件详情
-                for mapping in mappings:
-                    mapping_id = mapping.get('id')
-                    if mapping_id:
-                        db = LocalDatabaseConnector()
-                        file_details = db.get_file_details_by_mapping_id(mapping_id)
-                        mapping['files'] = file_details
-                        db.disconnect()
-                
                 return jsonify({
                     'success': True,
                     'data': mappings,
@@ -1745,7 +2201,8 @@ def get_task_mappings():
         # 转换为列表格式并添加文件统计
         mappings = []
         for job_id, info in mapping_data.items():
-            if search and search.lower() not in job_id.lower() and search.lower() not in info.get('task_type', '').lower():
+            if search and not any(search.lower() in str(value).lower()
+                                  for value in (job_id, info.get('task_type', ''), info.get('actual_task_id', ''))):
                 continue
                 
             # 统计文件信息
@@ -1755,12 +2212,9 @@ def get_task_mappings():
             else:
                 full_path = f"data/output/{relative_path}"
             
-            file_count = 0
-            has_parse_file = False
-            if os.path.exists(full_path):
-                files = [f for f in os.listdir(full_path) if os.path.isfile(os.path.join(full_path, f))]
-                file_count = len(files)
-                has_parse_file = 'parse_result.json' in files
+            files = directory_index.try_list_files(full_path) or []
+            file_count = len(files)
+            has_parse_file = any(f.name == 'parse_result.json' for f in files)
             
             mapping = {
                 'job_id': job_id,
@@ -1861,17 +2315,14 @@ def get_task_mapping_detail(job_id):
             full_path = f"data/output/{relative_path}"
         
         files = []
-        if os.path.exists(full_path):
-            for filename in os.listdir(full_path):
-                file_path = os.path.join(full_path, filename)
-                if os.path.isfile(file_path):
-                    file_type = 'parse' if filename == 'parse_result.json' else 'original'
-                    files.append({
-                        'file_name': filename,
-                        'file_type': file_type,
-                        'file_size': os.path.getsize(file_path),
-                        'file_path': file_path
-                    })
+        for entry in directory_index.try_list_files(full_path) or []:
+            file_type = 'parse' if entry.name == 'parse_result.json' else 'original'
+            files.append({
+                'file_name': entry.name,
+                'file_type': file_type,
+                'file_size': entry.size,
+                'file_path': os.path.join(full_path, entry.name)
+            })
         
         mapping = {
             'job_id': job_id,
@@ -2006,6 +2457,7 @@ def delete_task(job_id):
         db.connection.commit()
         
         deleted_rows = cursor.rowcount
+        LocalDatabaseConnector.invalidate_task_mapping_counts()
         db.disconnect()
         
         if deleted_rows > 0:
@@ -2040,7 +2492,8 @@ def get_task_detail(job_id):
             }), 500
         
         db = LocalDatabaseConnector()
-        mapping = db.get_task_mapping_by_job_id(job_id)
+        # 任务记录和文件详情（含下载时预计算的预览）一次查询获取
+        mapping = db.get_task_detail(job_id)
         
         if not mapping:
             db.disconnect()
@@ -2049,43 +2502,17 @@ def get_task_detail(job_id):
                 'error': '任务记录不存在'
             }), 404
         
-        # 获取文件详情
-        file_details = db.get_file_details_by_mapping_id(mapping['id'])
-        mapping['files'] = file_details
         mapping['source'] = 'database'
         
-        db.disconnect()
+        # 旧记录没有预计算的预览，首次查看时生成并写回数据库
+        for file_info in mapping['files']:
+            if file_info.get('preview_type') is None:
+                metadata = build_file_metadata(file_info.get('file_path', ''), file_info.get('file_name'))
+                file_info.update(metadata)
+                if metadata['preview_type'] != 'error':
+                    db.update_file_metadata(file_info['id'], metadata)
         
-        # 为每个文件添加内容预览
-        for file_info in mapping.get('files', []):
-            file_path = file_info.get('file_path', '')
-            if os.path.exists(file_path):
-                try:
-                    # 根据文件类型决定预览内容
-                    if file_info.get('file_name', '').endswith('.json'):
-                        # JSON文件，读取并格式化
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = json.load(f)
-                            file_info['preview'] = json.dumps(content, indent=2, ensure_ascii=False)[:1000]
-                            file_info['preview_type'] = 'json'
-                    elif file_info.get('file_name', '').endswith('.html'):
-                        # HTML文件，读取前500字符
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                            file_info['preview'] = content[:500] + ('...' if len(content) > 500 else '')
-                            file_info['preview_type'] = 'html'
-                    else:
-                        # 其他文件，简单文本预览
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                            file_info['preview'] = content[:300] + ('...' if len(content) > 300 else '')
-                            file_info['preview_type'] = 'text'
-                except Exception as preview_error:
-                    file_info['preview'] = f'预览失败: {str(preview_error)}'
-                    file_info['preview_type'] = 'error'
-            else:
-                file_info['preview'] = '文件不存在'
-                file_info['preview_type'] = 'error'
+        db.disconnect()
         
         return jsonify({
             'success': True,
@@ -2114,16 +2541,17 @@ if __name__ == '__main__':
     logger.info(f"   📁 日志目录: {Path('logs').absolute()}")
     logger.info(f"   🗄️  本地数据库: {'✅ 可用' if LOCAL_DB_AVAILABLE else '❌ 不可用'}")
     
-    if LOCAL_DB_AVAILABLE:
-        try:
-            test_db = LocalDatabaseConnector()
-            if test_db.connect():
-                logger.info("   🔗 数据库连接: ✅ 测试成功")
-                test_db.disconnect()
-            else:
-                logger.warning("   🔗 数据库连接: ⚠️ 测试失败")
-        except Exception as e:
-            logger.warning(f"   🔗 数据库连接: ❌ 测试异常 - {str(e)}")
+    # 任务执行记录：建表，并将上次运行时未结束的任务标记为中断
+    # （同时作为本地数据库的连接测试，不再单独建立一次测试连接）
+    if task_registry.start():
+        logger.info(f"   📝 任务执行记录: ✅ 保存到本地数据库（保留 {TASK_HISTORY_CONFIG['retention_days']} 天）")
+    else:
+        logger.warning("   📝 任务执行记录: ⚠️ 只保存在内存中")
+    
+    # 预热读取器：后台导入Azure SDK并获取访问令牌，首个任务无需等待
+    if WORKER_CONFIG['warm_up']:
+        reader_pool.warm_up()
+        logger.info(f"   ⚙️  读取器工作线程: {WORKER_CONFIG['max_workers']} 个（后台预热中）")
     
     logger.info("🎯 启动完成，开始监听请求...")
     